@@ -5,36 +5,29 @@ from fastapi import Depends, HTTPException
 from pydantic import BaseModel
 from admin_auth import verify_admin
 import os
-from supabase import create_client, Client
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
+import ai_rollups
+import structured_logging
+from buffered_writer import BufferedWriter
+from clients import get_supabase_client, get_supabase_admin_client
+
 load_dotenv()
 
-# Supabase 클라이언트 초기화 (Safe Init)
-supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-supabase_key = os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+# Supabase 클라이언트는 첫 관리자/공지 요청에서 생성 (clients.py, Safe Init)
 service_role_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
-supabase: Client = None
-admin_client: Client = None
-
-try:
-    if supabase_url and supabase_key:
-        supabase = create_client(supabase_url, supabase_key)
-        # 관리자 클라이언트 (삭제 등 권한 필요 작업용)
-        # service_role_key가 있으면 그것을 사용, 없으면 anon_key 사용 (권한 부족할 수 있음)
-        admin_client = create_client(supabase_url, service_role_key) if service_role_key else supabase
-    else:
-        print("⚠️ Supabase credentials missing during init in admin_apis.py")
-except Exception as e:
-    print(f"❌ Failed to initialize Supabase client: {e}")
+log = structured_logging.get_logger("admin")
 
 def get_supabase():
+    supabase = get_supabase_client()
     if not supabase:
         raise HTTPException(status_code=500, detail="Supabase client not initialized (check env vars)")
     return supabase
 
 def get_admin_client():
+    admin_client = get_supabase_admin_client()
     if not admin_client:
         raise HTTPException(status_code=500, detail="Supabase admin client not initialized")
     return admin_client
@@ -63,7 +56,7 @@ def get_admin_stats(admin_email: str = Depends(verify_admin)):
             "active_users": int(total_users * 0.1)  # 임시 (10%)
         }
     except Exception as e:
-        print(f"❌ Stats error: {e}")
+        log.exception("admin.stats_failed", error=e)
         raise HTTPException(status_code=500, detail=f"통계 조회 실패: {str(e)}")
 
 
@@ -92,24 +85,24 @@ def get_all_users(skip: int = 0, limit: int = 50, search: str = None, admin_emai
             
         return {"users": users_with_count, "skip": skip, "limit": limit}
     except Exception as e:
-        print(f"❌ Users list error: {e}")
+        log.exception("admin.users_list_failed", error=e)
         raise HTTPException(status_code=500, detail=f"사용자 목록 조회 실패: {str(e)}")
 
 
 def delete_user(user_id: str, admin_email: str = Depends(verify_admin)):
     """사용자 삭제 (프로필 + Auth 계정)"""
     try:
-        print(f"🗑️ Deleting user {user_id} using {'Service Role' if service_role_key else 'Anon Key'}")
+        log.info("admin.delete_user", user_id=user_id, service_role=bool(service_role_key))
         
         # 1. 사용자의 포트폴리오 먼저 삭제 (Admin Client 사용)
         client = get_admin_client()
         client.table('portfolios').delete().eq('user_id', user_id).execute()
-        print(f"✅ Deleted portfolios for user {user_id}")
+        log.debug("admin.delete_user.portfolios", user_id=user_id)
         
         # 2. 사용자 프로필 삭제 (Admin Client 사용)
         client = get_admin_client()
         response = client.table('user_profiles').delete().eq('id', user_id).execute()
-        print(f"✅ Deleted user profile for user {user_id}")
+        log.debug("admin.delete_user.profile", user_id=user_id)
         
         # 3. Supabase Auth에서 사용자 삭제 (Service Role Key 필요)
         if service_role_key:
@@ -117,12 +110,12 @@ def delete_user(user_id: str, admin_email: str = Depends(verify_admin)):
                 # Supabase Admin API를 사용하여 auth.users에서 삭제
                 client = get_admin_client()
                 client.auth.admin.delete_user(user_id)
-                print(f"✅ Deleted auth user {user_id}")
+                log.debug("admin.delete_user.auth", user_id=user_id)
             except Exception as auth_error:
-                print(f"⚠️ Auth user deletion failed (may not exist): {auth_error}")
+                log.warning("admin.delete_user.auth_failed", user_id=user_id, error=auth_error)
                 # Auth 삭제 실패해도 프로필은 이미 삭제되었으므로 계속 진행
         else:
-            print(f"⚠️ Service Role Key not available - cannot delete auth user")
+            log.warning("admin.delete_user.no_service_role", user_id=user_id)
             return {
                 "message": "사용자 프로필은 삭제되었으나 Auth 계정 삭제 실패 (Service Role Key 필요)",
                 "user_id": user_id,
@@ -134,28 +127,26 @@ def delete_user(user_id: str, admin_email: str = Depends(verify_admin)):
             "user_id": user_id
         }
     except Exception as e:
-        print(f"❌ Delete user error: {e}")
+        log.exception("admin.delete_user_failed", user_id=user_id, error=e)
         raise HTTPException(status_code=500, detail=f"사용자 삭제 실패: {str(e)}")
 
 
 def batch_delete_users(user_ids: list[str], admin_email: str = Depends(verify_admin)):
     """사용자 일괄 삭제 (프로필 + Auth 계정)"""
-    print(f"🗑️ REQUEST: Batch delete users: {user_ids}")
+    log.info("admin.batch_delete", count=len(user_ids), service_role=bool(service_role_key))
     try:
         if not user_ids:
             return {"message": "삭제할 사용자가 없습니다", "deleted_count": 0}
 
-        print(f"🔑 Using {'Service Role Key' if service_role_key else 'Anon Key'} for deletion")
-
         # 1. 사용자의 포트폴리오 일괄 삭제 (Admin Client 사용)
         client = get_admin_client()
         pf_response = client.table('portfolios').delete().in_('user_id', user_ids).execute()
-        print(f"🗑️ Portfolios deleted: {len(pf_response.data) if pf_response.data else 0}")
+        log.debug("admin.batch_delete.portfolios", deleted=len(pf_response.data) if pf_response.data else 0)
         
         # 2. 사용자 프로필 일괄 삭제 (Admin Client 사용)
         client = get_admin_client()
         response = client.table('user_profiles').delete().in_('id', user_ids).execute()
-        print(f"🗑️ User profiles deleted: {len(user_ids)}")
+        log.debug("admin.batch_delete.profiles", deleted=len(user_ids))
         
         # 3. Supabase Auth에서 사용자 일괄 삭제 (Service Role Key 필요)
         auth_deleted_count = 0
@@ -167,12 +158,11 @@ def batch_delete_users(user_ids: list[str], admin_email: str = Depends(verify_ad
                     client = get_admin_client()
                     client.auth.admin.delete_user(user_id)
                     auth_deleted_count += 1
-                    print(f"✅ Deleted auth user {user_id}")
                 except Exception as auth_error:
                     auth_failed_count += 1
-                    print(f"⚠️ Auth user deletion failed for {user_id}: {auth_error}")
+                    log.warning("admin.batch_delete.auth_failed", user_id=user_id, error=auth_error)
         else:
-            print(f"⚠️ Service Role Key not available - cannot delete auth users")
+            log.warning("admin.batch_delete.no_service_role", count=len(user_ids))
             return {
                 "message": "사용자 프로필은 삭제되었으나 Auth 계정 삭제 실패 (Service Role Key 필요)",
                 "deleted_portfolios": len(pf_response.data) if pf_response.data else 0,
@@ -189,7 +179,7 @@ def batch_delete_users(user_ids: list[str], admin_email: str = Depends(verify_ad
             "auth_deletion_failed": auth_failed_count
         }
     except Exception as e:
-        print(f"❌ Batch delete failed: {e}")
+        log.exception("admin.batch_delete_failed", error=e)
         raise HTTPException(status_code=500, detail=f"일괄 삭제 실패: {str(e)}")
 
 # --- 공지사항 관리 (Notices) ---
@@ -220,7 +210,7 @@ def get_active_notices():
         response = client.table('notices').select('*').eq('is_active', True).order('created_at', desc=True).execute()
         return response.data
     except Exception as e:
-        print(f"❌ Active notices error: {e}")
+        log.exception("notices.active_failed", error=e)
         return []
 
 def create_notice(notice: NoticeCreate, admin_email: str = Depends(verify_admin)):
@@ -263,36 +253,95 @@ def delete_notice(notice_id: str, admin_email: str = Depends(verify_admin)):
 
 # --- AI 사용량 통계 (AI Stats) ---
 
+# PostgREST 오류 코드: 스키마 캐시에 없는 테이블 / 컬럼 (PostgREST 12 이전은 PostgreSQL 42P01)
+MISSING_TABLE_CODES = ("PGRST205", "42P01")
+MISSING_COLUMN_CODE = "PGRST204"
+
+def _error_code(e):
+    """supabase-py(postgrest.APIError) 오류의 code, 다른 예외면 None"""
+    return getattr(e, "code", None)
+
+_rollups_table = True
+
 def get_ai_stats(period: str = 'daily', admin_email: str = Depends(verify_admin)):
-    """AI 사용량 통계 조회"""
+    """
+    AI 사용량 통계 조회
+    period: hourly | daily | weekly (ai_rollups.PERIODS)
+    버킷 집계(ai_usage_rollups)를 읽으므로 로그 수와 관계없이 일정한 비용.
+    집계 테이블이 없는 DB(마이그레이션 전)에서는 기간 안의 최근 원본 로그 1000건으로 계산
+    (기간 조건이 있으므로 파티션된 ai_logs에서는 최근 날짜 파티션만 읽음)
+    """
+    global _rollups_table
     try:
-        # Note: Supabase-py client doesn't support complex aggregations effectively without RPC.
-        # For MVP, we will fetch raw logs and aggregate in Python (not efficient for large scale, but fine for now).
-        # Or we can just count total rows for today.
-        
-        # 최근 30일 로그 조회
         client = get_admin_client()
-        response = client.table('ai_logs').select('*').order('created_at', desc=True).limit(1000).execute()
+        if _rollups_table:
+            try:
+                stats = ai_rollups.summarize(ai_rollups.fetch(client, period), period)
+                stats["source"] = "rollups"
+                return stats
+            except Exception as e:
+                if _error_code(e) not in MISSING_TABLE_CODES:
+                    raise
+                _rollups_table = False
+                log.warning("admin.rollups_missing", migration="migrations/add_ai_usage_rollups.sql")
+
+        _, since = ai_rollups.window(period)
+        response = client.table('ai_logs').select('*').gte('created_at', since.isoformat()) \
+            .order('created_at', desc=True).limit(1000).execute()
         logs = response.data
         
         stats = {
+            "source": "raw_logs",
             "total_requests": len(logs),
             "by_type": {},
-            "by_model": {}
+            "by_model": {},
+            "by_status": {},
+            "by_cache": {},
         }
         
-        for log in logs:
-            p_type = log.get('prompt_type', 'unknown')
-            model = log.get('model_name', 'unknown')
+        for row in logs:
+            p_type = row.get('prompt_type', 'unknown')
+            model = row.get('model_name', 'unknown')
             
             stats['by_type'][p_type] = stats['by_type'].get(p_type, 0) + 1
             stats['by_model'][model] = stats['by_model'].get(model, 0) + 1
-            
+            status = row.get('status') or 'unknown'
+            stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
+            if row.get('cache_status'):
+                stats['by_cache'][row['cache_status']] = stats['by_cache'].get(row['cache_status'], 0) + 1
+
+        # 지연/토큰 백분위 (전체 + prompt_type별, 지표가 있는 로그만)
+        stats['latency'] = _telemetry_summary(logs)
+        stats['latency_by_type'] = {
+            p_type: _telemetry_summary([row for row in logs if row.get('prompt_type') == p_type])
+            for p_type in stats['by_type']
+        }
         return stats
     except Exception as e:
-        print(f"❌ AI Stats error: {e}")
+        log.exception("admin.ai_stats_failed", error=e)
         return {"total_requests": 0, "by_type": {}, "by_model": {}, "error": str(e)}
 
+def _percentile(ordered, pct):
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, -(-pct * len(ordered) // 100) - 1))
+    return ordered[index]
+
+def _telemetry_summary(logs):
+    """{지표: {"p50", "p95", "p99", "count"}} + 토큰 합계"""
+    summary = {}
+    for field in ("queue_wait_ms", "ttft_ms", "latency_ms"):
+        ordered = sorted(row[field] for row in logs if row.get(field) is not None)
+        summary[field] = {
+            "count": len(ordered),
+            "p50": _percentile(ordered, 50),
+            "p95": _percentile(ordered, 95),
+            "p99": _percentile(ordered, 99),
+        }
+    for field in ("prompt_tokens", "completion_tokens"):
+        summary[field] = sum(row.get(field) or 0 for row in logs)
+    return summary
+
 
 # --- 템플릿 관리 (Template Config) ---
 
@@ -308,7 +357,7 @@ def get_template_configs(admin_email: str = None):
         config_map = {item['key']: item['is_active'] for item in response.data}
         return config_map
     except Exception as e:
-        print(f"❌ Template config error: {e}")
+        log.exception("templates.config_failed", error=e)
         return {} # 실패 시 빈 설정 반환 (모두 활성 간주)
 
 def update_template_config(key: str, config: TemplateConfigUpdate, admin_email: str = Depends(verify_admin)):
@@ -326,21 +375,49 @@ def update_template_config(key: str, config: TemplateConfigUpdate, admin_email:
         raise HTTPException(status_code=500, detail=f"템플릿 설정 저장 실패: {str(e)}")
 
 
-def log_ai_usage(prompt_type: str, model_name: str = "gemini-flash", status: str = "success", user_id: str = None):
-    """AI 사용 로그 기록 (비동기 처리 권장되나 MVP는 동기 실행)"""
+# LLM 호출 지표 컬럼 (migrations/add_ai_logs_telemetry.sql)
+AI_LOG_TELEMETRY_FIELDS = ("queue_wait_ms", "ttft_ms", "latency_ms", "prompt_tokens", "completion_tokens",
+                           "cache_status", "error_type")
+_telemetry_columns = True
+
+def _insert_ai_logs(rows):
+    """ai_logs bulk insert (ai_log_writer의 백그라운드 태스크에서 호출)"""
+    global _telemetry_columns
+    client = get_supabase()
+    if not _telemetry_columns:
+        rows = [{k: v for k, v in row.items() if k not in AI_LOG_TELEMETRY_FIELDS} for row in rows]
     try:
-        data = {
-            "prompt_type": prompt_type,
-            "model_name": model_name,
-            "status": status
-        }
-        if user_id:
-            data['user_id'] = user_id
-            
-        client = get_supabase()
-        client.table('ai_logs').insert(data).execute()
+        client.table('ai_logs').insert(rows).execute()
     except Exception as e:
-        print(f"⚠️ AI Logging failed: {e}")
+        # 마이그레이션 전 DB (지표 컬럼 없음: "Could not find the 'ttft_ms' column ...") → 기본 컬럼만 저장
+        # 다른 오류(NOT NULL 위반 등)로 지표 컬럼을 끄지 않도록 PostgREST 오류 코드와 컬럼 이름까지 확인
+        if not _telemetry_columns or _error_code(e) != MISSING_COLUMN_CODE or \
+                not any(f"'{field}'" in str(e) for field in AI_LOG_TELEMETRY_FIELDS):
+            raise
+        _telemetry_columns = False
+        log.warning("ai_logs.telemetry_columns_missing", migration="migrations/add_ai_logs_telemetry.sql")
+        _insert_ai_logs(rows)
+
+# 요청 경로에서는 버퍼에 넣기만 하고 모아서 저장 (main lifespan 종료 시 flush)
+ai_log_writer = BufferedWriter("AI Logging", _insert_ai_logs)
+
+def log_ai_usage(prompt_type: str, model_name: str = "gemini-flash", status: str = "success", user_id: str = None,
+                 telemetry: dict = None):
+    """
+    AI 사용 로그 기록 (I/O 없이 버퍼에 적재, 실제 저장은 백그라운드에서 묶어서)
+    telemetry: llm_calls가 채운 호출 지표 (AI_LOG_TELEMETRY_FIELDS)
+    """
+    telemetry = telemetry or {}
+    ai_log_writer.add({
+        "prompt_type": prompt_type,
+        "model_name": model_name,
+        "status": status,
+        "user_id": user_id,
+        # 저장이 늦어져도 요청 시각으로 기록
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        # bulk insert는 모든 행의 컬럼이 같아야 하므로 없는 값도 None으로 채움
+        **{field: telemetry.get(field) for field in AI_LOG_TELEMETRY_FIELDS},
+    })
 
 def get_all_portfolios(skip: int = 0, limit: int = 50, search: str = None, admin_email: str = Depends(verify_admin)):
     """포트폴리오 목록 조회"""
@@ -375,5 +452,5 @@ def get_all_portfolios(skip: int = 0, limit: int = 50, search: str = None, admin
         
         return {"portfolios": portfolios_data, "total": total, "skip": skip, "limit": limit}
     except Exception as e:
-        print(f"❌ Portfolios list error: {e}")
+        log.exception("admin.portfolios_list_failed", error=e)
         raise HTTPException(status_code=500, detail=f"포트폴리오 목록 조회 실패: {str(e)}")
@@ -0,0 +1,164 @@
+"""
+Gemini 호출 입장 제어 (적응형 동시 실행 한도 + 대기열)
+
+- 동시 실행 한도는 AIMD로 조정: 정상 응답이면 천천히(+1/한도) 늘리고,
+  429/과부하 응답이나 목표 지연 초과면 곱셈으로 줄인다
+- 한도를 넘은 요청은 크기가 정해진 FIFO 대기열에서 기다리고, 대기열이 가득 찼거나
+  기한(LLM_QUEUE_TIMEOUT) 안에 차례가 오지 않으면 LLMBusyError로 바로 거절한다
+
+환경 변수
+- LLM_MAX_CONCURRENCY / LLM_MIN_CONCURRENCY: 한도 상한/하한 (기본 32 / 2)
+- LLM_QUEUE_SIZE: 대기열 크기 (기본 64)
+- LLM_QUEUE_TIMEOUT: 대기 기한 초 (기본 15)
+- LLM_LATENCY_TARGET: 이보다 느린 응답이 이어지면 한도를 줄임, 초 (기본 20)
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "2"))
+LLM_QUEUE_SIZE = int(os.getenv("LLM_QUEUE_SIZE", "64"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "15"))
+LLM_LATENCY_TARGET = float(os.getenv("LLM_LATENCY_TARGET", "20"))
+
+# 곱셈 감소 비율 (429/과부하, 목표 지연 초과)
+THROTTLE_BACKOFF = 0.5
+LATENCY_BACKOFF = 0.9
+
+_THROTTLE_ERRORS = {"GoogleRateLimitError", "ModelRateLimitError", "ResourceExhausted", "TooManyRequests",
+                    "ServiceUnavailable"}
+_THROTTLE_MARKERS = ("429", "RESOURCE_EXHAUSTED", "503", "UNAVAILABLE", "overloaded")
+
+
+class LLMBusyError(Exception):
+    """대기열이 가득 찼거나 기한 안에 차례가 오지 않음 (retry_after: 권장 재시도 간격, 초)"""
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_throttled(error):
+    """Gemini 쿼터 초과(429)/일시 과부하(503) 응답인지"""
+    if any(cls.__name__ in _THROTTLE_ERRORS for cls in type(error).__mro__):
+        return True
+    message = str(error)
+    return any(marker in message for marker in _THROTTLE_MARKERS)
+
+
+class AdaptiveLimiter:
+    def __init__(self, max_limit=LLM_MAX_CONCURRENCY, min_limit=LLM_MIN_CONCURRENCY,
+                 queue_size=LLM_QUEUE_SIZE, queue_timeout=LLM_QUEUE_TIMEOUT, latency_target=LLM_LATENCY_TARGET):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.latency_ewma = None
+        self._waiters = deque()
+        self._last_decrease = 0.0
+        self.counters = {"admitted": 0, "queued": 0, "rejected_full": 0, "rejected_timeout": 0,
+                         "throttled": 0, "decreases": 0}
+
+    def _capacity(self):
+        return max(self.min_limit, int(self.limit))
+
+    def retry_after(self):
+        """거절 시 안내할 재시도 간격 (평균 응답 시간 기준, 최소 1초)"""
+        return max(1, math.ceil(self.latency_ewma or 1))
+
+    def has_spare_capacity(self):
+        """대기 없이 바로 실행할 수 있는지 (헤징 요청은 여유가 있을 때만 보냄)"""
+        return self.in_flight < self._capacity() and not self._waiters
+
+    async def acquire(self, timeout=None):
+        """슬롯을 얻을 때까지 대기. 대기열이 가득 찼거나 기한을 넘기면 LLMBusyError"""
+        if self.in_flight < self._capacity() and not self._waiters:
+            self.in_flight += 1
+            self.counters["admitted"] += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self.counters["rejected_full"] += 1
+            raise LLMBusyError("AI 요청이 몰려 대기열이 가득 찼습니다.", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.counters["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            self.counters["rejected_timeout"] += 1
+            if waiter.done():
+                # 기한과 동시에 슬롯을 받은 경우 반납
+                self._give_back()
+            else:
+                waiter.cancel()
+            raise LLMBusyError("AI 요청 대기 시간이 초과되었습니다.", self.retry_after()) from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._give_back()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+        self.counters["admitted"] += 1
+
+    def release(self, outcome, latency=None):
+        """
+        슬롯 반납과 한도 조정
+        outcome: "success" | "throttled" | "error" | "cancelled"
+        """
+        self.in_flight -= 1
+        now = time.monotonic()
+        if latency is not None and outcome == "success":
+            self.latency_ewma = latency if self.latency_ewma is None else self.latency_ewma * 0.8 + latency * 0.2
+
+        if outcome == "throttled":
+            self.counters["throttled"] += 1
+            self._decrease(THROTTLE_BACKOFF, now)
+        elif outcome == "success":
+            if latency is not None and latency > self.latency_target:
+                self._decrease(LATENCY_BACKOFF, now)
+            else:
+                # 한도만큼 성공하면 +1 (AIMD의 가산 증가)
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._wake()
+
+    def _decrease(self, factor, now):
+        # 같은 혼잡 구간의 연속 실패로 한도가 바닥까지 떨어지지 않도록 평균 응답 시간(최소 1초)에 한 번만 감소
+        if now - self._last_decrease < max(1.0, self.latency_ewma or 0):
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * factor)
+        self.counters["decreases"] += 1
+
+    def _give_back(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < self._capacity():
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(True)
+
+    def stats(self):
+        return {
+            "limit": round(self.limit, 2),
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "queue_size": self.queue_size,
+            "latency_ewma_s": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+            **self.counters,
+        }
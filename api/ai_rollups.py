@@ -0,0 +1,129 @@
+"""
+AI 사용량 집계(rollup) 조회 (/api/admin/stats/ai)
+
+ai_logs에 로그가 들어올 때마다 DB 트리거가 시간/일/주 버킷 × prompt_type × model_name × status 카운터를 증가시킨다
+(migrations/add_ai_usage_rollups.sql). 여기서는 기간에 해당하는 버킷 행만 읽어 합치므로
+원본 로그 수와 관계없이 조회 비용이 일정하다.
+- period: hourly(최근 24시간) | daily(최근 30일) | weekly(최근 12주)
+- 지연 백분위는 버킷 히스토그램으로 근사 (해당 구간의 상한 ms)
+- 집계가 어긋났으면 api/backfill_ai_rollups.py로 원본 로그에서 다시 계산
+"""
+from datetime import datetime, timedelta, timezone
+
+TABLE = "ai_usage_rollups"
+REBUILD_FUNCTION = "rebuild_ai_usage_rollups"
+
+# period → (버킷 단위, 버킷 수)
+PERIODS = {
+    "hourly": ("hour", 24),
+    "daily": ("day", 30),
+    "weekly": ("week", 12),
+}
+DEFAULT_PERIOD = "daily"
+
+# 지연 히스토그램 구간 상한 (ms) → 컬럼 latency_le_<상한>, 마지막 구간 latency_gt_<상한>
+LATENCY_BOUNDS_MS = (250, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+LATENCY_COLUMNS = tuple(f"latency_le_{bound}" for bound in LATENCY_BOUNDS_MS) + (f"latency_gt_{LATENCY_BOUNDS_MS[-1]}",)
+
+# 평균 지표: 이름 → (합계 컬럼, 개수 컬럼)
+AVERAGES = {
+    "queue_wait_ms": ("queue_wait_ms_sum", "queue_wait_count"),
+    "ttft_ms": ("ttft_ms_sum", "ttft_count"),
+    "latency_ms": ("latency_ms_sum", "latency_count"),
+}
+CACHE_COLUMNS = {"hit": "cache_hit", "shared": "cache_shared", "miss": "cache_miss"}
+
+
+def bucket_start(moment, granularity):
+    """moment가 속한 버킷의 시작 시각 (UTC, 주는 월요일 시작 - Postgres date_trunc와 같음)"""
+    moment = moment.astimezone(timezone.utc)
+    start = moment.replace(minute=0, second=0, microsecond=0)
+    if granularity in ("day", "week"):
+        start = start.replace(hour=0)
+    if granularity == "week":
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def window(period, now=None):
+    """period → (버킷 단위, 첫 버킷 시작 시각). 모르는 period는 daily"""
+    granularity, buckets = PERIODS.get(period, PERIODS[DEFAULT_PERIOD])
+    step = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}[granularity]
+    current = bucket_start(now or datetime.now(timezone.utc), granularity)
+    return granularity, current - step * (buckets - 1)
+
+
+def fetch(client, period):
+    """기간에 해당하는 버킷 행 (행 수 = 버킷 수 × 조합 수, 로그 수와 무관)"""
+    granularity, since = window(period)
+    response = client.table(TABLE).select("*") \
+        .eq("granularity", granularity) \
+        .gte("bucket_start", since.isoformat()) \
+        .execute()
+    return response.data
+
+
+def _histogram_percentile(histogram, pct):
+    total = sum(histogram)
+    if not total:
+        return None
+    target = -(-pct * total // 100)
+    seen = 0
+    for bound, count in zip(LATENCY_BOUNDS_MS + (LATENCY_BOUNDS_MS[-1],), histogram):
+        seen += count
+        if seen >= target:
+            return bound
+    return LATENCY_BOUNDS_MS[-1]
+
+
+def _latency_summary(rows):
+    """{지표: {"count", "avg"}} (+ latency_ms는 p50/p95/p99 근사) + 토큰 합계"""
+    summary = {}
+    for name, (sum_column, count_column) in AVERAGES.items():
+        count = sum(row.get(count_column) or 0 for row in rows)
+        total = sum(row.get(sum_column) or 0 for row in rows)
+        summary[name] = {"count": count, "avg": round(total / count) if count else None}
+    histogram = [sum(row.get(column) or 0 for row in rows) for column in LATENCY_COLUMNS]
+    for pct in (50, 95, 99):
+        summary["latency_ms"][f"p{pct}"] = _histogram_percentile(histogram, pct)
+    for field in ("prompt_tokens", "completion_tokens"):
+        summary[field] = sum(row.get(field) or 0 for row in rows)
+    return summary
+
+
+def summarize(rows, period):
+    """버킷 행 → get_ai_stats 응답 (total_requests/by_type/by_model/by_status/by_cache/latency + 버킷별 요청 수)"""
+    granularity, since = window(period)
+    stats = {
+        "period": period if period in PERIODS else DEFAULT_PERIOD,
+        "granularity": granularity,
+        "since": since.isoformat(),
+        "total_requests": 0,
+        "by_type": {},
+        "by_model": {},
+        "by_status": {},
+        "by_cache": {},
+        "series": {},
+    }
+    by_type_rows = {}
+    for row in rows:
+        requests = row.get("requests") or 0
+        stats["total_requests"] += requests
+        for key, field in (("by_type", "prompt_type"), ("by_model", "model_name"), ("by_status", "status")):
+            stats[key][row[field]] = stats[key].get(row[field], 0) + requests
+        for name, column in CACHE_COLUMNS.items():
+            if row.get(column):
+                stats["by_cache"][name] = stats["by_cache"].get(name, 0) + row[column]
+        stats["series"][row["bucket_start"]] = stats["series"].get(row["bucket_start"], 0) + requests
+        by_type_rows.setdefault(row["prompt_type"], []).append(row)
+
+    stats["series"] = dict(sorted(stats["series"].items()))
+    stats["latency"] = _latency_summary(rows)
+    stats["latency_by_type"] = {p_type: _latency_summary(type_rows) for p_type, type_rows in by_type_rows.items()}
+    return stats
+
+
+def rebuild(client, since=None):
+    """since(주 시작으로 내림) 이후 버킷을 원본 로그에서 다시 계산. since가 None이면 전체 → 재계산한 버킷 행 수"""
+    response = client.rpc(REBUILD_FUNCTION, {"since": since.isoformat() if since else None}).execute()
+    return response.data
@@ -0,0 +1,66 @@
+"""
+AI 사용량 집계(ai_usage_rollups) 백필 스크립트
+ai_logs 원본 로그로 시간/일/주 버킷을 다시 계산합니다. (migrations/add_ai_usage_rollups.sql 적용 후)
+보존 기간이 지나 원본이 지워진 주는 건너뜁니다 (migrations/partition_ai_logs.sql).
+
+사용법
+  python backfill_ai_rollups.py              # 전체 재계산
+  python backfill_ai_rollups.py --days 7     # 최근 7일(주 시작으로 내림)만 재계산
+  python backfill_ai_rollups.py --since 2025-01-01
+"""
+import argparse
+import os
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+from supabase import create_client
+
+import ai_rollups
+
+load_dotenv()
+
+parser = argparse.ArgumentParser(description="Rebuild ai_usage_rollups from ai_logs")
+group = parser.add_mutually_exclusive_group()
+group.add_argument("--days", type=int, help="최근 N일만 재계산")
+group.add_argument("--since", help="이 날짜(YYYY-MM-DD, UTC) 이후만 재계산")
+args = parser.parse_args()
+
+since = None
+if args.days is not None:
+    since = datetime.now(timezone.utc) - timedelta(days=args.days)
+elif args.since:
+    since = datetime.fromisoformat(args.since).replace(tzinfo=timezone.utc)
+
+# Supabase 클라이언트 초기화
+supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
+service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+if not supabase_url or not service_key:
+    print("❌ Supabase credentials not found")
+    exit(1)
+
+supabase = create_client(supabase_url, service_key)
+
+print("=" * 60)
+print("AI 사용량 집계 백필")
+print("=" * 60)
+
+if since:
+    start = ai_rollups.bucket_start(since, "week")
+    print(f"\n📋 Rebuilding buckets since {start.isoformat()} (week start of {since.date()})...")
+else:
+    print("\n📋 Rebuilding all buckets from ai_logs...")
+
+try:
+    rebuilt = ai_rollups.rebuild(supabase, since)
+    print(f"✅ Rebuilt {rebuilt} bucket rows")
+except Exception as e:
+    print(f"❌ Rebuild failed: {e}")
+    print("   migrations/add_ai_usage_rollups.sql 적용 여부를 확인하세요")
+    exit(1)
+
+# 검증: 기간별 요청 수
+print("\n📊 Requests by period")
+for period in ai_rollups.PERIODS:
+    stats = ai_rollups.summarize(ai_rollups.fetch(supabase, period), period)
+    print(f"   - {period}: {stats['total_requests']} requests since {stats['since']}")
@@ -0,0 +1,255 @@
+"""
+콜드 스타트 / import 시간 벤치마크
+
+매 측정마다 새 인터프리터(`python -X importtime`)를 띄워
+- 모듈별 import 시간 (실행 횟수에 대한 중앙값, 최상위 패키지별 합계)
+- `/api/health`, `/chat`, `/save-portfolio` 첫 응답까지의 시간 (로컬 대체물 사용)
+- 최대 RSS
+를 측정하고 비교 가능한 JSON 리포트로 저장한다.
+
+대체물: LLM은 langchain_core의 FakeListChatModel, DB는 임시 디렉토리의 SQLite,
+Supabase는 자격 증명을 비워 네트워크 호출 없이 실패하도록 둔다.
+
+사용법:
+    python bench_cold_start.py --runs 5 --output bench_report.json
+    python bench_cold_start.py --compare bench_report.json   # 회귀 시 exit code 1
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+REPORT_VERSION = 1
+IMPORT_DONE_MARKER = "BENCH_IMPORT_DONE"
+BENCH_EMAIL = "bench@moodfolio.local"
+
+# 측정 대상 요청 (경로마다 새 인스턴스에서 첫 요청으로 측정)
+SCENARIOS = {
+    "/api/health": ("GET", None),
+    "/chat": ("POST", {"message": "포트폴리오 소개를 부탁해요", "portfolio_context": "이름: 벤치\n직무: 개발자"}),
+    "/save-portfolio": ("POST", {"email": BENCH_EMAIL, "portfolio_data": {"hero": {"title": "bench"}}}),
+}
+
+CHILD_SCRIPT = r"""
+import json, sys, time
+started = time.perf_counter()
+import main
+import_ms = (time.perf_counter() - started) * 1000
+sys.stderr.write("%s\n" % MARKER)
+sys.stderr.flush()
+
+import clients
+
+def _stand_in_llm():
+    # 실제 Gemini 대신 로컬 모델 (langchain import 비용은 그대로 측정됨)
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    return FakeListChatModel(responses=["벤치마크 응답입니다."])
+
+clients._create_llm = _stand_in_llm
+
+from fastapi.testclient import TestClient
+client = TestClient(main.app)
+method, path, body = json.loads(sys.argv[1])
+t = time.perf_counter()
+response = client.request(method, path, json=body)
+first_response_ms = (time.perf_counter() - t) * 1000
+
+try:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS는 bytes, Linux는 KB 단위
+    peak_rss_kb = peak // 1024 if sys.platform == "darwin" else peak
+except ImportError:
+    peak_rss_kb = None
+
+print("BENCH_RESULT " + json.dumps({
+    "import_ms": round(import_ms, 2),
+    "first_response_ms": round(first_response_ms, 2),
+    "status": response.status_code,
+    "peak_rss_kb": peak_rss_kb,
+}))
+""".replace("MARKER", repr(IMPORT_DONE_MARKER))
+
+
+def seed_database(work_dir):
+    """`/save-portfolio`가 404가 아닌 실제 저장 경로를 타도록 벤치용 사용자 생성"""
+    conn = sqlite3.connect(os.path.join(work_dir, "users.db"))
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, email VARCHAR UNIQUE, "
+        "password VARCHAR, name VARCHAR, portfolio_data VARCHAR)"
+    )
+    conn.execute("INSERT OR IGNORE INTO users (email, password, name) VALUES (?, 'x', 'bench')", (BENCH_EMAIL,))
+    conn.commit()
+    conn.close()
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력 → (import 단계, 첫 요청 단계) 모듈별 {name: (self_us, cumulative_us)}"""
+    phases = ({}, {})
+    phase = 0
+    for line in stderr.splitlines():
+        if line.strip() == IMPORT_DONE_MARKER:
+            phase = 1
+            continue
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+            phases[phase][name] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return phases
+
+
+def run_once(path, work_dir):
+    method, body = SCENARIOS[path]
+    env = dict(os.environ)
+    # 외부 서비스 대신 로컬 대체물을 쓰도록 자격 증명 제거
+    for key in ("NEXT_PUBLIC_SUPABASE_URL", "NEXT_PUBLIC_SUPABASE_ANON_KEY", "SUPABASE_SERVICE_ROLE_KEY",
+                "SUPABASE_DB_PASSWORD", "VERCEL", "AWS_LAMBDA_FUNCTION_NAME"):
+        env.pop(key, None)
+    env["GOOGLE_API_KEY"] = "bench-stand-in"
+    env["PYTHONPATH"] = API_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    env["PYTHONIOENCODING"] = "utf-8"
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT, json.dumps([method, path, body])],
+        cwd=work_dir, env=env, capture_output=True, text=True, encoding="utf-8",
+    )
+    result = None
+    for line in proc.stdout.splitlines():
+        if line.startswith("BENCH_RESULT "):
+            result = json.loads(line[len("BENCH_RESULT "):])
+    if result is None:
+        raise RuntimeError(f"{path} 측정 실패 (exit {proc.returncode}):\n{proc.stderr[-2000:]}")
+    result["imports"], result["request_imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def _median(values):
+    values = [v for v in values if v is not None]
+    return round(statistics.median(values), 2) if values else None
+
+
+def aggregate_imports(samples, top):
+    """실행별 모듈 import 시간을 중앙값으로 합치고 최상위 패키지별로 묶는다"""
+    per_module = {}
+    for sample in samples:
+        for name, (self_us, cumulative_us) in sample.items():
+            per_module.setdefault(name, ([], []))
+            per_module[name][0].append(self_us)
+            per_module[name][1].append(cumulative_us)
+
+    modules = {
+        name: {"self_ms": round(statistics.median(s) / 1000, 2), "cumulative_ms": round(statistics.median(c) / 1000, 2)}
+        for name, (s, c) in per_module.items()
+    }
+    packages = {}
+    for name, stats in modules.items():
+        root = name.split(".")[0]
+        packages[root] = round(packages.get(root, 0) + stats["self_ms"], 2)
+
+    top_modules = dict(sorted(modules.items(), key=lambda kv: kv[1]["self_ms"], reverse=True)[:top])
+    top_packages = dict(sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top])
+    return {
+        "total_self_ms": round(sum(m["self_ms"] for m in modules.values()), 2),
+        "main_cumulative_ms": modules.get("main", {}).get("cumulative_ms"),
+        "packages": top_packages,
+        "modules": top_modules,
+    }
+
+
+def run_benchmark(runs, top):
+    report = {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": runs,
+        "scenarios": {},
+    }
+    import_samples = []
+    for path in SCENARIOS:
+        results = []
+        for _ in range(runs):
+            with tempfile.TemporaryDirectory() as work_dir:
+                seed_database(work_dir)
+                results.append(run_once(path, work_dir))
+        import_samples.extend(r["imports"] for r in results)
+        report["scenarios"][path] = {
+            "status": results[-1]["status"],
+            "import_ms": _median([r["import_ms"] for r in results]),
+            "first_response_ms": _median([r["first_response_ms"] for r in results]),
+            "cold_total_ms": _median([r["import_ms"] + r["first_response_ms"] for r in results]),
+            "peak_rss_kb": _median([r["peak_rss_kb"] for r in results]),
+            # 첫 요청이 추가로 끌어온 모듈 (지연 로딩된 서브시스템)
+            "request_imports": aggregate_imports([r["request_imports"] for r in results], top),
+        }
+        print(f"⏱️ {path}: import {report['scenarios'][path]['import_ms']}ms, "
+              f"first response {report['scenarios'][path]['first_response_ms']}ms, "
+              f"peak RSS {report['scenarios'][path]['peak_rss_kb']}KB")
+    report["import"] = aggregate_imports(import_samples, top)
+    return report
+
+
+def compare_reports(baseline, current, threshold_pct, min_delta_ms):
+    """기준 리포트 대비 회귀 목록 (상대/절대 기준을 모두 넘을 때만 회귀로 판단)"""
+    regressions = []
+
+    def check(label, before, after):
+        if before is None or after is None:
+            return
+        delta = after - before
+        if delta > min_delta_ms and before > 0 and delta / before * 100 > threshold_pct:
+            regressions.append(f"{label}: {before}ms → {after}ms (+{delta / before * 100:.0f}%)")
+
+    for path, current_stats in current["scenarios"].items():
+        baseline_stats = baseline.get("scenarios", {}).get(path)
+        if not baseline_stats:
+            continue
+        for key in ("import_ms", "first_response_ms", "cold_total_ms"):
+            check(f"{path} {key}", baseline_stats.get(key), current_stats.get(key))
+    check("main cumulative import", baseline.get("import", {}).get("main_cumulative_ms"),
+          current["import"]["main_cumulative_ms"])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FastAPI 앱 콜드 스타트 벤치마크")
+    parser.add_argument("--runs", type=int, default=3, help="시나리오별 새 인터프리터 실행 횟수")
+    parser.add_argument("--top", type=int, default=25, help="리포트에 남길 상위 모듈/패키지 수")
+    parser.add_argument("--output", default="bench_report.json", help="JSON 리포트 저장 경로")
+    parser.add_argument("--compare", help="비교할 기준 JSON 리포트")
+    parser.add_argument("--threshold", type=float, default=20.0, help="회귀로 판단할 증가율(%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=30.0, help="회귀로 판단할 최소 증가량(ms)")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.runs, args.top)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📄 Report saved: {args.output}")
+
+    print("📦 Slowest packages at import (self ms):")
+    for name, ms in list(report["import"]["packages"].items())[:10]:
+        print(f"   {name:<32} {ms:>8.1f}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report, args.threshold, args.min_delta_ms)
+        if regressions:
+            for regression in regressions:
+                print(f"❌ Regression {regression}")
+            sys.exit(1)
+        print("✅ No cold-start regression against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+버퍼링 백그라운드 기록기 (요청 경로에서 I/O 없이 로그 적재)
+
+요청 처리 중에는 add()로 메모리 버퍼에 넣기만 하고(마이크로초), 백그라운드 태스크가
+크기(LOG_BATCH_SIZE) 또는 시간(LOG_FLUSH_INTERVAL) 기준으로 모아서 한 번에 bulk insert 한다.
+- 버퍼는 크기가 정해져 있고(LOG_BUFFER_SIZE) 가득 차면 가장 오래된 기록부터 버림 (drop_oldest)
+- 저장 실패한 배치는 한 번만 다시 버퍼 앞쪽에 넣고, 또 실패하면 버림
+- 종료(lifespan shutdown) 시 남은 기록을 모두 저장
+
+서버리스 인스턴스는 응답 뒤 멈출 수 있으므로 기록이 저장되기까지 최대 LOG_FLUSH_INTERVAL 늦어질 수 있다.
+
+환경 변수
+- LOG_BUFFER_SIZE: 버퍼 최대 기록 수 (기본 1000)
+- LOG_BATCH_SIZE: 한 번에 저장할 기록 수 (기본 50)
+- LOG_FLUSH_INTERVAL: 최대 저장 간격 초 (기본 2)
+"""
+import asyncio
+import os
+import threading
+from collections import deque
+
+from starlette.concurrency import run_in_threadpool
+
+import structured_logging
+import tracing
+
+log = structured_logging.get_logger("writer")
+
+LOG_BUFFER_SIZE = int(os.getenv("LOG_BUFFER_SIZE", "1000"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "50"))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "2"))
+
+
+class BufferedWriter:
+    def __init__(self, name, insert_batch, buffer_size=LOG_BUFFER_SIZE, batch_size=LOG_BATCH_SIZE,
+                 flush_interval=LOG_FLUSH_INTERVAL):
+        """insert_batch: 기록 리스트를 한 번에 저장하는 동기 함수 (스레드에서 실행)"""
+        self.name = name
+        self.insert_batch = insert_batch
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._buffer = deque(maxlen=max(1, buffer_size))
+        self._lock = threading.Lock()
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+        self.counters = {"added": 0, "written": 0, "dropped": 0, "failed_batches": 0}
+
+    def add(self, record):
+        """기록 적재 (I/O 없음, 어느 스레드에서나 호출 가능)"""
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.counters["dropped"] += 1
+            self._buffer.append(record)
+            self.counters["added"] += 1
+            full = len(self._buffer) >= self.batch_size
+        self._ensure_task()
+        if full and self._wakeup is not None and not self._wakeup.is_set():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _ensure_task(self):
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 이벤트 루프 밖(스레드풀의 동기 핸들러)에서 처음 호출됨 → 다음 비동기 호출이나 flush()에서 저장
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        # 첫 add()는 보통 요청 안에서 호출됨 → 그 요청의 trace를 물려받지 않도록 빈 컨텍스트에서 시작
+        self._task = tracing.detached_task(self._run())
+
+    def _take(self):
+        with self._lock:
+            count = min(self.batch_size, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(count)]
+
+    async def _write(self, batch, retry=True):
+        try:
+            await run_in_threadpool(self.insert_batch, batch)
+            self.counters["written"] += len(batch)
+        except Exception as e:
+            self.counters["failed_batches"] += 1
+            if retry:
+                # 버퍼 앞쪽에 되돌려 다음 주기에 한 번 더 시도 (자리가 없으면 버림)
+                with self._lock:
+                    room = self._buffer.maxlen - len(self._buffer)
+                    self._buffer.extendleft(reversed(batch[:room]))
+                    self.counters["dropped"] += len(batch) - min(room, len(batch))
+                log.warning("writer.batch_failed", writer=self.name, records=len(batch), retry=True, error=e)
+            else:
+                self.counters["dropped"] += len(batch)
+                log.warning("writer.batch_dropped", writer=self.name, records=len(batch), error=e)
+            return False
+        return True
+
+    async def _run(self):
+        retried = False
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while True:
+                batch = self._take()
+                if not batch:
+                    break
+                ok = await self._write(batch, retry=not retried)
+                retried = not ok and not retried
+                if not ok or len(batch) < self.batch_size:
+                    break
+
+    async def flush(self):
+        """버퍼에 남은 기록을 모두 저장 (종료 시)"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        while True:
+            batch = self._take()
+            if not batch:
+                break
+            await self._write(batch, retry=False)
+
+    def stats(self):
+        return {"buffered": len(self._buffer), **self.counters}
@@ -0,0 +1,124 @@
+"""
+챗봇 대화 세션 (포트폴리오 컨텍스트 등록 + 최근 대화 기록)
+
+클라이언트는 포트폴리오 컨텍스트를 한 번 등록하고 받은 context_id(내용 해시)만 매 턴 보낸다.
+- 컨텍스트: response_cache 2계층 저장소 (메모리 LRU + 같은 인스턴스의 SQLite), TTL 후 만료
+- 대화 기록: session_id별 최근 N턴, 메모리 LRU (인스턴스가 바뀌면 새 대화로 시작)
+  세션은 등록한 포트폴리오(context_id)에 묶인다: 다른 포트폴리오로 같은 session_id를 쓰면 이전 기록을 주지 않고 새 대화로 시작
+다른 인스턴스로 요청이 가서 context_id를 찾지 못하면 ContextNotFound → 클라이언트가 다시 등록한다.
+
+환경 변수
+- CHAT_CONTEXT_CACHE_SIZE / CHAT_CONTEXT_TTL: 메모리에 둘 컨텍스트 수 / 보관 시간 초 (기본 256 / 21600)
+- CHAT_SESSION_MAX / CHAT_SESSION_TTL: 대화 기록을 둘 세션 수 / 마지막 대화 후 보관 시간 초 (기본 1024 / 3600)
+- CHAT_HISTORY_TURNS: 프롬프트에 넣을 최근 대화 턴 수 (기본 4)
+"""
+import hashlib
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+
+import response_cache
+
+CHAT_CONTEXT_TTL = int(os.getenv("CHAT_CONTEXT_TTL", "21600"))
+CHAT_SESSION_MAX = int(os.getenv("CHAT_SESSION_MAX", "1024"))
+CHAT_SESSION_TTL = int(os.getenv("CHAT_SESSION_TTL", "3600"))
+CHAT_HISTORY_TURNS = int(os.getenv("CHAT_HISTORY_TURNS", "4"))
+# 한 턴(질문/답변)에서 기록에 남길 최대 글자 수
+HISTORY_MAX_CHARS = 600
+
+contexts = response_cache.get_cache(
+    "chat_contexts",
+    max_entries=int(os.getenv("CHAT_CONTEXT_CACHE_SIZE", "256")),
+    ttl_seconds=CHAT_CONTEXT_TTL,
+)
+
+_sessions = OrderedDict()  # session_id -> {"context_id", "turns", "touched"}
+_lock = threading.Lock()
+_stats = {"registered": 0, "context_misses": 0, "sessions_evicted": 0, "sessions_reset": 0}
+
+
+class ContextNotFound(Exception):
+    """context_id가 만료됐거나 다른 인스턴스에서 등록됨 → 다시 등록 필요"""
+
+
+def context_id_for(context):
+    return hashlib.sha256(response_cache.normalize_text(context).encode("utf-8")).hexdigest()[:32]
+
+
+def register(context, session_id=None):
+    """컨텍스트 등록 → (context_id, session_id). 같은 내용이면 같은 context_id"""
+    context_id = context_id_for(context)
+    if contexts.get(context_id) is None:
+        contexts.set(context_id, context)
+    _stats["registered"] += 1
+    with _lock:
+        session = _sessions.get(session_id) if session_id else None
+        if session is None:
+            session_id = secrets.token_urlsafe(16)
+            session = {"context_id": context_id, "turns": deque(maxlen=CHAT_HISTORY_TURNS), "touched": time.time()}
+            _sessions[session_id] = session
+        elif session["context_id"] != context_id:
+            # 포트폴리오가 바뀌면 이전 대화는 맞지 않으므로 비움
+            session["context_id"] = context_id
+            session["turns"].clear()
+        _touch(session_id, session)
+    return context_id, session_id
+
+
+async def get_context(context_id):
+    context = await contexts.aget(context_id)
+    if context is None:
+        _stats["context_misses"] += 1
+        raise ContextNotFound(context_id)
+    return context
+
+
+def history(session_id, context_id):
+    """프롬프트용 최근 대화 [("human", 질문), ("ai", 답변), ...] (context_id: 이번 요청의 포트폴리오)"""
+    if not session_id:
+        return []
+    with _lock:
+        session = _sessions.get(session_id)
+        if session is None or time.time() - session["touched"] > CHAT_SESSION_TTL:
+            return []
+        if session["context_id"] != context_id:
+            # 다른 포트폴리오의 대화는 넘기지 않음 (다음 record_turn에서 새 대화로 시작)
+            return []
+        messages = []
+        for question, answer in session["turns"]:
+            messages.extend((("human", question), ("ai", answer)))
+        return messages
+
+
+def record_turn(session_id, context_id, question, answer):
+    if not session_id:
+        return
+    with _lock:
+        session = _sessions.get(session_id)
+        if session is None:
+            return
+        if session["context_id"] != context_id:
+            session["context_id"] = context_id
+            session["turns"].clear()
+            _stats["sessions_reset"] += 1
+        session["turns"].append((question[:HISTORY_MAX_CHARS], answer[:HISTORY_MAX_CHARS]))
+        _touch(session_id, session)
+
+
+def _touch(session_id, session):
+    session["touched"] = time.time()
+    _sessions.move_to_end(session_id)
+    now = session["touched"]
+    # 오래된 세션부터 정리 (LRU + TTL)
+    while _sessions:
+        oldest_id, oldest = next(iter(_sessions.items()))
+        if len(_sessions) <= CHAT_SESSION_MAX and now - oldest["touched"] <= CHAT_SESSION_TTL:
+            break
+        del _sessions[oldest_id]
+        _stats["sessions_evicted"] += 1
+
+
+def stats():
+    return {"sessions": len(_sessions), "contexts": contexts.stats(), **_stats}
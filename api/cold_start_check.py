@@ -0,0 +1,120 @@
+"""
+콜드 스타트 예산 점검 스크립트
+
+새 인터프리터에서 main을 import 하고 lifespan(시작 워밍업 포함)을 실행한 채로
+/api/health, /api/notices/active 를 호출한 뒤
+- import + lifespan 시작 시간이 예산(COLD_START_BUDGET_MS, 기본 800ms) 안인지
+- 백그라운드 워밍업(readiness.WARMUP_SUBSYSTEMS)이 예산 안에 끝나고, 허용된 모듈만 로드하는지
+- 요청별로 허용되지 않은 무거운 서브시스템(clients.HEAVY_MODULES)이 로드되지 않았는지
+확인한다. 예산을 넘으면 exit code 1.
+
+사용법: python cold_start_check.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGET_MS = float(os.getenv("COLD_START_BUDGET_MS", "800"))
+
+# 경로별로 로드가 허용되는 무거운 모듈 (공지사항은 Supabase HTTP 클라이언트만 사용)
+ALLOWED_HEAVY = {
+    "/api/health": (),
+    "/api/notices/active": ("supabase",),
+}
+# 기본 워밍업(db)이 로드해도 되는 모듈 (요청과 동시에 진행되므로 요청 중 로드 목록에도 허용)
+ALLOWED_WARMUP_HEAVY = ("sqlalchemy",)
+WARMUP_TIMEOUT_S = 30
+
+CHILD_SCRIPT = r"""
+import json, sys, time
+started = time.perf_counter()
+import main
+import_ms = (time.perf_counter() - started) * 1000
+import readiness
+from clients import HEAVY_MODULES
+from fastapi.testclient import TestClient
+
+def loaded_heavy():
+    return sorted(m for m in HEAVY_MODULES if m in sys.modules)
+
+report = {"import_ms": round(import_ms, 1), "heavy_after_import": loaded_heavy(), "requests": {}}
+started = time.perf_counter()
+# with 블록: lifespan 실행 (배포 인스턴스처럼 시작 워밍업이 돈다)
+with TestClient(main.app) as client:
+    report["startup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    for path in json.loads(sys.argv[1]):
+        t = time.perf_counter()
+        status = client.get(path).status_code
+        report["requests"][path] = {
+            "status": status,
+            "ms": round((time.perf_counter() - t) * 1000, 1),
+            "heavy_loaded": loaded_heavy(),
+        }
+    deadline = time.perf_counter() + float(sys.argv[2])
+    while readiness.snapshot()["warming"] and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    snapshot = readiness.snapshot()
+    report["warm_up"] = {
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+        "finished": not snapshot["warming"],
+        "checks": {name: check["status"] for name, check in snapshot["checks"].items()},
+        "heavy_loaded": loaded_heavy(),
+    }
+print("COLD_START_REPORT " + json.dumps(report))
+"""
+
+
+def readiness_subsystems():
+    return os.getenv("WARMUP_SUBSYSTEMS", "db (default)")
+
+
+def run_fresh_interpreter(paths):
+    """새 프로세스에서 측정 (이미 import 된 모듈 캐시의 영향을 받지 않도록)"""
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, json.dumps(paths), str(WARMUP_TIMEOUT_S)],
+        cwd=API_DIR, capture_output=True, text=True, encoding="utf-8",
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith("COLD_START_REPORT "):
+            return json.loads(line[len("COLD_START_REPORT "):])
+    raise RuntimeError(f"측정 실패 (exit {proc.returncode}):\n{proc.stderr}")
+
+
+def main():
+    failures = []
+    # 경로마다 별도 인스턴스로 측정해야 앞선 요청이 로드한 모듈이 섞이지 않는다
+    for path, allowed in ALLOWED_HEAVY.items():
+        report = run_fresh_interpreter([path])
+        result = report["requests"][path]
+        warm_up = report["warm_up"]
+        unexpected = [m for m in result["heavy_loaded"] if m not in allowed and m not in ALLOWED_WARMUP_HEAVY]
+        warm_up_unexpected = [m for m in warm_up["heavy_loaded"] if m not in allowed and m not in ALLOWED_WARMUP_HEAVY]
+        startup_total = round(report["import_ms"] + report["startup_ms"], 1)
+        print(f"{path}: import {report['import_ms']}ms, startup {report['startup_ms']}ms, "
+              f"first response {result['ms']}ms, heavy={result['heavy_loaded']}")
+        print(f"   warm-up {warm_up['ms']}ms {warm_up['checks']}, heavy={warm_up['heavy_loaded']}")
+
+        if report["heavy_after_import"]:
+            failures.append(f"`import main` loaded {report['heavy_after_import']}")
+        if unexpected:
+            failures.append(f"{path} loaded {unexpected}")
+        if startup_total > BUDGET_MS:
+            failures.append(f"import + startup took {startup_total}ms (budget {BUDGET_MS:.0f}ms)")
+        if not warm_up["finished"]:
+            failures.append(f"warm-up did not finish within {WARMUP_TIMEOUT_S}s")
+        elif warm_up["ms"] > BUDGET_MS:
+            failures.append(f"warm-up took {warm_up['ms']}ms (budget {BUDGET_MS:.0f}ms)")
+        if warm_up_unexpected:
+            failures.append(f"warm-up loaded {warm_up_unexpected} (WARMUP_SUBSYSTEMS={readiness_subsystems()})")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print(f"✅ Cold start within budget ({BUDGET_MS:.0f}ms)")
+
+
+if __name__ == "__main__":
+    main()
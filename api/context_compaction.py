@@ -0,0 +1,161 @@
+"""
+토큰 예산에 맞춘 포트폴리오 컨텍스트 압축
+
+프로젝트가 많은 포트폴리오는 프롬프트가 길어져 응답이 느려지므로, 엔드포인트별 토큰 예산을 넘으면
+정해진 순서의 단계를 하나씩 적용해 예산 안으로 줄인다 (같은 입력 → 항상 같은 결과).
+  1. 공백 정리, 중복 줄 제거 (여러 프로젝트에 복사한 긴 설명 포함)
+  2. 긴 `상세:` 설명 자르기 (800 → 400 → 150자)
+  3. 긴 줄 자르기 (300자)
+  4. 가치가 낮은 섹션 제거 (관심 분야 → 기타 섹션 → 뒤쪽 프로젝트부터)
+  5. 그래도 넘으면 예산 위치에서 자르기
+
+토큰 수는 로컬 추정치: 한글/CJK 문자는 1자 ≈ 1토큰, 그 외 공백이 아닌 문자는 4자 ≈ 1토큰 (보수적으로 크게 잡음)
+
+환경 변수
+- CONTEXT_TOKEN_BUDGET_<PROMPT_TYPE>: prompt_type별 예산 (예: CONTEXT_TOKEN_BUDGET_MUMU=3000)
+"""
+import math
+import os
+import re
+
+import portfolio_sections
+from response_cache import normalize_text
+
+DEFAULT_BUDGETS = {
+    "popo": 3000,
+    "mumu": 3000,
+    "chat_answers": 6000,
+    "chat_answers_partial": 6000,
+    "portfolio": 1500,
+}
+DETAIL_LIMITS = (800, 400, 150)
+LINE_LIMIT = 300
+DEDUPE_MIN_CHARS = 80
+# 먼저 버리는 섹션 (앞쪽일수록 가치가 낮음). 프로젝트는 그 다음 뒤에서부터 하나씩
+DROP_ORDER = ("keywords", "other")
+
+_WIDE = re.compile(r"[\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+_SPACE = re.compile(r"\s")
+_DETAIL_PREFIX = "상세:"
+_ELLIPSIS = "…"
+
+
+def estimate_tokens(text):
+    if not text:
+        return 0
+    wide = len(_WIDE.findall(text))
+    spaces = len(_SPACE.findall(text))
+    return wide + math.ceil((len(text) - wide - spaces) / 4)
+
+
+def budget_for(prompt_type):
+    value = os.getenv(f"CONTEXT_TOKEN_BUDGET_{prompt_type.upper()}")
+    return int(value) if value else DEFAULT_BUDGETS.get(prompt_type, 4000)
+
+
+def _join(sections):
+    return "\n\n".join(section["text"] for section in sections if section["text"])
+
+
+def _dedupe(sections):
+    """
+    섹션 안의 같은 줄 제거 + 여러 섹션에 복사해 넣은 긴 줄(DEDUPE_MIN_CHARS 이상)은 처음 한 번만 유지
+    짧은 필드(`역할: 백엔드` 등)는 프로젝트마다 의미가 있으므로 섹션 사이에서는 지우지 않음. 헤더 줄은 유지
+    """
+    seen_long = set()
+    for section in sections:
+        lines, seen_lines = [], set()
+        for index, line in enumerate(section["text"].split("\n")):
+            key = line.strip()
+            if index > 0 and key:
+                if key in seen_lines or key in seen_long:
+                    continue
+                seen_lines.add(key)
+                if len(key) >= DEDUPE_MIN_CHARS:
+                    seen_long.add(key)
+            lines.append(line)
+        section["text"] = "\n".join(lines)
+
+
+def _truncate_detail(sections, limit):
+    """프로젝트의 `상세:` 설명(마지막 필드, 여러 줄일 수 있음)을 limit자로 자름"""
+    for section in sections:
+        if section["kind"] != "project":
+            continue
+        text = section["text"]
+        position = text.find("\n" + _DETAIL_PREFIX)
+        if position < 0:
+            continue
+        head, detail = text[:position + 1], text[position + 1:]
+        if len(detail) > limit + len(_DETAIL_PREFIX):
+            section["text"] = head + detail[:limit + len(_DETAIL_PREFIX)].rstrip() + _ELLIPSIS
+
+
+def _truncate_lines(sections, limit):
+    for section in sections:
+        section["text"] = "\n".join(
+            line if len(line) <= limit else line[:limit].rstrip() + _ELLIPSIS
+            for line in section["text"].split("\n")
+        )
+
+
+def _drop_steps(sections):
+    """제거 후보 목록 (순서대로 하나씩 적용)"""
+    steps = []
+    for kind in DROP_ORDER:
+        for section in sections:
+            if section["kind"] == kind or (kind == "other" and section["kind"] == "preamble" and len(sections) > 1):
+                steps.append((f"drop:{section['id']}", section))
+    projects = [section for section in sections if section["kind"] == "project"]
+    # 첫 번째 프로젝트는 남김 (대표 프로젝트)
+    for section in reversed(projects[1:]):
+        steps.append((f"drop:{section['id']}", section))
+    return steps
+
+
+def compact(context, budget):
+    """
+    (압축한 컨텍스트, 보고서) 반환
+    보고서: {"original_tokens", "tokens", "tokens_trimmed", "budget", "steps"}
+    """
+    original_tokens = estimate_tokens(context)
+    report = {"original_tokens": original_tokens, "tokens": original_tokens, "tokens_trimmed": 0,
+              "budget": budget, "steps": []}
+    if not context or original_tokens <= budget:
+        return context, report
+
+    sections = portfolio_sections.split_sections(normalize_text(context))
+
+    def fits():
+        return estimate_tokens(_join(sections)) <= budget
+
+    _dedupe(sections)
+    report["steps"].append("dedupe")
+    # 섹션 구조가 없는 자유 텍스트(경력 요약 등)는 중복 제거 후 바로 예산 위치에서 자름
+    structured = any(section["kind"] != "preamble" for section in sections)
+    if structured and not fits():
+        for limit in DETAIL_LIMITS:
+            _truncate_detail(sections, limit)
+            report["steps"].append(f"detail:{limit}")
+            if fits():
+                break
+    if structured and not fits():
+        _truncate_lines(sections, LINE_LIMIT)
+        report["steps"].append(f"lines:{LINE_LIMIT}")
+    if structured and not fits():
+        for name, section in _drop_steps(sections):
+            section["text"] = ""
+            report["steps"].append(name)
+            if fits():
+                break
+
+    text = _join(sections)
+    if estimate_tokens(text) > budget:
+        # 마지막 수단: 예산 비율만큼 앞부분만 사용
+        ratio = budget / estimate_tokens(text)
+        text = text[:int(len(text) * ratio)].rstrip() + _ELLIPSIS
+        report["steps"].append("cut")
+
+    report["tokens"] = estimate_tokens(text)
+    report["tokens_trimmed"] = max(0, original_tokens - report["tokens"])
+    return text, report
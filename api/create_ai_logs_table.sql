@@ -1,11 +1,20 @@
 -- AI 사용 로그 테이블 생성
+-- 운영 DB는 날짜별 파티션 테이블로 전환 (migrations/partition_ai_logs.sql)
 CREATE TABLE IF NOT EXISTS ai_logs (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     prompt_type TEXT NOT NULL,
     model_name TEXT DEFAULT 'gemini-flash',
     status TEXT DEFAULT 'success',
     user_id UUID REFERENCES auth.users(id) ON DELETE SET NULL,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    -- LLM 호출 지표 (기존 테이블은 migrations/add_ai_logs_telemetry.sql)
+    queue_wait_ms INTEGER,
+    ttft_ms INTEGER,
+    latency_ms INTEGER,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    cache_status TEXT,
+    error_type TEXT
 );
 
 -- 인덱스 생성 (성능 향상)
@@ -0,0 +1,161 @@
+"""
+SQLAlchemy 데이터베이스 서브시스템
+DB가 필요한 요청에서 처음 import 될 때 엔진과 세션 팩토리를 만든다 (main.get_db 참고)
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, event, Column, DateTime, Integer, String, Text, text
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+import structured_logging
+import tracing
+from clients import SQLALCHEMY_DATABASE_URL
+
+# 모델(테이블/인덱스)을 바꾸면 올려서 다음 배포에서 스키마 점검이 다시 실행되게 한다
+SCHEMA_VERSION = "2"
+# 배포 단위 식별자 (Vercel 배포 ID → 커밋 SHA → 로컬)
+DEPLOYMENT_ID = os.getenv("VERCEL_DEPLOYMENT_ID") or os.getenv("VERCEL_GIT_COMMIT_SHA") or "local"
+
+log = structured_logging.get_logger("database")
+
+if SQLALCHEMY_DATABASE_URL.startswith("postgresql"):
+    log.info("database.selected", backend="postgresql", pooler=True)
+else:
+    # Supabase 자격 증명이 없으면 SQLite로 대체 (서버리스는 /tmp/users.db)
+    log.warning("database.sqlite_fallback", reason="Supabase credentials not found",
+                serverless=SQLALCHEMY_DATABASE_URL.startswith("sqlite:////tmp"))
+
+# PostgreSQL은 check_same_thread 옵션이 필요 없음
+if SQLALCHEMY_DATABASE_URL.startswith("postgresql"):
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True)
+else:
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+# SQL 실행 시간 → 요청 trace의 "db" 구간 (Server-Timing)
+# 시작 시각은 실행 컨텍스트(쿼리 1회)에 둔다: 쿼리가 실패하면 after_cursor_execute가 불리지 않으므로
+# 연결(conn.info)에 쌓으면 풀에 돌아간 연결에 남아 다음 쿼리 시간과 잘못 짝지어짐
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = context._query_start
+    tracing.record("db", time.perf_counter() - started, started)
+
+Base = declarative_base()
+
+# User 테이블 정의
+class User(Base):
+    __tablename__ = "users"
+    id = Column(Integer, primary_key=True, index=True)
+    email = Column(String, unique=True, index=True)
+    password = Column(String)
+    name = Column(String)
+    portfolio_data = Column(String, nullable=True)
+
+def utcnow():
+    """timezone 없는 DateTime 컬럼에 저장할 UTC 현재 시각"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+# 비동기 포트폴리오 생성 작업 (generation_jobs.py). 같은 답변(answers_hash)의 진행 중/완료 작업은 재사용
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+    id = Column(String, primary_key=True)
+    answers_hash = Column(String, index=True)
+    status = Column(String, default="queued")  # queued → running → succeeded / failed
+    result = Column(Text, nullable=True)  # 성공 시 응답 JSON
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=utcnow)
+    updated_at = Column(DateTime, default=utcnow)
+
+# 배포별 스키마 점검 기록 (인스턴스마다 create_all 왕복을 반복하지 않기 위함)
+class SchemaMarker(Base):
+    __tablename__ = "schema_markers"
+    marker = Column(String, primary_key=True)
+    applied_at = Column(DateTime, default=utcnow)
+
+
+_schema_lock = threading.Lock()
+_schema_status = None
+_marker_key = f"{DEPLOYMENT_ID}:{SCHEMA_VERSION}"
+# SQLite는 로컬 파일이라 왕복 비용이 없고 DB 파일이 지워질 수 있으므로 임시 파일 마커는 PostgreSQL에서만 사용
+_local_marker = None if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else os.path.join(
+    tempfile.gettempdir(),
+    "moodfolio_schema_" + hashlib.sha1(f"{SQLALCHEMY_DATABASE_URL}|{_marker_key}".encode()).hexdigest()[:16],
+)
+
+
+def ensure_schema():
+    """
+    배포(DEPLOYMENT_ID)+SCHEMA_VERSION당 한 번만 create_all 실행
+    - 같은 인스턴스: 메모리/임시 파일 마커로 DB 왕복 없이 통과
+    - 다른 인스턴스: schema_markers 단건 조회 1회로 통과
+    반환값: "cached" | "verified" | "created" | "failed"
+    """
+    global _schema_status
+    if _schema_status in ("cached", "verified", "created"):
+        return _schema_status
+    with _schema_lock:
+        if _schema_status in ("cached", "verified", "created"):
+            return _schema_status
+        if _local_marker and os.path.exists(_local_marker):
+            _schema_status = "cached"
+            return _schema_status
+        try:
+            try:
+                with engine.connect() as conn:
+                    found = conn.execute(
+                        text("SELECT 1 FROM schema_markers WHERE marker = :marker"), {"marker": _marker_key}
+                    ).first()
+            except Exception:
+                found = None  # 마커 테이블이 아직 없음
+
+            if found:
+                _schema_status = "verified"
+            else:
+                Base.metadata.create_all(bind=engine)
+                db = SessionLocal()
+                try:
+                    db.merge(SchemaMarker(marker=_marker_key))
+                    db.commit()
+                except Exception:
+                    db.rollback()  # 다른 인스턴스가 동시에 기록한 경우
+                finally:
+                    db.close()
+                _schema_status = "created"
+                log.info("database.schema_created", deployment=DEPLOYMENT_ID)
+            if _local_marker:
+                try:
+                    open(_local_marker, "w").close()
+                except OSError:
+                    pass
+        except Exception as e:
+            _schema_status = "failed"
+            log.exception("database.schema_failed", error=e, impact="non-critical for Admin APIs")
+            # We continue running because Admin APIs use Supabase HTTP Client, not this SQLAlchemy connection
+    return _schema_status
+
+
+def warm_pool(size=1):
+    """커넥션 풀에 size개 연결을 미리 열어 둔다 (첫 요청의 TCP/TLS 핸드셰이크 제거)"""
+    connections = []
+    try:
+        for _ in range(max(1, size)):
+            conn = engine.connect()
+            conn.execute(text("SELECT 1"))
+            connections.append(conn)
+    finally:
+        for conn in connections:
+            conn.close()
+    return len(connections)
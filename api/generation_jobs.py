@@ -0,0 +1,230 @@
+"""
+비동기 포트폴리오 생성 작업 (결과 저장소)
+
+/submit 요청이 `Prefer: respond-async`이면 생성이 끝날 때까지 클라이언트를 기다리게 하지 않고 작업 ID만 바로 돌려준다.
+- 작업 상태/결과는 generation_jobs 테이블에 저장 (로컬 SQLite, 배포 PostgreSQL)
+- 같은 답변(answers_hash)으로 진행 중이거나 완료된 작업이 있으면 새로 만들지 않고 그 작업을 돌려줌 (재시도/더블 클릭)
+- 작업은 접수한 요청의 BackgroundTask로 run(job_id) 실행: 응답(202)을 보낸 뒤 같은 요청(ASGI 호출) 안에서 생성한다
+  서버리스(Vercel)는 요청 처리가 끝나면 인스턴스를 멈추므로, 요청과 무관한 상주 워커에 맡기면 작업이 진행되지 않을 수 있다
+  → 호출이 끝날 때까지 인스턴스가 살아 있도록 접수 요청에 묶어 둔다 (함수 최대 실행 시간 안에서만 완료 보장)
+- 동시에 생성하는 작업은 JOB_WORKERS개까지, 나머지는 대기 (queued)
+- 그래도 끝나지 못한 작업(인스턴스 종료, 시간 초과)은 JOB_STALE_SECONDS 뒤 실패로 보고 → 클라이언트가 다시 제출하면 새 작업
+
+환경 변수
+- JOB_WORKERS: 동시에 실행할 작업 수 (기본 4)
+- JOB_QUEUE_SIZE: 이 인스턴스에서 대기/실행 중일 수 있는 작업 수, 넘으면 LLMBusyError (기본 100)
+- JOB_STALE_SECONDS: 이 시간 동안 갱신이 없는 대기/실행 작업은 중단된 것으로 봄 (기본 180)
+- JOB_RESULT_TTL: 완료된 작업 결과를 중복 제출에 재사용하는 시간 초 (기본 86400)
+"""
+import asyncio
+import json
+import os
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+
+from starlette.concurrency import run_in_threadpool
+
+import structured_logging
+import tracing
+from admission import LLMBusyError
+
+log = structured_logging.get_logger("jobs")
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "180"))
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "86400"))
+
+ACTIVE_STATUSES = ("queued", "running")
+STALE_ERROR = "작업이 중단되었습니다. 다시 요청해 주세요."
+
+_slots = None  # 동시 실행 상한 (asyncio.Semaphore, 첫 요청의 이벤트 루프에서 생성)
+_submit_lock = None  # 같은 인스턴스에서 같은 답변이 동시에 들어와도 작업은 하나만 생성
+_runners = {}  # job_id -> 코루틴 함수 (이 인스턴스에서 대기/실행 중인 작업)
+_running = set()
+_stats = {"submitted": 0, "deduplicated": 0, "succeeded": 0, "failed": 0}
+
+
+def _utcnow():
+    """DB 컬럼(timezone 없는 DateTime)에 맞춘 UTC 현재 시각"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _isoformat(moment):
+    return moment.replace(tzinfo=timezone.utc).isoformat() if moment else None
+
+
+def _to_dict(job):
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "created_at": _isoformat(job.created_at),
+        "updated_at": _isoformat(job.updated_at),
+    }
+
+
+def _is_stale(job, now):
+    return job.status in ACTIVE_STATUSES and job.id not in _runners and \
+        (now - (job.updated_at or job.created_at)).total_seconds() > JOB_STALE_SECONDS
+
+
+def _expire(db, job, now):
+    job.status = "failed"
+    job.error = STALE_ERROR
+    job.updated_at = now
+    db.commit()
+
+
+# --- DB 작업 (동기 함수, 스레드에서 실행) ---
+def _find_or_create(answers_hash):
+    """(작업 dict, 새로 만들었는지)"""
+    from database import GenerationJob, SessionLocal, ensure_schema
+    ensure_schema()
+    now = _utcnow()
+    db = SessionLocal()
+    try:
+        candidates = (
+            db.query(GenerationJob)
+            .filter(GenerationJob.answers_hash == answers_hash, GenerationJob.status != "failed")
+            .order_by(GenerationJob.created_at.desc())
+            .limit(3)
+            .all()
+        )
+        for job in candidates:
+            if _is_stale(job, now):
+                _expire(db, job, now)
+                continue
+            if job.status == "succeeded" and now - job.updated_at > timedelta(seconds=JOB_RESULT_TTL):
+                continue
+            return _to_dict(job), False
+        job = GenerationJob(id=secrets.token_urlsafe(12), answers_hash=answers_hash, status="queued",
+                            created_at=now, updated_at=now)
+        db.add(job)
+        db.commit()
+        return _to_dict(job), True
+    finally:
+        db.close()
+
+
+def _update(job_id, status, result=None, error=None):
+    from database import GenerationJob, SessionLocal
+    db = SessionLocal()
+    try:
+        job = db.get(GenerationJob, job_id)
+        if job is None:
+            return
+        job.status = status
+        job.updated_at = _utcnow()
+        if result is not None:
+            job.result = json.dumps(result, ensure_ascii=False)
+        if error is not None:
+            job.error = error[:500]
+        db.commit()
+    finally:
+        db.close()
+
+
+def _load(job_id):
+    from database import GenerationJob, SessionLocal, ensure_schema
+    ensure_schema()
+    db = SessionLocal()
+    try:
+        job = db.get(GenerationJob, job_id)
+        if job is None:
+            return None
+        now = _utcnow()
+        if _is_stale(job, now):
+            _expire(db, job, now)
+        return _to_dict(job)
+    finally:
+        db.close()
+
+
+# --- 실행 ---
+async def run(job_id):
+    """
+    작업 실행 (접수 요청의 BackgroundTask). 슬롯이 빌 때까지 queued로 대기
+    요청 trace와 분리된 컨텍스트에서 실행 (응답을 보낸 뒤의 생성 구간이 /submit trace에 섞이지 않도록)
+    """
+    await tracing.detached_task(_execute(job_id))
+
+
+async def _execute(job_id):
+    runner = _runners.get(job_id)
+    if runner is None:
+        return
+    try:
+        async with _slots:
+            _running.add(job_id)
+            await run_in_threadpool(_update, job_id, "running")
+            started = time.perf_counter()
+            try:
+                result = await runner()
+            except Exception as e:
+                _stats["failed"] += 1
+                log.exception("jobs.failed", job_id=job_id, error=e)
+                await run_in_threadpool(_update, job_id, "failed", error=str(e) or type(e).__name__)
+            else:
+                _stats["succeeded"] += 1
+                log.info("jobs.succeeded", job_id=job_id, seconds=round(time.perf_counter() - started, 1))
+                await run_in_threadpool(_update, job_id, "succeeded", result=result)
+    except Exception as e:
+        # 상태 저장 실패 (DB 오류) → 작업은 JOB_STALE_SECONDS 뒤 실패로 보임
+        log.exception("jobs.update_failed", job_id=job_id, error=e)
+    finally:
+        _running.discard(job_id)
+        _runners.pop(job_id, None)
+
+
+def _ensure_primitives():
+    global _slots, _submit_lock
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(1, JOB_WORKERS))
+        _submit_lock = asyncio.Lock()
+
+
+async def submit(answers_hash, runner):
+    """
+    작업 등록 → (작업 dict, 새로 만들었는지)
+    runner: 결과 dict를 돌려주는 코루틴 함수 (새 작업일 때만 실행)
+    새 작업이면 호출한 쪽이 응답의 BackgroundTask로 run(job_id)를 실행해야 한다
+    """
+    _ensure_primitives()
+    if len(_runners) >= JOB_QUEUE_SIZE:
+        raise LLMBusyError("생성 작업이 몰려 대기열이 가득 찼습니다.", JOB_STALE_SECONDS // 6)
+    async with _submit_lock:
+        job, created = await run_in_threadpool(_find_or_create, answers_hash)
+    if not created:
+        _stats["deduplicated"] += 1
+        return job, False
+    _stats["submitted"] += 1
+    _runners[job["job_id"]] = runner
+    return job, True
+
+
+async def get(job_id):
+    return await run_in_threadpool(_load, job_id)
+
+
+async def shutdown():
+    """종료 시 정리 (요청이 끝나지 못해 대기/실행 중으로 남은 작업은 실패로 기록)"""
+    unfinished = list(_runners)
+    for job_id in unfinished:
+        try:
+            await run_in_threadpool(_update, job_id, "failed", error=STALE_ERROR)
+        except Exception:
+            pass
+    _runners.clear()
+
+
+def stats():
+    return {
+        "workers": max(1, JOB_WORKERS),
+        "running": len(_running),
+        "queued": len(_runners) - len(_running),
+        "in_progress": len(_runners),
+        **_stats,
+    }
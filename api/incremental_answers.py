@@ -0,0 +1,110 @@
+"""
+AI 채팅 답변(12문항) 증분 재생성
+
+마지막으로 답변한 포트폴리오의 섹션 해시와 답변을 저장해 두고, 새 컨텍스트와 비교해
+바뀐 섹션에 영향을 받는 문항만 다시 생성한다. 나머지 답변은 그대로 재사용한다.
+이전 상태는 로그인한 사용자(Supabase 토큰으로 확인한 id)별로만 저장/조회한다.
+클라이언트가 보낸 이메일/이름 같은 값은 다른 사용자와 겹치거나 위조될 수 있으므로 키로 쓰지 않는다.
+"""
+import hashlib
+
+import portfolio_sections
+import response_cache
+
+# 답변 키 순서 (응답 JSON 순서 유지)
+ANSWER_KEYS = (
+    "core_skills", "main_stack", "tech_depth", "documentation",
+    "role_contribution", "collaboration", "cycle", "artifacts",
+    "best_project", "troubleshooting", "decision_making", "quantitative_performance",
+)
+
+# 문항별 의존 섹션과 프로젝트 범위
+# - "all": 모든 프로젝트를 요약하는 답변 → 프로젝트가 하나라도 바뀌면 재생성
+# - "mentioned": 특정 프로젝트를 골라 말하는 답변 → 답변에 언급된 프로젝트가 바뀌거나 삭제되면 재생성
+QUESTION_DEPENDENCIES = {
+    "core_skills": (("owner", "skills", "career"), "all"),
+    "main_stack": (("skills",), "all"),
+    "tech_depth": (("skills",), "mentioned"),
+    "documentation": ((), "mentioned"),
+    "role_contribution": ((), "all"),
+    "collaboration": ((), "mentioned"),
+    "cycle": ((), "mentioned"),
+    "artifacts": (("contact",), "mentioned"),
+    "best_project": ((), "mentioned"),
+    "troubleshooting": ((), "mentioned"),
+    "decision_making": ((), "mentioned"),
+    "quantitative_performance": (("career",), "mentioned"),
+}
+
+state_store = response_cache.get_cache("chat_answers_state", max_entries=128, ttl_seconds=30 * 86400)
+
+
+def lineage_key(user_id, portfolio_id=None):
+    """
+    같은 사용자의 이전 답변을 찾기 위한 키
+    user_id: 인증된 사용자 id (없으면 None → 증분 재사용 없이 전체 생성)
+    portfolio_id: 한 사용자의 여러 포트폴리오 구분용 (사용자 범위 안에서만 의미)
+    """
+    if not user_id:
+        return None
+    return hashlib.sha256(f"{user_id}\n{(portfolio_id or '').strip()}".encode("utf-8")).hexdigest()
+
+
+async def load_state(key):
+    return await state_store.aget(key) if key else None
+
+
+async def save_state(key, sections, answers):
+    if key:
+        await state_store.aset(key, {
+            "fingerprint": portfolio_sections.fingerprint(sections),
+            "titles": {s["id"]: s["title"] for s in sections if s["kind"] == "project"},
+            "answers": answers,
+        })
+
+
+def plan_regeneration(state, sections):
+    """
+    (다시 생성할 키 목록, 재사용할 답변 dict)
+    이전 상태가 없거나 답변이 빠져 있으면 전체 재생성
+    """
+    if not state or not state.get("answers"):
+        return list(ANSWER_KEYS), {}
+
+    previous_answers = state["answers"]
+    current = portfolio_sections.fingerprint(sections)
+    added, removed, changed = portfolio_sections.diff_fingerprints(state["fingerprint"], current)
+    touched = added | removed | changed
+
+    # "project:제목" → "project", "career" → "career"
+    kinds = {s["id"]: s["kind"] for s in sections}
+    touched_kinds = {kinds.get(sid, sid.split(":", 1)[0]) for sid in touched}
+    # 구조를 알 수 없는 텍스트가 바뀌면 어떤 문항에 영향이 있는지 판단할 수 없으므로 전체 재생성
+    if touched_kinds & {"preamble", "other"}:
+        return list(ANSWER_KEYS), {}
+
+    project_touched = "project" in touched_kinds
+    previous_titles = state.get("titles", {})
+    # 바뀌거나 삭제된 프로젝트 제목 (이 제목을 언급한 답변은 다시 써야 함)
+    stale_titles = {
+        previous_titles.get(sid) or sid.split(":", 1)[1]
+        for sid in (changed | removed) if sid.startswith("project:")
+    }
+    current_titles = [s["title"] for s in sections if s["kind"] == "project"]
+
+    regenerate = []
+    for key in ANSWER_KEYS:
+        answer = previous_answers.get(key)
+        depends_on, scope = QUESTION_DEPENDENCIES[key]
+        if not answer or any(kind in touched_kinds for kind in depends_on):
+            regenerate.append(key)
+        elif project_touched and scope == "all":
+            regenerate.append(key)
+        elif project_touched and scope == "mentioned":
+            mentions_stale = any(title in answer for title in stale_titles)
+            # 어떤 현재 프로젝트도 언급하지 않으면 영향 여부를 알 수 없으므로 다시 생성
+            mentions_none = not any(title in answer for title in current_titles)
+            if mentions_stale or mentions_none:
+                regenerate.append(key)
+    reused = {key: previous_answers[key] for key in ANSWER_KEYS if key not in regenerate and key in previous_answers}
+    return regenerate, reused
@@ -0,0 +1,157 @@
+"""
+LLM 응답에서 JSON 객체를 한 번의 스캔으로 추출
+
+정규식(`\\{.*\\}` + re.DOTALL) 대신 중괄호 깊이와 문자열 상태만 추적하는 증분 파서.
+- 스트리밍 청크를 feed()로 넣으면 첫 번째로 완성된 최상위 객체에서 멈춘다 (이후 텍스트는 읽지 않음)
+- ```json 코드 펜스나 앞뒤 설명 문장은 자연스럽게 건너뛴다
+- 최상위 필드가 하나 완성될 때마다 돌려주므로 스트리밍 엔드포인트가 부분 결과를 바로 보낼 수 있다
+- 각 문자는 한 번만 검사하므로 응답 길이에 선형 시간
+"""
+import json
+import re
+
+# 객체 안(문자열 밖)에서 의미 있는 문자 / 문자열 안에서 의미 있는 문자
+_STRUCTURAL = re.compile(r'[{}\[\]",]')
+_IN_STRING = re.compile(r'["\\]')
+
+
+class JsonStreamExtractor:
+    """
+    사용법
+        extractor = JsonStreamExtractor(required=("best_project",))
+        for chunk in chunks:
+            for key, value in extractor.feed(chunk):
+                ...  # 완성된 최상위 필드
+            if extractor.done:
+                break
+        data = extractor.close()  # 객체 dict 또는 None (extractor.error에 이유)
+    """
+
+    def __init__(self, required=()):
+        self.required = tuple(required)
+        self.result = None
+        self.fields = {}
+        self.error = None
+        self._buffer = ""
+        self._pos = 0
+        self._start = None  # 현재 후보 객체의 '{' 위치
+        self._member_start = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def done(self):
+        return self.result is not None
+
+    def missing_keys(self):
+        """필수 키 중 아직(또는 끝내) 나오지 않았거나 값이 비어 있는 키"""
+        found = self.result if self.result is not None else self.fields
+        return [key for key in self.required if found.get(key) in (None, "")]
+
+    def feed(self, chunk):
+        """청크를 추가하고 이번에 완성된 최상위 (키, 값) 목록을 반환"""
+        if self.result is not None or not chunk:
+            return []
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+        pos = self._pos
+
+        while pos < len(buffer):
+            if self._escape:
+                self._escape = False
+                pos += 1
+                continue
+            if self._in_string:
+                match = _IN_STRING.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                pos = match.end()
+                if match.group() == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+                continue
+            if self._start is None:
+                # 객체 시작 전의 설명 문장/코드 펜스는 건너뜀
+                start = buffer.find("{", pos)
+                if start < 0:
+                    pos = len(buffer)
+                    break
+                self._start = start
+                self._member_start = start + 1
+                self._depth = 1
+                pos = start + 1
+                continue
+
+            match = _STRUCTURAL.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            char = match.group()
+            pos = match.end()
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.extend(self._finish_member(buffer, pos - 1))
+                    if self._finish_object(buffer[self._start:pos]):
+                        break
+                    # 중괄호는 맞지만 JSON이 아님 → 다음 '{'부터 다시 찾음
+                    self._start = None
+            elif char == "," and self._depth == 1:
+                completed.extend(self._finish_member(buffer, pos - 1))
+                self._member_start = pos
+
+        if self._start is None and self.result is None:
+            # 객체 밖의 텍스트는 더 이상 필요 없음
+            self._buffer = ""
+            self._pos = 0
+        else:
+            self._pos = pos
+        return completed
+
+    def _finish_member(self, buffer, end):
+        """`"키": 값` 한 개를 파싱해 fields에 기록"""
+        member = buffer[self._member_start:end].strip()
+        if not member:
+            return []
+        try:
+            parsed = json.loads("{" + member + "}")
+        except ValueError:
+            return []
+        if len(parsed) != 1:
+            return []
+        key, value = next(iter(parsed.items()))
+        self.fields[key] = value
+        return [(key, value)]
+
+    def _finish_object(self, candidate):
+        try:
+            parsed = json.loads(candidate)
+        except ValueError as e:
+            self.error = f"JSON 형식이 올바르지 않습니다: {e}"
+            self.fields = {}
+            return False
+        if not isinstance(parsed, dict):
+            self.fields = {}
+            return False
+        self.result = parsed
+        self.error = None
+        # 완성된 객체 이후 텍스트는 버림
+        self._buffer = ""
+        return True
+
+    def close(self):
+        """입력이 끝났을 때 호출. 완성된 객체 또는 None"""
+        if self.result is None and self.error is None:
+            if self._start is not None:
+                self.error = "JSON 객체가 끝나지 않았습니다."
+            else:
+                self.error = "AI 응답에서 JSON 데이터를 찾을 수 없습니다."
+        return self.result
@@ -0,0 +1,384 @@
+"""
+LLM 호출 공통 경로 (비동기)
+
+모든 AI 엔드포인트는 run_chain() / stream_chain()으로 Gemini를 호출한다.
+- 체인 최초 생성(langchain import)은 스레드에서 처리해 이벤트 루프를 막지 않는다
+- chain.ainvoke()/astream()으로 호출하므로 응답을 기다리는 동안 Starlette 스레드풀을 점유하지 않는다
+- 동시 실행 수는 admission.AdaptiveLimiter가 관리 (429/지연에 따라 한도 조정, 대기열이 차면 LLMBusyError)
+- 429/과부하 응답은 지터를 준 지수 백오프로 재시도 (스트리밍은 첫 청크 전까지만)
+- 같은 체인/같은 입력(정규화 후)으로 동시에 들어온 호출은 하나로 합친다 (singleflight)
+- prompt_type별 시간 예산과 서킷 브레이커 적용 (resilience 참고)
+- 모델은 model_router가 prompt_type/입력 크기/최근 지연으로 고른다 (호출한 쪽이 route를 넘기면 그대로 사용)
+- 호출한 쪽이 telemetry dict를 넘기면 대기열 대기/첫 토큰/전체 지연(ms), 토큰 수, 캐시 여부를 채운다 (사용량 로그용)
+- LLM_HEDGE_TYPES에 지정한 prompt_type은 p95 지연이 지나도록 응답이 없으면 같은 요청을 다른 모델로 한 번 더 보내
+  먼저 온 응답을 사용 (헤징, 기본 꺼짐)
+
+환경 변수
+- LLM_MAX_RETRIES: 429/과부하 재시도 횟수 (기본 3)
+- LLM_RETRY_BASE_DELAY / LLM_RETRY_MAX_DELAY: 백오프 시작/최대 간격 초 (기본 0.5 / 8)
+- LLM_HEDGE_TYPES: 헤징할 prompt_type 목록 (예: "popo")
+- LLM_HEDGE_PERCENTILE / LLM_HEDGE_MIN_SAMPLES: 헤징 지연 기준 백분위와 최소 표본 수 (기본 95 / 20)
+"""
+import asyncio
+import os
+import random
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+import admission
+import clients
+import metrics
+import model_router
+from context_compaction import estimate_tokens
+import resilience
+import response_cache
+import singleflight
+import structured_logging
+import tracing
+from admission import LLMBusyError
+
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+LLM_HEDGE_TYPES = [s.strip() for s in os.getenv("LLM_HEDGE_TYPES", "").split(",") if s.strip()]
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+limiter = admission.AdaptiveLimiter()
+breaker = resilience.CircuitBreaker()
+latencies = resilience.LatencyTracker()
+_stats = {"completed": 0, "failed": 0, "retries": 0, "timeouts": 0, "hedges": 0, "hedge_wins": 0}
+_coalescer = singleflight.SingleFlight()
+log = structured_logging.get_logger("llm")
+
+
+def available():
+    """지금 LLM을 부를 수 있는지 (API 키가 있고 서킷이 열려 있지 않음). 아니면 호출 없이 대체 경로 사용"""
+    return bool(clients.GOOGLE_API_KEY) and breaker.state != "open"
+
+
+async def get_chain_async(name, messages, route):
+    """clients.get_chain의 비동기 버전 (모델별 최초 1회만 스레드에서 생성)"""
+    if clients.is_initialized(clients.chain_key(name, route.model, route.temperature)):
+        return clients.get_chain(name, messages, route.model, route.temperature)
+    return await run_in_threadpool(clients.get_chain, name, messages, route.model, route.temperature)
+
+
+def _backoff(attempt):
+    """attempt번째 재시도 전 대기 시간 (full jitter)"""
+    return random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+def _finish(outcome, started, route):
+    elapsed = time.monotonic() - started
+    limiter.release(outcome, elapsed)
+    # 재시도마다 업스트림 호출 1회로 기록 (대기열 대기 제외)
+    metrics.observe_outbound("gemini", route.model, "ok" if outcome == "success" else outcome, elapsed)
+    if outcome in ("success", "cancelled"):
+        _stats["completed"] += 1
+    elif outcome != "throttled":
+        _stats["failed"] += 1
+
+
+# telemetry 합치기 규칙 (여러 호출이 같은 dict를 채울 때: 섹션별 동시 생성, 헤징, 재시도)
+_SUM_FIELDS = ("prompt_tokens", "completion_tokens")
+_MIN_FIELDS = ("ttft_ms",)
+
+
+def _observe(telemetry, **values):
+    if telemetry is None:
+        return
+    for key, value in values.items():
+        if value is None:
+            continue
+        if key in _SUM_FIELDS:
+            telemetry[key] = telemetry.get(key, 0) + value
+        elif key in _MIN_FIELDS:
+            telemetry[key] = min(telemetry.get(key, value), value)
+        elif isinstance(value, (int, float)):
+            telemetry[key] = max(telemetry.get(key, value), value)
+        else:
+            telemetry[key] = value
+
+
+def _ms(seconds):
+    return int(seconds * 1000)
+
+
+def _observe_usage(telemetry, inputs, usage, completion_text):
+    """토큰 수: 응답의 usage_metadata, 없으면 로컬 추정치"""
+    if usage:
+        _observe(telemetry, prompt_tokens=usage.get("input_tokens"), completion_tokens=usage.get("output_tokens"))
+    else:
+        _observe(telemetry, prompt_tokens=model_router.prompt_tokens(inputs),
+                 completion_tokens=estimate_tokens(completion_text))
+
+
+def _text(content):
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(item.get("text", "") if isinstance(item, dict) else str(item) for item in content)
+    return str(content or "")
+
+
+def outcome_status(error):
+    """사용량 로그의 status: success | busy | timeout | cancelled | error"""
+    if error is None:
+        return "success"
+    if isinstance(error, LLMBusyError):
+        return "busy"
+    if isinstance(error, TimeoutError):
+        return "timeout"
+    if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+        return "cancelled"
+    return "error"
+
+
+def call_key(name, inputs):
+    """합치기 키: 체인 이름 + 정규화한 입력 값"""
+    return response_cache.make_key(f"llm:{name}", *(f"{key}={inputs[key]}" for key in sorted(inputs)))
+
+
+async def coalesce(key, factory):
+    """key가 같은 호출이 진행 중이면 그 결과를 함께 받는다 (factory: 인자 없는 코루틴 함수)"""
+    return await _coalescer.do(key, factory)
+
+
+def _timeout_error(name, budget):
+    _stats["timeouts"] += 1
+    log.warning("llm.timeout", prompt_type=name, budget_s=budget)
+    return resilience.LLMTimeoutError(f"AI 응답 시간({budget:g}초)을 초과했습니다.")
+
+
+def _record_outcome(ok, route, started):
+    """ok: True/False → 브레이커/모델 지연에 기록, None(대기열 거절/취소) → 업스트림 결과 아님"""
+    if ok is None:
+        breaker.release_probe()
+    else:
+        breaker.record(ok)
+        model_router.record(route, time.monotonic() - started, ok)
+
+
+async def run_chain(name, messages, inputs, route=None, telemetry=None):
+    """
+    name 체인을 inputs로 호출하고 LLM 응답 메시지를 반환 (동일한 동시 호출은 1회로 합침)
+    route: model_router.choose() 결과 (사용 로그에 모델을 남기려면 호출한 쪽에서 골라 넘김)
+    telemetry: 호출 지표를 채울 dict (다른 요청의 호출에 합류했으면 cache_status="shared"만 기록)
+    """
+    route = route or model_router.choose(name, inputs)
+    started = time.monotonic()
+    response = await coalesce(call_key(f"{name}@{route.model}", inputs),
+                              lambda: _guarded_run(name, messages, inputs, route, telemetry))
+    mark_shared(telemetry, started)
+    return response
+
+
+def mark_shared(telemetry, started):
+    """coalesce()로 다른 요청의 호출 결과를 받은 경우 표시 + 기다린 시간 (직접 호출했으면 이미 "miss")"""
+    if telemetry is not None and "cache_status" not in telemetry:
+        telemetry.update(cache_status="shared", latency_ms=_ms(time.monotonic() - started))
+
+
+async def _guarded_run(name, messages, inputs, route, telemetry=None):
+    """브레이커 확인 → 시간 예산 안에서 호출 (헤징 대상이면 헤징)"""
+    _observe(telemetry, cache_status="miss")
+    breaker.before_call()
+    budget = resilience.timeout_for(name)
+    started = time.monotonic()
+    ok = None
+    try:
+        if name in LLM_HEDGE_TYPES:
+            call = _hedged_run(name, messages, inputs, route, telemetry)
+        else:
+            call = _run_chain(name, messages, inputs, route, telemetry)
+        response = await asyncio.wait_for(call, budget)
+        ok = True
+        latencies.record(name, time.monotonic() - started)
+        return response
+    except asyncio.TimeoutError:
+        ok = False
+        raise _timeout_error(name, budget) from None
+    except LLMBusyError:
+        raise
+    except Exception:
+        ok = False
+        raise
+    finally:
+        _observe(telemetry, latency_ms=_ms(time.monotonic() - started))
+        _record_outcome(ok, route, started)
+
+
+async def _hedged_run(name, messages, inputs, route, telemetry=None):
+    """p95 지연까지 응답이 없고 여유 슬롯이 있으면 같은 요청을 다른 모델로 하나 더 보내 먼저 성공한 응답을 사용"""
+    primary = asyncio.ensure_future(_run_chain(name, messages, inputs, route, telemetry))
+    pending = {primary}
+    try:
+        delay = latencies.percentile(name, LLM_HEDGE_PERCENTILE, LLM_HEDGE_MIN_SAMPLES)
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if not done and limiter.has_spare_capacity():
+            _stats["hedges"] += 1
+            pending.add(asyncio.ensure_future(
+                _run_chain(name, messages, inputs, model_router.hedge_route(route), telemetry)
+            ))
+        error = None
+        while True:
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        _stats["hedge_wins"] += 1
+                    return task.result()
+                error = task.exception()
+            if not pending:
+                raise error
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        # 늦은 쪽 요청은 취소 (슬롯 반납)
+        for task in pending:
+            task.cancel()
+
+
+async def _run_chain(name, messages, inputs, route, telemetry=None):
+    chain = await get_chain_async(name, messages, route)
+    attempt = 0
+    queue_wait = 0.0
+    call_started = time.monotonic()
+    while True:
+        waiting = time.monotonic()
+        await limiter.acquire()
+        started = time.monotonic()
+        queue_wait += started - waiting
+        _observe(telemetry, queue_wait_ms=_ms(queue_wait))
+        if started - waiting > 0.001:
+            tracing.record("llm_queue", started - waiting)
+        outcome = "cancelled"
+        try:
+            response = await chain.ainvoke(inputs)
+            outcome = "success"
+            # 한 번에 받는 호출은 첫 토큰 = 전체 응답 (재시도/대기 포함)
+            _observe(telemetry, ttft_ms=_ms(time.monotonic() - call_started))
+            _observe_usage(telemetry, inputs, getattr(response, "usage_metadata", None), _text(response.content))
+            return response
+        except Exception as e:
+            outcome = "throttled" if admission.is_throttled(e) else "error"
+            if outcome == "error" or attempt >= LLM_MAX_RETRIES:
+                if outcome == "throttled":
+                    _stats["failed"] += 1
+                raise
+        finally:
+            _finish(outcome, started, route)
+        _stats["retries"] += 1
+        await asyncio.sleep(_backoff(attempt))
+        attempt += 1
+
+
+async def stream_chain(name, messages, inputs, route=None, telemetry=None):
+    """
+    name 체인을 스트리밍으로 호출해 응답 청크(AIMessageChunk)를 생성되는 대로 yield
+    브레이커와 시간 예산(스트림 전체 기준)을 적용한다
+    """
+    route = route or model_router.choose(name, inputs)
+    _observe(telemetry, cache_status="miss")
+    breaker.before_call()
+    budget = resilience.timeout_for(name)
+    started = time.monotonic()
+    deadline = started + budget
+    ok = None
+    stream = _stream_chain(name, messages, inputs, route, telemetry)
+    first = True
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            try:
+                chunk = await asyncio.wait_for(anext(stream), remaining)
+            except StopAsyncIteration:
+                break
+            if first:
+                first = False
+                _observe(telemetry, ttft_ms=_ms(time.monotonic() - started))
+            yield chunk
+        ok = True
+        latencies.record(name, time.monotonic() - started)
+    except GeneratorExit:
+        ok = True
+        raise
+    except asyncio.TimeoutError:
+        ok = False
+        raise _timeout_error(name, budget) from None
+    except LLMBusyError:
+        raise
+    except Exception:
+        ok = False
+        raise
+    finally:
+        await stream.aclose()
+        _observe(telemetry, latency_ms=_ms(time.monotonic() - started))
+        _record_outcome(ok, route, started)
+
+
+async def _stream_chain(name, messages, inputs, route, telemetry=None):
+    chain = await get_chain_async(name, messages, route)
+    attempt = 0
+    queue_wait = 0.0
+    while True:
+        waiting = time.monotonic()
+        await limiter.acquire()
+        started = time.monotonic()
+        queue_wait += started - waiting
+        _observe(telemetry, queue_wait_ms=_ms(queue_wait))
+        if started - waiting > 0.001:
+            tracing.record("llm_queue", started - waiting)
+        outcome = "cancelled"
+        received = False
+        usage, parts = None, []
+        try:
+            async for chunk in chain.astream(inputs):
+                received = True
+                if getattr(chunk, "usage_metadata", None):
+                    usage = _add_usage(usage, chunk.usage_metadata)
+                parts.append(_text(chunk.content))
+                yield chunk
+            outcome = "success"
+            return
+        except GeneratorExit:
+            # 호출한 쪽이 필요한 만큼 받고 스트림을 닫음 (예: JSON 객체 완성) → 실패로 세지 않음
+            outcome = "success"
+            raise
+        except Exception as e:
+            outcome = "throttled" if admission.is_throttled(e) else "error"
+            # 이미 보낸 청크가 있으면 재시도할 수 없음
+            if outcome == "error" or received or attempt >= LLM_MAX_RETRIES:
+                if outcome == "throttled":
+                    _stats["failed"] += 1
+                raise
+        finally:
+            # 클라이언트가 끊겨 취소된 경우에도 동시 실행 슬롯을 반납
+            _finish(outcome, started, route)
+            if received:
+                _observe_usage(telemetry, inputs, usage, "".join(parts))
+        _stats["retries"] += 1
+        await asyncio.sleep(_backoff(attempt))
+        attempt += 1
+
+
+def _add_usage(total, usage):
+    """스트림 청크의 usage_metadata 합치기 (AIMessageChunk 덧셈과 같은 규칙)"""
+    if total is None:
+        return dict(usage)
+    from langchain_core.messages.ai import add_usage
+    return add_usage(total, usage)
+
+
+def stats():
+    return {
+        **limiter.stats(),
+        **_stats,
+        "coalescing": _coalescer.stats(),
+        "breaker": breaker.stats(),
+        "latency": latencies.stats(),
+        "hedge_types": LLM_HEDGE_TYPES,
+        "routing": model_router.stats(),
+    }
@@ -0,0 +1,217 @@
+"""
+Prometheus 텍스트 형식 지표 (/api/metrics)
+
+외부 라이브러리 없이 필요한 만큼만 구현한 카운터/게이지/히스토그램.
+기록은 dict 조회 + bisect 한 번이라 요청 경로 부담이 작고, 콜드 스타트에 import 비용이 없다.
+- http_request_duration_seconds{method,route,status}: 라우트(경로 템플릿)별 응답 시간 (스트리밍은 마지막 청크까지, 응답 뒤의 BackgroundTask는 제외)
+- http_requests_in_flight: 처리 중인 요청 수 (응답 본문을 다 보낼 때까지, 응답 뒤의 BackgroundTask는 제외)
+- outbound_request_duration_seconds{dependency,operation,outcome}: 외부 호출 시간
+  dependency: gemini | supabase | kakao | naver | google-certs, outcome: ok | http_4xx | http_5xx | throttled | error | cancelled
+- 스크레이프 시점에 읽는 값(DB 풀, 캐시 적중률, LLM 동시 실행 등)은 register_collector()로 등록한 함수가 만든다
+
+값은 인스턴스(프로세스)별이다. 서버리스에서는 인스턴스마다 따로 스크레이프되거나 재시작 시 0부터 다시 센다.
+
+환경 변수
+- METRICS_TOKEN: 설정하면 /api/metrics에 "Authorization: Bearer <토큰>" 필요
+"""
+import bisect
+import math
+import os
+import threading
+import time
+
+import structured_logging
+import tracing
+
+log = structured_logging.get_logger("metrics")
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# 초 단위 히스토그램 버킷 (짧은 API ~ LLM 생성까지)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_lock = threading.Lock()
+_metrics = []
+_collectors = []
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        _metrics.append(self)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = self._header()
+        for labels, value in list(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(list(zip(self.labelnames, labels)))} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value, *labels):
+        with _lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            series = self._values.get(labels)
+            if series is None:
+                # [버킷별 개수 (+Inf 포함), 합계]
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        lines = self._header()
+        with _lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        for labels, counts, total in snapshot:
+            pairs = list(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(pairs + [('le', _format_value(float(bound)))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {cumulative}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status"))
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+IN_FLIGHT.set(0)
+OUTBOUND_SECONDS = Histogram(
+    "outbound_request_duration_seconds", "Outbound call latency by dependency", ("dependency", "operation", "outcome"))
+
+
+def observe_outbound(dependency, operation, outcome, seconds):
+    OUTBOUND_SECONDS.observe(seconds, dependency, operation, outcome)
+    # 요청 안에서 호출됐으면 Server-Timing 구간으로도 남김
+    tracing.record(dependency, seconds)
+
+
+def http_outcome(status_code):
+    if status_code >= 500:
+        return "http_5xx"
+    if status_code >= 400:
+        return "http_4xx"
+    return "ok"
+
+
+def register_collector(collect):
+    """
+    스크레이프 시점에 호출할 함수 등록
+    collect() → [(이름, 종류("gauge"/"counter"), 설명, [({라벨}, 값), ...]), ...]
+    """
+    _collectors.append(collect)
+
+
+def render():
+    """전체 지표를 Prometheus 텍스트 형식으로"""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        try:
+            families = collect()
+        except Exception as e:
+            # 지표 하나가 실패해도 나머지는 내보냄
+            log.warning("metrics.collector_failed", error=e)
+            continue
+        for name, kind, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                lines.append(f"{name}{_format_labels(labels.items())} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """라우트별 응답 시간/처리 중 요청 수 (순수 ASGI, 스트리밍 응답 본문을 감싸지 않음)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        ended = None
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status, ended
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) and ended is None:
+                # 응답을 다 보낸 시점에 끝난 요청으로 봄 (BackgroundTask로 이어지는 /submit 생성 작업은 제외)
+                ended = time.perf_counter()
+                IN_FLIGHT.dec()
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            if ended is None:
+                IN_FLIGHT.dec()  # 응답을 끝까지 보내지 못한 경우 (예외, 연결 끊김)
+            # 라우팅 후 scope["route"]에 경로 템플릿이 남음 (/api/jobs/{job_id}) → 라벨 수가 라우트 수로 제한
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(
+                (ended or time.perf_counter()) - started, scope["method"], getattr(route, "path", "unmatched"), status)
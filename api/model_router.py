@@ -0,0 +1,143 @@
+"""
+워크로드별 Gemini 모델 선택 (지연 기반 라우팅)
+
+prompt_type을 워크로드로 묶고 워크로드마다 1순위/2순위 모델과 설정을 둔다.
+- coaching (포포): 짧은 코칭 대화 → 빠른 경량 모델, 프롬프트가 크면 기본 모델
+- factual (무무): 포트폴리오 사실 답변 → 경량 모델, 낮은 temperature
+- generation (답변 초안/포트폴리오 JSON): 큰 JSON 생성 → 기본 모델
+최근 응답 시간(EWMA)이 느림 기준(시간 예산 × LLM_ROUTER_SLOW_RATIO)을 넘거나 연속 실패하면 2순위 모델로 보내고,
+LLM_ROUTER_PROBE_EVERY번에 한 번은 1순위 모델로 보내 회복 여부를 확인한다.
+
+환경 변수
+- LLM_MODELS_<WORKLOAD>: "1순위,2순위" 모델 (예: LLM_MODELS_COACHING=gemini-flash-lite-latest,gemini-flash-latest)
+- LLM_LARGE_PROMPT_TOKENS: 이보다 큰 대화 프롬프트는 large_model 사용 (기본 2500)
+- LLM_ROUTER_SLOW_RATIO: 시간 예산 대비 느림 기준 비율 (기본 0.5)
+- LLM_ROUTER_PROBE_EVERY: 2순위로 보내는 동안 1순위를 시험하는 간격 (기본 10)
+"""
+import os
+from typing import NamedTuple
+
+import resilience
+from context_compaction import estimate_tokens
+
+PRIMARY_MODEL = "gemini-flash-latest"
+LITE_MODEL = "gemini-flash-lite-latest"
+
+WORKLOADS = {
+    "popo": "coaching",
+    "mumu": "factual",
+    "chat_answers": "generation",
+    "chat_answers_partial": "generation",
+    "portfolio": "generation",
+    "portfolio_overview": "generation",
+    "portfolio_project": "generation",
+}
+
+ROUTES = {
+    "coaching": {"models": (LITE_MODEL, PRIMARY_MODEL), "large_model": PRIMARY_MODEL, "temperature": 0.7},
+    "factual": {"models": (LITE_MODEL, PRIMARY_MODEL), "large_model": PRIMARY_MODEL, "temperature": 0.3},
+    "generation": {"models": (PRIMARY_MODEL, LITE_MODEL), "large_model": None, "temperature": 0.7},
+}
+DEFAULT_WORKLOAD = "generation"
+
+LLM_LARGE_PROMPT_TOKENS = int(os.getenv("LLM_LARGE_PROMPT_TOKENS", "2500"))
+LLM_ROUTER_SLOW_RATIO = float(os.getenv("LLM_ROUTER_SLOW_RATIO", "0.5"))
+LLM_ROUTER_PROBE_EVERY = int(os.getenv("LLM_ROUTER_PROBE_EVERY", "10"))
+# 연속 실패가 이 횟수 이상이면 느린 것과 같이 취급
+FAILURE_STREAK = 2
+EWMA_ALPHA = 0.3
+
+for _workload, _route in ROUTES.items():
+    _models = os.getenv(f"LLM_MODELS_{_workload.upper()}")
+    if _models:
+        _names = [name.strip() for name in _models.split(",") if name.strip()]
+        _route["models"] = (_names[0], _names[1] if len(_names) > 1 else _names[0])
+
+
+class Route(NamedTuple):
+    prompt_type: str
+    workload: str
+    model: str
+    temperature: float
+    reason: str  # primary | large_prompt | primary_slow | probe | hedge
+
+
+_health = {}  # (workload, model) -> {"ewma_s", "failures", "calls"}
+_stats = {"primary": 0, "large_prompt": 0, "primary_slow": 0, "probe": 0}
+_fallback_counter = {}
+
+
+def _model_health(workload, model):
+    return _health.setdefault((workload, model), {"ewma_s": None, "failures": 0, "calls": 0})
+
+
+def _is_slow(prompt_type, workload, model):
+    health = _health.get((workload, model))
+    if health is None:
+        return False
+    if health["failures"] >= FAILURE_STREAK:
+        return True
+    return health["ewma_s"] is not None and health["ewma_s"] > resilience.timeout_for(prompt_type) * LLM_ROUTER_SLOW_RATIO
+
+
+def prompt_tokens(inputs):
+    return sum(estimate_tokens(value) for value in inputs.values() if isinstance(value, str))
+
+
+def choose(prompt_type, inputs=None):
+    """prompt_type과 입력 크기, 최근 지연으로 모델 선택 → Route"""
+    workload = WORKLOADS.get(prompt_type, DEFAULT_WORKLOAD)
+    config = ROUTES[workload]
+    primary, secondary = config["models"]
+    reason = "primary"
+    if config["large_model"] and inputs and prompt_tokens(inputs) > LLM_LARGE_PROMPT_TOKENS:
+        primary, reason = config["large_model"], "large_prompt"
+        if secondary == primary:
+            secondary = config["models"][0]
+
+    model = primary
+    if secondary != primary and _is_slow(prompt_type, workload, primary) \
+            and not _is_slow(prompt_type, workload, secondary):
+        count = _fallback_counter.get(workload, 0) + 1
+        _fallback_counter[workload] = count
+        if count % max(1, LLM_ROUTER_PROBE_EVERY) == 0:
+            reason = "probe"
+        else:
+            model, reason = secondary, "primary_slow"
+    _stats[reason] += 1
+    return Route(prompt_type, workload, model, config["temperature"], reason)
+
+
+def hedge_route(route):
+    """헤징 요청은 다른 모델로 (같은 모델이 느린 경우를 피함)"""
+    primary, secondary = ROUTES[route.workload]["models"]
+    model = secondary if route.model == primary else primary
+    return route._replace(model=model, reason="hedge")
+
+
+def record(route, seconds, ok):
+    """호출 결과 기록. 실패는 시간 예산만큼 걸린 것으로 반영"""
+    health = _model_health(route.workload, route.model)
+    health["calls"] += 1
+    if ok:
+        health["failures"] = 0
+    else:
+        health["failures"] += 1
+        seconds = max(seconds, resilience.timeout_for(route.prompt_type))
+    health["ewma_s"] = seconds if health["ewma_s"] is None else \
+        health["ewma_s"] * (1 - EWMA_ALPHA) + seconds * EWMA_ALPHA
+
+
+def stats():
+    return {
+        "routes": {workload: list(config["models"]) for workload, config in ROUTES.items()},
+        "models": {
+            f"{workload}:{model}": {
+                "ewma_s": round(health["ewma_s"], 3) if health["ewma_s"] is not None else None,
+                "failures": health["failures"],
+                "calls": health["calls"],
+            }
+            for (workload, model), health in _health.items()
+        },
+        **_stats,
+    }
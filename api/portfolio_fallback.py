@@ -0,0 +1,102 @@
+"""
+LLM 없이 만드는 포트폴리오 (템플릿 기반, 결정적)
+
+답변(UserAnswers.answers)의 직무/분위기/프로젝트로 /submit과 같은 JSON(theme/hero/about/projects/contact)을 바로 만든다.
+- Gemini 키가 없거나 서킷이 열렸을 때, 시간 예산 안에 생성하지 못했을 때의 대체 결과
+- 비동기 작업(Prefer: respond-async)의 미리보기 (LLM 결과가 나오기 전 첫 화면)
+- 섹션별 생성에서 실패한 섹션의 기본값
+I/O 없이 문자열 조합만 하므로 1ms 안에 끝난다.
+"""
+
+DEFAULT_THEME = {"color": "#4F46E5", "font": "sans", "mood_emoji": "🚀", "layout": "gallery_grid"}
+
+# 분위기(#태그) → 테마 (MoodEffectLayer의 분위기 목록 기준, 앞쪽 태그 우선)
+MOOD_THEMES = {
+    "#차분한": {"color": "#64748B", "font": "serif", "mood_emoji": "🌿"},
+    "#열정적인": {"color": "#EF4444", "font": "sans", "mood_emoji": "🔥"},
+    "#신뢰감있는": {"color": "#2563EB", "font": "sans", "mood_emoji": "🤝"},
+    "#힙한(Hip)": {"color": "#A855F7", "font": "mono", "mood_emoji": "😎"},
+    "#창의적인": {"color": "#F59E0B", "font": "sans", "mood_emoji": "🎨"},
+    "#미니멀한": {"color": "#111827", "font": "sans", "mood_emoji": "⚪"},
+    "#클래식한": {"color": "#92400E", "font": "serif", "mood_emoji": "📜"},
+    "#전문적인": {"color": "#1E3A8A", "font": "sans", "mood_emoji": "💼"},
+    "#따뜻한": {"color": "#EA580C", "font": "serif", "mood_emoji": "☀️"},
+    "#시원한": {"color": "#0EA5E9", "font": "sans", "mood_emoji": "🌊"},
+    "#세련된": {"color": "#0F172A", "font": "sans", "mood_emoji": "✨"},
+}
+
+# 직무 키워드 → 레이아웃
+JOB_LAYOUTS = (
+    (("디자인", "Designer"), "gallery_grid"),
+    (("마케팅", "Marketer", "마케터"), "dashboard"),
+)
+DEFAULT_LAYOUT = DEFAULT_THEME["layout"]
+
+
+def _moods(answers):
+    moods = answers.get("moods") or []
+    if isinstance(moods, str):
+        moods = [mood.strip() for mood in moods.replace(",", " ").split() if mood.strip()]
+    return [mood if mood.startswith("#") else f"#{mood}" for mood in moods]
+
+
+def theme(answers):
+    moods = _moods(answers)
+    job = answers.get("job") or ""
+    result = dict(DEFAULT_THEME)
+    for mood in moods:
+        if mood in MOOD_THEMES:
+            result.update(MOOD_THEMES[mood])
+            break
+    result["layout"] = next(
+        (layout for keywords, layout in JOB_LAYOUTS if any(keyword in job for keyword in keywords)),
+        DEFAULT_LAYOUT,
+    )
+    return result
+
+
+def overview(answers):
+    """theme/hero/about"""
+    name = answers.get("name") or "포트폴리오"
+    job = answers.get("job") or ""
+    strength = answers.get("strength") or ""
+    moods = _moods(answers)
+    subtitle = f"{strength}을(를) 가진 {job}".strip() if strength and job else (job or strength)
+    return {
+        "theme": theme(answers),
+        "hero": {
+            "title": f"{name}의 포트폴리오",
+            "subtitle": subtitle,
+            "tags": [tag for tag in [job, *[mood.lstrip("#") for mood in moods[:2]]] if tag],
+        },
+        "about": {
+            "intro": f"안녕하세요, {job} {name}입니다." if job else f"안녕하세요, {name}입니다.",
+            "description": str(answers.get("career_summary") or strength or ""),
+        },
+    }
+
+
+def project_card(project, answers=None):
+    job = (answers or {}).get("job") or ""
+    return {
+        "title": project["title"],
+        "desc": project.get("desc") or "",
+        "detail": project.get("desc") or "",
+        "tags": [job] if job else [],
+    }
+
+
+def contact(answers):
+    return {"email": answers.get("email") or "", "github": answers.get("github") or ""}
+
+
+def build(answers, projects):
+    """
+    전체 포트폴리오 JSON
+    projects: main.collect_projects의 [{"title", "desc"}]
+    """
+    return {
+        **overview(answers),
+        "projects": [project_card(project, answers) for project in projects],
+        "contact": contact(answers),
+    }
@@ -0,0 +1,153 @@
+"""
+포트폴리오 섹션 검색 (BM25)
+
+챗봇 질문마다 포트폴리오 전체를 프롬프트에 붙이지 않고, 질문과 관련된 섹션만 골라 넣는다.
+- 청크: portfolio_sections의 섹션 단위 (프로젝트는 하나씩, 검수 답변은 문항 하나씩)
+- 토큰: 영문/숫자 단어 + 한글은 어절과 글자 바이그램 (형태소 분석기 없이 조사 변화에 대응)
+- 인덱스는 포트폴리오 내용(정규화 후 해시)당 한 번만 만들고 LRU로 보관
+
+환경 변수
+- RETRIEVAL_MIN_CHARS: 이보다 짧은 포트폴리오는 검색 없이 전체 사용 (기본 1200)
+- RETRIEVAL_INDEX_CACHE_SIZE: 보관할 인덱스 수 (기본 64)
+"""
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+
+import portfolio_sections
+import response_cache
+
+RETRIEVAL_MIN_CHARS = int(os.getenv("RETRIEVAL_MIN_CHARS", "1200"))
+RETRIEVAL_INDEX_CACHE_SIZE = int(os.getenv("RETRIEVAL_INDEX_CACHE_SIZE", "64"))
+INDEX_VERSION = "retrieval-v1"
+
+# BM25 파라미터
+K1 = 1.5
+B = 0.75
+
+# 질문과 상관없이 항상 넣는 섹션 (누구의 포트폴리오인지)
+PINNED_KINDS = ("owner",)
+VERIFIED_LABEL = "[지원자가 직접 검수한 답변]"
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.\-]*|[가-힣]+")
+
+
+def tokenize(text):
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if word[0] >= "가":
+            tokens.append(word)
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word.rstrip(".-"))
+    return tokens
+
+
+def build_chunks(context):
+    """섹션 → 검색 단위 청크 [{"kind", "text", "order"}]"""
+    chunks = []
+    for section in portfolio_sections.split_sections(context):
+        kind = section["kind"]
+        if kind == "projects":
+            continue  # "=== 프로젝트 목록 (총 N개) ===" 헤더뿐
+        if kind == "verified_answers":
+            for line in section["text"].split("\n")[1:]:
+                line = line.strip()
+                if line.startswith("[질문:"):
+                    chunks.append({"kind": kind, "text": f"{VERIFIED_LABEL} {line}"})
+            continue
+        if kind == "preamble":
+            # 구조가 없는 컨텍스트(JSON 등)는 빈 줄 단위 문단으로 나눔
+            chunks.extend({"kind": kind, "text": part.strip()}
+                          for part in section["text"].split("\n\n") if part.strip())
+            continue
+        if section["text"]:
+            chunks.append({"kind": kind, "text": section["text"]})
+    for order, chunk in enumerate(chunks):
+        chunk["order"] = order
+    return chunks
+
+
+class BM25Index:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self._term_freqs = [Counter(tokenize(chunk["text"])) for chunk in chunks]
+        self._lengths = [sum(tf.values()) for tf in self._term_freqs]
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0
+        document_freq = Counter()
+        for tf in self._term_freqs:
+            document_freq.update(tf.keys())
+        total = len(chunks)
+        self._idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for term, df in document_freq.items()
+        }
+
+    def scores(self, query):
+        terms = set(tokenize(query))
+        results = []
+        for tf, length in zip(self._term_freqs, self._lengths):
+            score = 0.0
+            norm = K1 * (1 - B + B * length / self._avg_length) if self._avg_length else K1
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self._idf[term] * freq * (K1 + 1) / (freq + norm)
+            results.append(score)
+        return results
+
+    def search(self, query, k):
+        """(점수 순) 상위 k개 청크. 점수가 0인 청크는 제외"""
+        scored = sorted(zip(self.scores(query), range(len(self.chunks))), key=lambda item: (-item[0], item[1]))
+        return [self.chunks[index] for score, index in scored[:k] if score > 0]
+
+
+_indexes = OrderedDict()
+_lock = threading.Lock()
+_stats = {"index_builds": 0, "index_hits": 0, "full_context": 0, "retrieved": 0}
+
+
+def get_index(context, index_key=None):
+    """포트폴리오 버전(정규화 내용 해시)별 인덱스. 이미 내용 해시가 있으면(chat_sessions의 context_id) index_key로 전달"""
+    key = f"{INDEX_VERSION}:{index_key}" if index_key else response_cache.make_key(INDEX_VERSION, context)
+    with _lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            _stats["index_hits"] += 1
+            return index
+    index = BM25Index(build_chunks(context))
+    with _lock:
+        _indexes[key] = index
+        _stats["index_builds"] += 1
+        while len(_indexes) > RETRIEVAL_INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def build_context(context, query, k=4, index_key=None):
+    """
+    질문과 관련된 섹션만 모은 컨텍스트 (원래 순서 유지)
+    짧은 포트폴리오는 그대로, 관련 섹션이 없으면 앞쪽 섹션 k개를 사용
+    """
+    if not context or len(context) < RETRIEVAL_MIN_CHARS:
+        _stats["full_context"] += 1
+        return context
+    index = get_index(context, index_key)
+    if not index.chunks:
+        _stats["full_context"] += 1
+        return context
+
+    pinned = [chunk for chunk in index.chunks if chunk["kind"] in PINNED_KINDS]
+    hits = [chunk for chunk in index.search(query, k + len(pinned)) if chunk["kind"] not in PINNED_KINDS][:k]
+    if not hits:
+        hits = [chunk for chunk in index.chunks if chunk["kind"] not in PINNED_KINDS][:k]
+    selected = sorted(pinned + hits, key=lambda chunk: chunk["order"])
+    _stats["retrieved"] += 1
+    return "\n\n".join(chunk["text"] for chunk in selected)
+
+
+def stats():
+    return {"indexes": len(_indexes), **_stats}
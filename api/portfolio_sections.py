@@ -0,0 +1,103 @@
+"""
+포트폴리오 컨텍스트 섹션 분리
+
+프론트엔드 lib/portfolioRAG.js(preparePortfolioRAG)가 만든 문자열을
+`=== 제목 ===` 헤더와 `[프로젝트 N] 제목` 단위로 나눈다.
+섹션별 해시로 이전 컨텍스트와의 변경점을 찾거나, 섹션 단위 검색/압축에 사용한다.
+"""
+import hashlib
+import re
+
+from response_cache import normalize_text
+
+SECTION_HEADER = re.compile(r"^===\s*(.+?)\s*===$")
+PROJECT_HEADER = re.compile(r"^\[(?:프로젝트|작품)\s*\d+\]\s*(.*)$")
+
+# 헤더 문구 → 섹션 종류 (portfolioRAG.js의 헤더와 맞춘다)
+SECTION_KINDS = (
+    ("소유자 정보", "owner"),
+    ("경력", "career"),
+    ("보유 기술", "skills"),
+    ("프로젝트 목록", "projects"),
+    ("관심 분야", "keywords"),
+    ("연락처", "contact"),
+    ("검수", "verified_answers"),
+)
+
+
+def _kind_for(title):
+    for marker, kind in SECTION_KINDS:
+        if marker in title:
+            return kind
+    return "other"
+
+
+def split_sections(context):
+    """
+    컨텍스트 → 섹션 목록 [{"id", "kind", "title", "text"}]
+    프로젝트는 kind="project", id="project:<제목>" 으로 각각 분리된다.
+    헤더가 없는 텍스트는 하나의 "preamble" 섹션이 된다.
+    """
+    sections = []
+    current = {"id": "preamble", "kind": "preamble", "title": "", "lines": []}
+    in_projects = False
+    seen_ids = {}
+
+    def flush():
+        text = "\n".join(current["lines"]).strip()
+        if text or current["kind"] not in ("preamble",):
+            sections.append({"id": current["id"], "kind": current["kind"], "title": current["title"], "text": text})
+
+    for raw_line in normalize_text(context).split("\n"):
+        header = SECTION_HEADER.match(raw_line)
+        project = PROJECT_HEADER.match(raw_line) if in_projects else None
+        if header:
+            flush()
+            title = header.group(1)
+            kind = _kind_for(title)
+            in_projects = kind == "projects"
+            section_id = kind if kind != "other" else f"other:{title}"
+            current = {"id": section_id, "kind": kind, "title": title, "lines": [raw_line]}
+        elif project:
+            flush()
+            title = project.group(1).strip() or "제목 없음"
+            section_id = f"project:{title}"
+            # 같은 제목의 프로젝트가 여러 개면 순번을 붙여 구분
+            seen_ids[section_id] = seen_ids.get(section_id, 0) + 1
+            if seen_ids[section_id] > 1:
+                section_id = f"{section_id}#{seen_ids[section_id]}"
+            current = {"id": section_id, "kind": "project", "title": title, "lines": [raw_line]}
+        else:
+            current["lines"].append(raw_line)
+    flush()
+    return sections
+
+
+def section_hash(section):
+    return hashlib.sha1(section["text"].encode("utf-8")).hexdigest()[:16]
+
+
+def fingerprint(sections):
+    """섹션 id → 내용 해시 (변경 감지용)"""
+    return {section["id"]: section_hash(section) for section in sections}
+
+
+def diff_fingerprints(previous, current):
+    """(추가된 id, 삭제된 id, 내용이 바뀐 id) 집합"""
+    added = set(current) - set(previous)
+    removed = set(previous) - set(current)
+    changed = {sid for sid in set(current) & set(previous) if current[sid] != previous[sid]}
+    return added, removed, changed
+
+
+def field_value(sections, kind, label):
+    """kind 섹션에서 "라벨: 값" 줄의 값 (없으면 None)"""
+    for section in sections:
+        if section["kind"] != kind:
+            continue
+        for line in section["text"].split("\n"):
+            if line.startswith(f"{label}:"):
+                value = line.split(":", 1)[1].strip()
+                if value and value != "정보 없음":
+                    return value
+    return None
@@ -0,0 +1,56 @@
+"""
+AI 로그 보존 기간 정리 스크립트
+보존 기간이 지난 ai_logs 날짜 파티션과 오래된 시간 단위 집계를 지우고, 앞으로 쓸 파티션을 미리 만듭니다.
+(migrations/partition_ai_logs.sql 적용 후, pg_cron이 없으면 매일 실행)
+
+사용법
+  python prune_ai_logs.py
+  python prune_ai_logs.py --retain-days 14
+
+환경 변수
+- AI_LOG_RETENTION_DAYS: 원본 로그 보존 일수 (기본 30)
+- AI_ROLLUP_HOURLY_DAYS: 시간 단위 집계 보존 일수 (기본 14, 일/주 단위 집계는 계속 유지)
+"""
+import argparse
+import os
+
+from dotenv import load_dotenv
+from supabase import create_client
+
+load_dotenv()
+
+parser = argparse.ArgumentParser(description="Drop expired ai_logs partitions")
+parser.add_argument("--retain-days", type=int, default=int(os.getenv("AI_LOG_RETENTION_DAYS", "30")))
+parser.add_argument("--hourly-days", type=int, default=int(os.getenv("AI_ROLLUP_HOURLY_DAYS", "14")))
+args = parser.parse_args()
+
+# Supabase 클라이언트 초기화
+supabase_url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
+service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+if not supabase_url or not service_key:
+    print("❌ Supabase credentials not found")
+    exit(1)
+
+supabase = create_client(supabase_url, service_key)
+
+print("=" * 60)
+print("AI 로그 보존 기간 정리")
+print("=" * 60)
+
+print(f"\n📋 Pruning ai_logs older than {args.retain_days} days (hourly rollups: {args.hourly_days} days)...")
+try:
+    result = supabase.rpc("prune_ai_logs", {
+        "retain_days": args.retain_days,
+        "hourly_rollup_days": args.hourly_days,
+    }).execute().data
+except Exception as e:
+    print(f"❌ Prune failed: {e}")
+    print("   migrations/partition_ai_logs.sql 적용 여부를 확인하세요")
+    exit(1)
+
+print(f"✅ Raw logs kept since {result['pruned_before']}")
+print(f"   - Dropped partitions: {result['dropped_partitions']}")
+print(f"   - Deleted rows from default partition: {result['default_rows_deleted']}")
+print(f"   - Deleted hourly rollups: {result['hourly_rollups_deleted']}")
+print(f"   - Created partitions: {result['partitions_created']}")
@@ -0,0 +1,131 @@
+"""
+시작 시 백그라운드 워밍업 & 준비 상태(Readiness) 관리
+
+FastAPI lifespan(main.py)에서 warm-up 태스크를 띄우고, 요청은 기다리지 않고 바로 처리한다.
+`/api/health`는 여기서 기록한 상태만 읽으므로 어떤 서브시스템도 초기화하지 않는다.
+
+환경 변수
+- WARMUP_SUBSYSTEMS: 워밍업할 서브시스템 (기본 "db", 빈 값이면 워밍업 안 함)
+  llm/supabase는 필요할 때만 추가 ("db,llm,supabase"): /api/health, /api/notices/active만 처리하는 인스턴스도
+  AI 스택(langchain)과 Supabase 클라이언트를 import 하게 되므로 기본값에서는 뺐다 (cold_start_check.py 예산에 포함)
+- DB_POOL_WARM_SIZE: 미리 열어 둘 DB 연결 수 (기본 1)
+"""
+import asyncio
+import os
+import time
+
+import clients
+import structured_logging
+
+log = structured_logging.get_logger("readiness")
+
+WARMUP_SUBSYSTEMS = [s.strip() for s in os.getenv("WARMUP_SUBSYSTEMS", "db").split(",") if s.strip()]
+DB_POOL_WARM_SIZE = int(os.getenv("DB_POOL_WARM_SIZE", "1"))
+SUPABASE_PROBE_TIMEOUT = float(os.getenv("SUPABASE_PROBE_TIMEOUT", "3"))
+
+# 서브시스템별 상태: pending → ready / failed / skipped
+_checks = {
+    name: {"status": "pending", "detail": None, "ms": None, "checked_at": None}
+    for name in ("db", "llm", "supabase")
+}
+_warmup_task = None
+
+
+def _record(name, status, detail=None, ms=None):
+    _checks[name] = {
+        "status": status,
+        "detail": detail,
+        "ms": ms,
+        "checked_at": time.time(),
+    }
+
+
+# --- 워밍업 단계 (동기 함수, 스레드에서 실행) ---
+def _warm_db():
+    import database
+
+    schema = database.ensure_schema()
+    if schema == "failed":
+        raise RuntimeError("schema check failed")
+    opened = database.warm_pool(DB_POOL_WARM_SIZE)
+    return f"schema {schema}, {opened} connection(s) warm"
+
+
+def _warm_llm():
+    llm = clients.get_llm()
+    if llm is None:
+        raise RuntimeError("GOOGLE_API_KEY missing")
+    return getattr(llm, "model", "ready")
+
+
+def _warm_supabase():
+    if not clients.get_supabase_client():
+        raise RuntimeError("Supabase credentials missing")
+    # 인증 서버 health 엔드포인트로 실제 도달 가능 여부 확인 (연결도 미리 열어 둠)
+    url = os.getenv("NEXT_PUBLIC_SUPABASE_URL", "").strip().rstrip("/")
+    key = os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY", "")
+    res = clients.get_http_session().get(
+        f"{url}/auth/v1/health", headers={"apikey": key}, timeout=SUPABASE_PROBE_TIMEOUT
+    )
+    if res.status_code >= 500:
+        raise RuntimeError(f"HTTP {res.status_code}")
+    return f"HTTP {res.status_code}"
+
+
+_STEPS = {
+    "db": _warm_db,
+    "llm": _warm_llm,
+    "supabase": _warm_supabase,
+}
+
+
+async def _run_step(name):
+    started = time.perf_counter()
+    try:
+        detail = await asyncio.to_thread(_STEPS[name])
+        _record(name, "ready", detail, round((time.perf_counter() - started) * 1000, 1))
+    except Exception as e:
+        _record(name, "failed", str(e), round((time.perf_counter() - started) * 1000, 1))
+        log.warning("warmup.failed", subsystem=name, error=e)
+
+
+async def warm_up():
+    """설정된 서브시스템을 병렬로 워밍업"""
+    for name in _checks:
+        if name not in WARMUP_SUBSYSTEMS:
+            _record(name, "skipped", "not in WARMUP_SUBSYSTEMS")
+    await asyncio.gather(*(_run_step(name) for name in WARMUP_SUBSYSTEMS if name in _STEPS))
+
+
+def start_warm_up():
+    """워밍업 태스크를 한 번만 시작"""
+    global _warmup_task
+    if _warmup_task is None:
+        _warmup_task = asyncio.get_running_loop().create_task(warm_up())
+    return _warmup_task
+
+
+async def stop_warm_up():
+    if _warmup_task is not None and not _warmup_task.done():
+        _warmup_task.cancel()
+        try:
+            await _warmup_task
+        except asyncio.CancelledError:
+            pass
+
+
+def mark_ready(name, detail=None):
+    """요청 경로에서 서브시스템이 실제로 쓰였을 때 준비 상태 갱신"""
+    if _checks.get(name, {}).get("status") != "ready":
+        _record(name, "ready", detail)
+
+
+def snapshot():
+    """현재 준비 상태 (I/O 없음)"""
+    required = [name for name in WARMUP_SUBSYSTEMS if name in _checks]
+    return {
+        "ready": all(_checks[name]["status"] == "ready" for name in required),
+        "warming": any(_checks[name]["status"] == "pending" for name in required),
+        "checks": {name: dict(check) for name, check in _checks.items()},
+        "initialized": clients.loaded_subsystems(),
+    }
@@ -0,0 +1,155 @@
+"""
+LLM 호출 시간 예산 / 서킷 브레이커 / 지연 통계
+
+- 엔드포인트(prompt_type)별 시간 예산: 대기열 대기와 재시도를 포함한 전체 호출 시간 상한
+- 서킷 브레이커: 최근 구간의 실패율이 높으면 일정 시간 동안 업스트림을 부르지 않고 바로 실패
+  (open → 시간이 지나면 half_open에서 1건만 시험 호출 → 성공하면 closed)
+- 지연 통계: prompt_type별 최근 성공 응답 시간 (p50/p95, 헤징 지연 계산용)
+
+환경 변수
+- LLM_TIMEOUT_DEFAULT: 기본 시간 예산 초 (기본 30)
+- LLM_TIMEOUT_<PROMPT_TYPE>: prompt_type별 예산 (예: LLM_TIMEOUT_POPO=20)
+- LLM_BREAKER_WINDOW / LLM_BREAKER_MIN_CALLS / LLM_BREAKER_FAILURE_RATIO / LLM_BREAKER_OPEN_SECONDS
+  (기본 30초 구간, 최소 10건, 실패율 0.5, 15초 차단)
+"""
+import math
+import os
+import time
+from collections import deque
+
+import structured_logging
+from admission import LLMBusyError
+
+log = structured_logging.get_logger("llm")
+
+LLM_TIMEOUT_DEFAULT = float(os.getenv("LLM_TIMEOUT_DEFAULT", "30"))
+# Vercel 함수 최대 실행 시간(60초) 안에서 응답을 돌려줄 수 있도록 잡은 기본값
+DEFAULT_TIMEOUTS = {
+    "popo": 20,
+    "mumu": 20,
+    "chat_answers": 45,
+    "chat_answers_partial": 30,
+    "portfolio": 45,
+    # /submit 섹션별 동시 생성 (개요 1회 + 프로젝트마다 1회)
+    "portfolio_overview": 30,
+    "portfolio_project": 30,
+}
+
+LLM_BREAKER_WINDOW = float(os.getenv("LLM_BREAKER_WINDOW", "30"))
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "10"))
+LLM_BREAKER_FAILURE_RATIO = float(os.getenv("LLM_BREAKER_FAILURE_RATIO", "0.5"))
+LLM_BREAKER_OPEN_SECONDS = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "15"))
+
+
+class LLMTimeoutError(TimeoutError):
+    """시간 예산 안에 LLM 응답을 받지 못함"""
+
+
+class CircuitOpenError(LLMBusyError):
+    """서킷 브레이커가 열려 있어 호출하지 않음 (대기열 초과와 같은 503 응답으로 처리)"""
+
+
+def timeout_for(prompt_type):
+    value = os.getenv(f"LLM_TIMEOUT_{prompt_type.upper()}")
+    if value:
+        return float(value)
+    return float(DEFAULT_TIMEOUTS.get(prompt_type, LLM_TIMEOUT_DEFAULT))
+
+
+class CircuitBreaker:
+    def __init__(self, window=LLM_BREAKER_WINDOW, min_calls=LLM_BREAKER_MIN_CALLS,
+                 failure_ratio=LLM_BREAKER_FAILURE_RATIO, open_seconds=LLM_BREAKER_OPEN_SECONDS):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.open_seconds = open_seconds
+        self.state = "closed"
+        self._results = deque()  # (시각, 성공 여부)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.counters = {"opened": 0, "short_circuited": 0}
+
+    def before_call(self):
+        """호출 허용 여부 확인. 열려 있으면 CircuitOpenError"""
+        now = time.monotonic()
+        if self.state == "open":
+            remaining = self._opened_at + self.open_seconds - now
+            if remaining > 0:
+                self.counters["short_circuited"] += 1
+                raise CircuitOpenError("AI 서비스 응답이 불안정해 잠시 요청을 멈췄습니다.", math.ceil(remaining))
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                self.counters["short_circuited"] += 1
+                raise CircuitOpenError("AI 서비스 상태를 확인하는 중입니다.", 1)
+            self._probe_in_flight = True
+
+    def record(self, ok):
+        now = time.monotonic()
+        if self.state == "half_open":
+            self._probe_in_flight = False
+            if ok:
+                self.state = "closed"
+                self._results.clear()
+            else:
+                self._open(now)
+            return
+
+        self._results.append((now, ok))
+        while self._results and self._results[0][0] < now - self.window:
+            self._results.popleft()
+        if self.state == "closed" and len(self._results) >= self.min_calls:
+            failures = sum(1 for _, result in self._results if not result)
+            if failures / len(self._results) >= self.failure_ratio:
+                self._open(now)
+
+    def release_probe(self):
+        """시험 호출이 결과 없이 끝남 (클라이언트 취소 등) → 다음 요청이 다시 시험"""
+        if self.state == "half_open":
+            self._probe_in_flight = False
+
+    def _open(self, now):
+        self.state = "open"
+        self._opened_at = now
+        self._results.clear()
+        self.counters["opened"] += 1
+        log.warning("llm.circuit_opened", open_s=self.open_seconds)
+
+    def stats(self):
+        failures = sum(1 for _, result in self._results if not result)
+        return {
+            "state": self.state,
+            "recent_calls": len(self._results),
+            "recent_failures": failures,
+            **self.counters,
+        }
+
+
+class LatencyTracker:
+    """prompt_type별 최근 성공 응답 시간 (초)"""
+
+    def __init__(self, size=200):
+        self.size = size
+        self._samples = {}
+
+    def record(self, prompt_type, seconds):
+        self._samples.setdefault(prompt_type, deque(maxlen=self.size)).append(seconds)
+
+    def percentile(self, prompt_type, pct, min_samples=1):
+        samples = self._samples.get(prompt_type)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def stats(self):
+        return {
+            prompt_type: {
+                "samples": len(samples),
+                "p50_s": round(self.percentile(prompt_type, 50), 3),
+                "p95_s": round(self.percentile(prompt_type, 95), 3),
+                "timeout_s": timeout_for(prompt_type),
+            }
+            for prompt_type, samples in self._samples.items()
+        }
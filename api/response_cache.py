@@ -0,0 +1,253 @@
+"""
+콘텐츠 주소 기반 LLM 응답 캐시 (메모리 LRU + SQLite 영속 계층)
+
+키는 정규화한 입력과 프롬프트 버전의 해시라서, 같은 포트폴리오로 "다시 생성"을 누르면
+Gemini 호출 없이 바로 응답한다. SQLite 계층은 인스턴스가 재활용돼도 (같은 /tmp 안에서) 유지된다.
+- 비동기 핸들러는 aget()/aset(): SQLite 읽기/쓰기는 스레드풀에서 실행
+- 영속 계층의 LRU 정리는 쓰기마다가 아니라 행 수가 상한을 10% 넘겼을 때 한 번에
+
+환경 변수
+- RESPONSE_CACHE_PATH: SQLite 파일 경로 (기본: 서버리스는 /tmp, 로컬은 api/response_cache.db)
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from starlette.concurrency import run_in_threadpool
+
+import structured_logging
+
+if os.environ.get("VERCEL") or os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    _default_path = os.path.join(tempfile.gettempdir(), "moodfolio_response_cache.db")
+else:
+    _default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "response_cache.db")
+CACHE_DB_PATH = os.getenv("RESPONSE_CACHE_PATH", _default_path)
+
+log = structured_logging.get_logger("cache")
+
+_WHITESPACE = re.compile(r"[ \t\u00a0]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize_text(value):
+    """캐시 키용 정규화: 유니코드 NFC, 줄바꿈 통일, 공백/빈 줄 축약"""
+    value = unicodedata.normalize("NFC", value or "").replace("\r\n", "\n").replace("\r", "\n")
+    lines = [_WHITESPACE.sub(" ", line).strip() for line in value.split("\n")]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def make_key(prompt_version, *parts):
+    digest = hashlib.sha256(prompt_version.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\0")
+        digest.update(normalize_text(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    이름 공간(namespace)별 2계층 캐시. 값은 JSON 직렬화 가능한 객체
+    비동기 핸들러에서는 aget()/aset() 사용 (SQLite 계층은 스레드풀에서 실행, 이벤트 루프를 막지 않음)
+    get()/set()은 동기 핸들러(스레드풀)용
+    """
+
+    def __init__(self, namespace, max_entries=256, max_persistent_entries=5000, ttl_seconds=86400,
+                 db_path=CACHE_DB_PATH):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_persistent_entries = max_persistent_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()  # 메모리 계층 (I/O 없음)
+        self._db_lock = threading.Lock()  # SQLite 연결 (스레드풀에서만 잡음)
+        self._conn = None
+        self._persistent_failed = False
+        # 영속 계층 행 수 상한 추정 (마지막 정리 후 행 수 + 그 뒤 쓰기 수) → 넘칠 때만 정리
+        self._persistent_rows = 0
+        self.counters = {"memory_hits": 0, "persistent_hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+
+    # --- SQLite 계층 (_db_lock 안에서 호출) ---
+    def _db(self):
+        if self._conn is None and not self._persistent_failed:
+            try:
+                conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=1)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS response_cache ("
+                    "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                    "expires_at REAL NOT NULL, last_access REAL NOT NULL, PRIMARY KEY (namespace, key))"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_response_cache_access ON response_cache(namespace, last_access)"
+                )
+                conn.commit()
+                self._persistent_rows = conn.execute(
+                    "SELECT COUNT(*) FROM response_cache WHERE namespace = ?", (self.namespace,)
+                ).fetchone()[0]
+                self._conn = conn
+            except sqlite3.Error as e:
+                # 읽기 전용 파일시스템 등: 메모리 계층만 사용
+                self._persistent_failed = True
+                log.warning("cache.persistence_disabled", namespace=self.namespace, error=e)
+        return self._conn
+
+    def _persistent_get(self, key, now):
+        conn = self._db()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at FROM response_cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                conn.execute("DELETE FROM response_cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+                conn.commit()
+                return None
+            conn.execute(
+                "UPDATE response_cache SET last_access = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            conn.commit()
+            return row[1], json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            log.warning("cache.read_failed", namespace=self.namespace, error=e)
+            return None
+
+    def _persistent_set(self, key, value, expires_at, now):
+        conn = self._db()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache (namespace, key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value, ensure_ascii=False), expires_at, now),
+            )
+            self._persistent_rows += 1
+            # 정리는 상한을 10% 넘겼을 때만 (쓰기마다 전체를 훑지 않음)
+            if self._persistent_rows > self.max_persistent_entries + max(1, self.max_persistent_entries // 10):
+                self._evict(conn, now)
+            conn.commit()
+        except sqlite3.Error as e:
+            log.warning("cache.write_failed", namespace=self.namespace, error=e)
+
+    def _evict(self, conn, now):
+        """만료된 행 삭제 후 최근 사용 순으로 max_persistent_entries개만 유지 (LRU)"""
+        evicted = conn.execute(
+            "DELETE FROM response_cache WHERE namespace = ? AND expires_at <= ?", (self.namespace, now)
+        ).rowcount
+        cutoff = conn.execute(
+            "SELECT last_access FROM response_cache WHERE namespace = ? ORDER BY last_access DESC LIMIT 1 OFFSET ?",
+            (self.namespace, self.max_persistent_entries - 1),
+        ).fetchone()
+        if cutoff is not None:
+            evicted += conn.execute(
+                "DELETE FROM response_cache WHERE namespace = ? AND last_access < ?", (self.namespace, cutoff[0])
+            ).rowcount
+        self.counters["evictions"] += max(evicted, 0)
+        self._persistent_rows = conn.execute(
+            "SELECT COUNT(*) FROM response_cache WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+
+    def _load(self, key, now):
+        """영속 계층 조회 (스레드풀/동기 경로). 찾으면 메모리 계층에도 올림"""
+        with self._db_lock:
+            stored = self._persistent_get(key, now)
+        with self._lock:
+            if stored is None:
+                self.counters["misses"] += 1
+                return None
+            self._remember(key, stored[1], stored[0])
+            self.counters["persistent_hits"] += 1
+            return stored[1]
+
+    def _store(self, key, value, expires_at, now):
+        with self._db_lock:
+            self._persistent_set(key, value, expires_at, now)
+
+    # --- 메모리 계층 (_lock 안에서 호출) ---
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _recall(self, key, now):
+        """메모리 계층 조회 → (찾았는지, 값)"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return True, entry[1]
+                del self._memory[key]
+            return False, None
+
+    def _prepare_set(self, key, value):
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self.counters["sets"] += 1
+        return expires_at, now
+
+    # --- 공개 API ---
+    def get(self, key):
+        """캐시된 값 (없거나 만료되면 None). 동기 경로용"""
+        now = time.time()
+        found, value = self._recall(key, now)
+        return value if found else self._load(key, now)
+
+    def set(self, key, value):
+        expires_at, now = self._prepare_set(key, value)
+        self._store(key, value, expires_at, now)
+
+    async def aget(self, key):
+        """get()의 비동기 버전: 메모리 적중은 바로, 영속 계층 조회만 스레드풀에서"""
+        now = time.time()
+        found, value = self._recall(key, now)
+        return value if found else await run_in_threadpool(self._load, key, now)
+
+    async def aset(self, key, value):
+        """set()의 비동기 버전: 메모리 계층은 바로 갱신, SQLite 쓰기는 스레드풀에서"""
+        expires_at, now = self._prepare_set(key, value)
+        await run_in_threadpool(self._store, key, value, expires_at, now)
+
+    def stats(self):
+        hits = self.counters["memory_hits"] + self.counters["persistent_hits"]
+        lookups = hits + self.counters["misses"]
+        return {
+            "namespace": self.namespace,
+            "memory_entries": len(self._memory),
+            "persistent": self._conn is not None,
+            "persistent_rows": self._persistent_rows,
+            "hit_ratio": round(hits / lookups, 3) if lookups else None,
+            **self.counters,
+        }
+
+
+# 등록된 캐시 목록 (관리자 통계용)
+_caches = {}
+
+
+def get_cache(namespace, **options):
+    if namespace not in _caches:
+        _caches[namespace] = ResponseCache(namespace, **options)
+    return _caches[namespace]
+
+
+def all_stats():
+    return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,47 @@
+"""
+동일한 비동기 호출 합치기 (singleflight)
+
+같은 키로 동시에 들어온 호출은 업스트림 호출 하나를 공유하고 같은 결과(또는 예외)를 받는다.
+더블 클릭, 클라이언트 재시도, 공유 링크로 몰리는 같은 질문 등이 Gemini 호출 1회로 처리된다.
+완료된 결과는 보관하지 않는다 (저장은 response_cache 담당).
+"""
+import asyncio
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}  # key -> {"task", "waiters"}
+        self.counters = {"leaders": 0, "merged": 0, "abandoned": 0}
+
+    async def do(self, key, factory):
+        """key로 진행 중인 호출이 있으면 합류, 없으면 factory()로 새로 시작"""
+        call = self._calls.get(key)
+        if call is None:
+            call = {"task": asyncio.ensure_future(factory()), "waiters": 0}
+            self._calls[key] = call
+            call["task"].add_done_callback(lambda _task, key=key, call=call: self._forget(key, call))
+            self.counters["leaders"] += 1
+        else:
+            self.counters["merged"] += 1
+
+        call["waiters"] += 1
+        try:
+            # 한 요청이 취소돼도(클라이언트 연결 끊김) 나머지 요청의 호출은 계속 진행
+            return await asyncio.shield(call["task"])
+        except asyncio.CancelledError:
+            if call["waiters"] == 1 and not call["task"].done():
+                # 기다리는 요청이 하나도 남지 않으면 업스트림 호출도 취소
+                # (취소가 끝나기 전에 들어온 같은 키의 요청이 취소될 호출에 합류하지 않도록 바로 목록에서 제거)
+                call["task"].cancel()
+                self._forget(key, call)
+                self.counters["abandoned"] += 1
+            raise
+        finally:
+            call["waiters"] -= 1
+
+    def _forget(self, key, call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self):
+        return {"in_flight_keys": len(self._calls), **self.counters}
@@ -0,0 +1,221 @@
+"""
+구조화 로그 (요청 경로에서 stdout에 직접 쓰지 않음)
+
+log = structured_logging.get_logger("chat")
+log.info("chat.rejected", reason=str(e))      # 이벤트 이름 + 필드
+log.exception("chat.failed", error=e)         # except 블록 안에서, 트레이스백 포함
+
+- 요청 경로에서는 레벨/샘플링 확인 후 큐에 넣기만 하고(QueueHandler), 포맷팅/마스킹/stdout 쓰기는 별도 스레드(QueueListener)가 한다
+  큐가 가득 차면 기다리지 않고 버림 (dropped)
+- 꺼진 레벨의 로그(예: 기본 설정의 debug)는 isEnabledFor 확인 한 번으로 끝난다
+- 이벤트별 샘플링: 과부하 시 쏟아지는 거절 로그 등은 일부만 남김 (error 이상은 항상 기록)
+- authorization/password/token 등은 가리고, 이메일은 앞 글자만 남김. 긴 문자열(LLM 원문 등)은 잘라서 기록
+- 요청 안에서 남긴 로그에는 trace_id(tracing)가 붙어 /api/admin/traces와 연결된다
+
+환경 변수
+- LOG_LEVEL: 기본 레벨 (기본 INFO)
+- LOG_LEVELS: 로거별 레벨 (예: "api=DEBUG,admin=WARNING")
+- LOG_SAMPLE: 이벤트별 기록 비율 (예: "chat.rejected=0.1"), 기본값은 DEFAULT_SAMPLES
+- LOG_FORMAT: json | text (기본: Vercel은 json, 로컬은 text)
+- LOG_QUEUE_SIZE: 기록 대기열 크기 (기본 10000)
+- LOG_MAX_FIELD_CHARS: 필드 값 최대 길이 (기본 2000)
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import tracing
+
+ROOT = "portfolio"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT") or ("json" if os.getenv("VERCEL") else "text")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_MAX_FIELD_CHARS = int(os.getenv("LOG_MAX_FIELD_CHARS", "2000"))
+
+# 과부하 때 요청마다 남는 이벤트는 기본으로 일부만 기록
+DEFAULT_SAMPLES = {
+    "chat.rejected": 0.1,
+    "submit.rejected": 0.1,
+}
+
+REDACTED_KEYS = {"authorization", "password", "token", "access_token", "refresh_token", "api_key", "secret", "cookie"}
+EMAIL_KEYS = {"email", "admin_email", "user_email"}
+LEVEL_EMOJI = {"DEBUG": "🔍", "INFO": "📢", "WARNING": "⚠️", "ERROR": "❌", "CRITICAL": "🚨"}
+
+
+def _parse_pairs(value):
+    pairs = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            key, raw = item.split("=", 1)
+            pairs[key.strip()] = raw.strip()
+    return pairs
+
+
+_samples = {**DEFAULT_SAMPLES, **{event: float(rate) for event, rate in _parse_pairs(os.getenv("LOG_SAMPLE")).items()}}
+_stats = {"dropped": 0, "sampled_out": 0}
+
+
+def mask_email(value):
+    local, _, domain = str(value).partition("@")
+    return f"{local[:1]}***@{domain}" if domain else "***"
+
+
+def redact(value, key=None):
+    """민감한 필드 가리기 + 긴 문자열 자르기 (중첩 dict/list 포함)"""
+    if key is not None:
+        lowered = key.lower()
+        if lowered in REDACTED_KEYS:
+            return "[REDACTED]"
+        if lowered in EMAIL_KEYS and value:
+            return mask_email(value)
+    if isinstance(value, dict):
+        return {k: redact(v, str(k)) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    text = str(value)
+    if text.startswith("Bearer "):
+        return "Bearer [REDACTED]"
+    if len(text) > LOG_MAX_FIELD_CHARS:
+        return f"{text[:LOG_MAX_FIELD_CHARS]}…(+{len(text) - LOG_MAX_FIELD_CHARS} chars)"
+    return text
+
+
+class _Formatter(logging.Formatter):
+    """리스너 스레드에서 실행 (요청 경로 밖)"""
+
+    def format(self, record):
+        fields = redact(getattr(record, "fields", None) or {})
+        logger = record.name[len(ROOT) + 1:] if record.name.startswith(ROOT + ".") else record.name
+        trace_id = getattr(record, "trace_id", None)
+        error = self.formatException(record.exc_info) if record.exc_info else None
+        if LOG_FORMAT == "json":
+            payload = {
+                "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+                "level": record.levelname.lower(),
+                "logger": logger,
+                "event": record.msg,
+                **fields,
+            }
+            if trace_id:
+                payload["trace_id"] = trace_id
+            if error:
+                payload["exc"] = error
+            return json.dumps(payload, ensure_ascii=False, default=str)
+
+        line = f"{LEVEL_EMOJI.get(record.levelname, '')} [{logger}] {record.msg}"
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if trace_id:
+            line += f" trace_id={trace_id}"
+        return f"{line}\n{error}" if error else line
+
+
+class _DroppingQueueHandler(QueueHandler):
+    def prepare(self, record):
+        # 포맷팅은 리스너 스레드에서 (기본 구현은 여기서 메시지/트레이스백을 문자열로 만듦)
+        return record
+
+    def enqueue(self, record):
+        _ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _stats["dropped"] += 1
+
+
+_queue = queue.Queue(maxsize=max(1, LOG_QUEUE_SIZE))
+_output = logging.StreamHandler(sys.stdout)
+_output.setFormatter(_Formatter())
+_listener = QueueListener(_queue, _output)
+_listener_lock = threading.Lock()
+_listener_started = False
+
+_root = logging.getLogger(ROOT)
+_root.setLevel(LOG_LEVEL)
+_root.propagate = False
+_root.addHandler(_DroppingQueueHandler(_queue))
+for _name, _level in _parse_pairs(os.getenv("LOG_LEVELS")).items():
+    logging.getLogger(f"{ROOT}.{_name}").setLevel(_level.upper())
+
+
+def _ensure_listener():
+    """첫 로그에서 리스너 스레드 시작 (콜드 스타트에 스레드를 만들지 않음)"""
+    global _listener_started
+    if _listener_started:
+        return
+    with _listener_lock:
+        if not _listener_started:
+            _listener.start()
+            _listener_started = True
+
+
+def shutdown():
+    """대기 중인 로그를 모두 쓰고 리스너 종료 (lifespan 종료/프로세스 종료 시)"""
+    global _listener_started
+    with _listener_lock:
+        if not _listener_started:
+            return
+        _listener_started = False
+        try:
+            _listener.stop()
+        except queue.Full:
+            # 종료 신호를 넣을 자리가 없음 → 스레드는 데몬이므로 프로세스와 함께 끝남
+            pass
+
+
+atexit.register(shutdown)
+
+
+class EventLogger:
+    __slots__ = ("_logger",)
+
+    def __init__(self, name):
+        self._logger = logging.getLogger(f"{ROOT}.{name}")
+
+    def enabled(self, level=logging.DEBUG):
+        return self._logger.isEnabledFor(level)
+
+    def _log(self, level, event, fields, exc_info=None):
+        if not self._logger.isEnabledFor(level):
+            return
+        if level < logging.ERROR:
+            rate = _samples.get(event)
+            if rate is not None and random.random() >= rate:
+                _stats["sampled_out"] += 1
+                return
+        self._logger.log(level, event, exc_info=exc_info,
+                         extra={"fields": fields, "trace_id": tracing.current_id()})
+
+    def debug(self, event, **fields):
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event, **fields):
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event, **fields):
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event, **fields):
+        self._log(logging.ERROR, event, fields)
+
+    def exception(self, event, **fields):
+        """except 블록 안에서 호출 (트레이스백 포함, 포맷팅은 리스너 스레드에서)"""
+        self._log(logging.ERROR, event, fields, exc_info=True)
+
+
+def get_logger(name):
+    return EventLogger(name)
+
+
+def stats():
+    return {"queued": _queue.qsize(), "level": LOG_LEVEL, "format": LOG_FORMAT, **_stats}
@@ -0,0 +1,57 @@
+"""
+테스트 공용 도구
+실행: 저장소 루트에서 python -m pytest -q (pytest.ini, requirements-dev.txt)
+"""
+import os
+import tempfile
+
+import pytest
+
+# 앱 모듈 import 전에 설정: 캐시 파일은 임시 폴더에, 시작 시 워밍업 없음
+_tmp = tempfile.mkdtemp(prefix="moodfolio-tests-")
+os.environ.setdefault("RESPONSE_CACHE_PATH", os.path.join(_tmp, "response_cache.db"))
+os.environ.setdefault("WARMUP_SUBSYSTEMS", "")
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    """supabase-py 쿼리 빌더 흉내 (select/eq/gte/order/limit 체이닝 후 execute)"""
+
+    def __init__(self, table, client):
+        self.table = table
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def chain(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return chain
+
+    def execute(self):
+        self.client.queries.append((self.table, self.calls))
+        result = self.client.tables.get(self.table, [])
+        if callable(result):
+            result = result(self.calls)
+        if isinstance(result, Exception):
+            raise result
+        return FakeResponse(result)
+
+
+class FakeSupabase:
+    def __init__(self, tables=None):
+        # 테이블 이름 → 행 목록, execute()에서 던질 예외, 또는 호출 기록(calls)을 받아 둘 중 하나를 돌려주는 함수
+        self.tables = tables or {}
+        self.queries = []
+
+    def table(self, name):
+        return FakeQuery(name, self)
+
+
+@pytest.fixture
+def fake_supabase():
+    return FakeSupabase()
@@ -0,0 +1,49 @@
+import pytest
+from postgrest.exceptions import APIError
+
+import admin_apis
+
+ROW = {"prompt_type": "chat", "model_name": "flash", "status": "success", "user_id": None,
+       "latency_ms": 120, "ttft_ms": 40}
+
+
+@pytest.fixture
+def ai_logs(monkeypatch, fake_supabase):
+    monkeypatch.setattr(admin_apis, "get_supabase", lambda: fake_supabase)
+    monkeypatch.setattr(admin_apis, "_telemetry_columns", True)
+    return fake_supabase
+
+
+def _inserted(calls):
+    return [args[0] for name, args, _ in calls if name == "insert"]
+
+
+def test_missing_telemetry_column_retries_without_telemetry(ai_logs):
+    def insert(calls):
+        rows = _inserted(calls)[0]
+        if "ttft_ms" in rows[0]:
+            return APIError({"code": "PGRST204",
+                             "message": "Could not find the 'ttft_ms' column of 'ai_logs' in the schema cache"})
+        return rows
+
+    ai_logs.tables = {"ai_logs": insert}
+
+    admin_apis._insert_ai_logs([dict(ROW)])
+
+    assert admin_apis._telemetry_columns is False
+    retried = _inserted(ai_logs.queries[-1][1])[0]
+    assert retried == [{"prompt_type": "chat", "model_name": "flash", "status": "success", "user_id": None}]
+
+
+@pytest.mark.parametrize("error", [
+    APIError({"code": "23502", "message": 'null value in column "prompt_type" violates not-null constraint'}),
+    RuntimeError("column count mismatch"),
+])
+def test_other_insert_errors_keep_telemetry_columns(ai_logs, error):
+    ai_logs.tables = {"ai_logs": error}
+
+    with pytest.raises(type(error)):
+        admin_apis._insert_ai_logs([dict(ROW)])
+
+    assert admin_apis._telemetry_columns is True
+    assert len(ai_logs.queries) == 1
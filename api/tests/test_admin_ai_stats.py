@@ -0,0 +1,73 @@
+from postgrest.exceptions import APIError
+
+import admin_apis
+import ai_rollups
+
+
+def _missing_table_error():
+    return APIError({"code": "PGRST205",
+                     "message": f"Could not find the table 'public.{ai_rollups.TABLE}' in the schema cache"})
+
+
+def test_falls_back_to_raw_logs_when_rollups_table_missing(monkeypatch, fake_supabase):
+    fake_supabase.tables = {
+        ai_rollups.TABLE: _missing_table_error(),
+        "ai_logs": [
+            {"prompt_type": "chat", "model_name": "flash", "status": "success", "cache_status": "miss", "latency_ms": 120},
+            {"prompt_type": "chat", "model_name": "flash", "status": "error", "latency_ms": 900},
+            {"prompt_type": "answers", "model_name": "pro", "status": "success", "cache_status": "hit"},
+        ],
+    }
+    monkeypatch.setattr(admin_apis, "get_admin_client", lambda: fake_supabase)
+    monkeypatch.setattr(admin_apis, "_rollups_table", True)
+
+    stats = admin_apis.get_ai_stats("daily", admin_email="admin@example.com")
+
+    assert "error" not in stats
+    assert stats["source"] == "raw_logs"
+    assert stats["total_requests"] == 3
+    assert stats["by_type"] == {"chat": 2, "answers": 1}
+    assert stats["by_status"] == {"success": 2, "error": 1}
+    assert stats["by_cache"] == {"miss": 1, "hit": 1}
+    assert stats["latency"]["latency_ms"]["count"] == 2
+    assert stats["latency_by_type"]["chat"]["latency_ms"]["p50"] == 120
+    # 다음 호출부터는 집계 테이블을 다시 찾지 않음
+    assert admin_apis._rollups_table is False
+    assert [table for table, _ in fake_supabase.queries] == [ai_rollups.TABLE, "ai_logs"]
+
+
+def test_raw_logs_query_is_limited_to_the_period(monkeypatch, fake_supabase):
+    fake_supabase.tables = {"ai_logs": []}
+    monkeypatch.setattr(admin_apis, "get_admin_client", lambda: fake_supabase)
+    monkeypatch.setattr(admin_apis, "_rollups_table", False)
+
+    stats = admin_apis.get_ai_stats("hourly", admin_email="admin@example.com")
+
+    assert stats["total_requests"] == 0
+    _, calls = fake_supabase.queries[0]
+    assert [args[0] for name, args, _ in calls if name == "gte"] == ["created_at"]
+
+
+def test_unexpected_error_is_reported_not_raised(monkeypatch, fake_supabase):
+    fake_supabase.tables = {ai_rollups.TABLE: RuntimeError("connection reset")}
+    monkeypatch.setattr(admin_apis, "get_admin_client", lambda: fake_supabase)
+    monkeypatch.setattr(admin_apis, "_rollups_table", True)
+
+    stats = admin_apis.get_ai_stats("daily", admin_email="admin@example.com")
+
+    assert stats["error"] == "connection reset"
+    assert admin_apis._rollups_table is True
+
+
+def test_other_errors_mentioning_the_table_do_not_switch_to_raw_logs(monkeypatch, fake_supabase):
+    fake_supabase.tables = {
+        ai_rollups.TABLE: APIError({"code": "42501", "message": f"permission denied for table {ai_rollups.TABLE}"}),
+    }
+    monkeypatch.setattr(admin_apis, "get_admin_client", lambda: fake_supabase)
+    monkeypatch.setattr(admin_apis, "_rollups_table", True)
+
+    stats = admin_apis.get_ai_stats("daily", admin_email="admin@example.com")
+
+    assert "permission denied" in stats["error"]
+    assert admin_apis._rollups_table is True
+    assert [table for table, _ in fake_supabase.queries] == [ai_rollups.TABLE]
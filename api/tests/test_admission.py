@@ -0,0 +1,146 @@
+import asyncio
+
+import pytest
+
+import admission
+from admission import AdaptiveLimiter, LLMBusyError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    return now
+
+
+async def settle():
+    # 깨운 대기자가 shield/wait_for를 거쳐 재개될 때까지 루프를 몇 번 돌린다
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_admits_up_to_capacity_then_rejects_when_queue_full():
+    async def scenario():
+        limiter = AdaptiveLimiter(max_limit=2, min_limit=1, queue_size=0)
+        await limiter.acquire()
+        await limiter.acquire()
+        assert not limiter.has_spare_capacity()
+        with pytest.raises(LLMBusyError) as exc:
+            await limiter.acquire()
+        assert exc.value.retry_after >= 1
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 2
+    assert limiter.counters["admitted"] == 2
+    assert limiter.counters["rejected_full"] == 1
+
+
+def test_queued_waiter_is_woken_in_fifo_order_on_release():
+    async def scenario():
+        limiter = AdaptiveLimiter(max_limit=1, min_limit=1, queue_size=4)
+        await limiter.acquire()
+        order = []
+
+        async def waiter(name):
+            await limiter.acquire()
+            order.append(name)
+
+        tasks = [asyncio.create_task(waiter(name)) for name in ("a", "b")]
+        await settle()
+        assert limiter.stats()["waiting"] == 2
+
+        limiter.release("success", latency=0.1)
+        await settle()
+        assert order == ["a"]
+        limiter.release("success", latency=0.1)
+        await asyncio.gather(*tasks)
+        assert order == ["a", "b"]
+        assert limiter.in_flight == 1
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.counters["queued"] == 2
+
+
+def test_queue_timeout_rejects_and_leaves_no_waiter():
+    async def scenario():
+        limiter = AdaptiveLimiter(max_limit=1, min_limit=1, queue_size=4)
+        await limiter.acquire()
+        with pytest.raises(LLMBusyError):
+            await limiter.acquire(timeout=0.01)
+        # 기한이 지난 대기자는 이후 반납에서 슬롯을 받지 않는다
+        limiter.release("success")
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.counters["rejected_timeout"] == 1
+    assert limiter.in_flight == 0
+    assert limiter.stats()["waiting"] == 0
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    async def scenario():
+        limiter = AdaptiveLimiter(max_limit=1, min_limit=1, queue_size=4)
+        await limiter.acquire()
+        task = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        limiter.release("success")
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 0
+
+
+def test_throttle_halves_limit_once_per_congestion_window(clock):
+    limiter = AdaptiveLimiter(max_limit=16, min_limit=2)
+    for _ in range(3):
+        limiter.in_flight += 1
+        limiter.release("throttled")
+    # 같은 구간의 연속 429는 한 번만 줄인다
+    assert limiter.limit == 8
+    assert limiter.counters["throttled"] == 3
+    assert limiter.counters["decreases"] == 1
+
+    clock[0] += 2
+    limiter.in_flight += 1
+    limiter.release("throttled")
+    assert limiter.limit == 4
+
+
+def test_limit_never_drops_below_minimum(clock):
+    limiter = AdaptiveLimiter(max_limit=4, min_limit=2)
+    for _ in range(5):
+        clock[0] += 2
+        limiter.in_flight += 1
+        limiter.release("throttled")
+    assert limiter.limit == 2
+
+
+def test_slow_success_decreases_and_fast_success_recovers_additively(clock):
+    limiter = AdaptiveLimiter(max_limit=10, min_limit=1, latency_target=1.0)
+    limiter.in_flight += 1
+    limiter.release("success", latency=5.0)
+    assert limiter.limit == pytest.approx(9.0)
+    assert limiter.latency_ewma == 5.0
+
+    limiter.in_flight += 1
+    limiter.release("success", latency=0.5)
+    assert limiter.limit == pytest.approx(9.0 + 1 / 9.0)
+    for _ in range(50):
+        limiter.in_flight += 1
+        limiter.release("success", latency=0.5)
+    assert limiter.limit == 10
+
+
+def test_is_throttled_recognizes_rate_limit_and_overload():
+    class ResourceExhausted(Exception):
+        pass
+
+    assert admission.is_throttled(ResourceExhausted("quota"))
+    assert admission.is_throttled(RuntimeError("429 Too Many Requests"))
+    assert admission.is_throttled(RuntimeError("503 UNAVAILABLE: model is overloaded"))
+    assert not admission.is_throttled(ValueError("invalid prompt"))
@@ -0,0 +1,32 @@
+import asyncio
+
+import chat_sessions
+import main
+
+PORTFOLIO_A = "=== 소유자 정보 ===\n이름: 김철수\n=== 보유 기술 ===\nPython"
+PORTFOLIO_B = "=== 소유자 정보 ===\n이름: 이영희\n=== 보유 기술 ===\nFigma"
+
+
+def test_history_is_scoped_to_the_sessions_portfolio():
+    context_a, session_id = chat_sessions.register(PORTFOLIO_A)
+    context_b = chat_sessions.context_id_for(PORTFOLIO_B)
+    chat_sessions.record_turn(session_id, context_a, "강점이 뭐예요?", "Python 백엔드입니다.")
+
+    assert chat_sessions.history(session_id, context_a) == [("human", "강점이 뭐예요?"), ("ai", "Python 백엔드입니다.")]
+    assert chat_sessions.history(session_id, context_b) == []
+
+    # 다른 포트폴리오로 대화를 이어가면 새 대화로 시작 (이전 포트폴리오의 기록은 지움)
+    chat_sessions.record_turn(session_id, context_b, "툴은?", "Figma를 씁니다.")
+    assert chat_sessions.history(session_id, context_a) == []
+    assert chat_sessions.history(session_id, context_b) == [("human", "툴은?"), ("ai", "Figma를 씁니다.")]
+
+
+def test_chat_request_for_another_portfolio_gets_no_history():
+    context_a, session_id = chat_sessions.register(PORTFOLIO_A)
+    chat_sessions.record_turn(session_id, context_a, "강점이 뭐예요?", "Python 백엔드입니다.")
+
+    same = main.ChatRequest(message="더 알려줘", context_id=context_a, session_id=session_id)
+    other = main.ChatRequest(message="더 알려줘", portfolio_context=PORTFOLIO_B, session_id=session_id)
+
+    assert asyncio.run(main.build_chat_call(same))[2]["history"] != []
+    assert asyncio.run(main.build_chat_call(other))[2]["history"] == []
@@ -0,0 +1,164 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+
+import generation_jobs
+import main
+
+
+class FakeJobStore:
+    """generation_jobs의 DB 함수 대체 (상태 변경 기록)"""
+
+    def __init__(self):
+        self.jobs = {}
+        self.transitions = []
+
+    def find_or_create(self, answers_hash):
+        for job in self.jobs.values():
+            if job["answers_hash"] == answers_hash and job["status"] != "failed":
+                return self.public(job), False
+        job = {"job_id": f"job-{len(self.jobs) + 1}", "answers_hash": answers_hash, "status": "queued",
+               "result": None, "error": None}
+        self.jobs[job["job_id"]] = job
+        return self.public(job), True
+
+    def update(self, job_id, status, result=None, error=None):
+        self.transitions.append((job_id, status))
+        self.jobs[job_id].update(status=status, result=result, error=error)
+
+    def load(self, job_id):
+        job = self.jobs.get(job_id)
+        return self.public(job) if job else None
+
+    @staticmethod
+    def public(job):
+        return {key: value for key, value in job.items() if key != "answers_hash"}
+
+
+@pytest.fixture
+def job_store(monkeypatch):
+    store = FakeJobStore()
+    monkeypatch.setattr(generation_jobs, "_find_or_create", store.find_or_create)
+    monkeypatch.setattr(generation_jobs, "_update", store.update)
+    monkeypatch.setattr(generation_jobs, "_load", store.load)
+    monkeypatch.setattr(generation_jobs, "_runners", {})
+    monkeypatch.setattr(generation_jobs, "_running", set())
+    monkeypatch.setattr(generation_jobs, "_slots", None)
+    monkeypatch.setattr(generation_jobs, "_submit_lock", None)
+    return store
+
+
+async def _post(path, json, headers=None):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        return await client.post(path, json=json, headers=headers)
+
+
+def test_async_submit_runs_job_in_the_accepting_request(monkeypatch, job_store):
+    generated = []
+
+    async def generate(data):
+        generated.append(data.answers)
+        return {"status": "success", "data": {"name": "테스트"}}
+
+    monkeypatch.setattr(main, "generate_portfolio_job", generate)
+
+    response = asyncio.run(_post("/submit", {"answers": {"q1": "a"}, "mode": "template"},
+                                 {"Prefer": "respond-async"}))
+
+    assert response.status_code == 202
+    body = response.json()
+    assert body["status"] == "queued" and "preview" in body
+    assert response.headers["location"] == f"/api/jobs/{body['job_id']}"
+    # BackgroundTask: 같은 요청(ASGI 호출)이 끝날 때 작업도 끝나 있음 (상주 워커 없음)
+    assert generated == [{"q1": "a"}]
+    assert job_store.transitions == [(body["job_id"], "running"), (body["job_id"], "succeeded")]
+    assert generation_jobs.stats()["in_progress"] == 0
+
+
+def test_duplicate_submit_does_not_run_again(monkeypatch, job_store):
+    calls = []
+
+    async def generate(data):
+        calls.append(1)
+        return {"status": "success"}
+
+    monkeypatch.setattr(main, "generate_portfolio_job", generate)
+    payload = {"answers": {"q1": "a"}, "mode": "template"}
+
+    first = asyncio.run(_post("/submit", payload, {"Prefer": "respond-async"}))
+    second = asyncio.run(_post("/submit", payload, {"Prefer": "respond-async"}))
+
+    assert first.json()["job_id"] == second.json()["job_id"]
+    assert second.status_code == 200 and second.json()["status"] == "succeeded"
+    assert calls == [1]
+
+
+def test_llm_failure_fails_the_job_instead_of_saving_template(monkeypatch, job_store):
+    import llm_calls
+
+    calls = []
+
+    async def generate_portfolio(data):
+        calls.append(1)
+        raise main.LLMBusyError("busy", 1)
+
+    monkeypatch.setattr(main, "generate_portfolio", generate_portfolio)
+    monkeypatch.setattr(llm_calls, "available", lambda: True)
+    payload = {"answers": {"q1": "a"}, "mode": "single"}
+
+    first = asyncio.run(_post("/submit", payload, {"Prefer": "respond-async"}))
+    # 템플릿은 즉시 미리보기로만 보여주고 작업 결과로 저장하지 않음
+    assert first.status_code == 202 and "preview" in first.json()
+    job = job_store.jobs[first.json()["job_id"]]
+    assert job["status"] == "failed" and job["result"] is None
+
+    # 실패한 작업은 재사용하지 않으므로 다시 제출하면 새로 생성
+    second = asyncio.run(_post("/submit", payload, {"Prefer": "respond-async"}))
+    assert second.json()["job_id"] != first.json()["job_id"]
+    assert calls == [1, 1]
+
+
+def test_failed_job_is_recorded(job_store):
+    async def boom():
+        raise RuntimeError("LLM down")
+
+    async def run():
+        job, created = await generation_jobs.submit("hash", boom)
+        assert created
+        await generation_jobs.run(job["job_id"])
+        return job["job_id"]
+
+    job_id = asyncio.run(run())
+    assert job_store.jobs[job_id]["status"] == "failed"
+    assert job_store.jobs[job_id]["error"] == "LLM down"
+
+
+def test_concurrency_is_limited_by_job_workers(monkeypatch, job_store):
+    monkeypatch.setattr(generation_jobs, "JOB_WORKERS", 2)
+    active = []
+    peak = []
+
+    async def runner():
+        active.append(1)
+        peak.append(len(active))
+        await asyncio.sleep(0.01)
+        active.pop()
+        return {}
+
+    async def run():
+        jobs = [await generation_jobs.submit(f"hash-{i}", runner) for i in range(5)]
+        await asyncio.gather(*(generation_jobs.run(job["job_id"]) for job, _ in jobs))
+
+    asyncio.run(run())
+    assert max(peak) == 2
+    assert sum(status == "succeeded" for _, status in job_store.transitions) == 5
+
+
+def test_timestamps_are_utc():
+    now = generation_jobs._utcnow()
+    assert now.tzinfo is None
+    assert abs((datetime.fromisoformat(generation_jobs._isoformat(now)) -
+                datetime.now().astimezone()).total_seconds()) < 5
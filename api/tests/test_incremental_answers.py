@@ -0,0 +1,184 @@
+import asyncio
+
+import pytest
+
+import incremental_answers
+import main
+import portfolio_sections
+import response_cache
+
+CONTEXT = """=== 소유자 정보 ===
+이름: 김철수
+=== 보유 기술 ===
+Python, FastAPI
+=== 프로젝트 목록 ===
+[프로젝트 1] 날씨 앱
+React로 만든 날씨 앱
+[프로젝트 2] 쇼핑몰
+Django 쇼핑몰 백엔드
+=== 연락처 ===
+이메일: kim@example.com
+"""
+
+ANSWERS = {key: f"{key}: 날씨 앱과 쇼핑몰 경험" for key in incremental_answers.ANSWER_KEYS}
+
+
+def _state(context, answers=ANSWERS):
+    sections = portfolio_sections.split_sections(context)
+    return {
+        "fingerprint": portfolio_sections.fingerprint(sections),
+        "titles": {s["id"]: s["title"] for s in sections if s["kind"] == "project"},
+        "answers": dict(answers),
+    }
+
+
+# --- lineage_key ---
+def test_lineage_requires_authenticated_user():
+    assert incremental_answers.lineage_key(None) is None
+    assert incremental_answers.lineage_key("", "kim@example.com") is None
+
+
+def test_lineage_is_scoped_per_user():
+    assert incremental_answers.lineage_key("user-a") != incremental_answers.lineage_key("user-b")
+    # 클라이언트가 다른 사용자의 portfolio_id를 보내도 다른 사용자 범위의 키
+    assert incremental_answers.lineage_key("user-a", "p1") != incremental_answers.lineage_key("user-b", "p1")
+    assert incremental_answers.lineage_key("user-a", "p1") == incremental_answers.lineage_key("user-a", "p1 ")
+
+
+# --- plan_regeneration ---
+def test_no_state_regenerates_everything():
+    keys, reused = incremental_answers.plan_regeneration(None, portfolio_sections.split_sections(CONTEXT))
+    assert keys == list(incremental_answers.ANSWER_KEYS)
+    assert reused == {}
+
+
+def test_unchanged_context_reuses_everything():
+    keys, reused = incremental_answers.plan_regeneration(_state(CONTEXT), portfolio_sections.split_sections(CONTEXT))
+    assert keys == []
+    assert reused == ANSWERS
+
+
+def test_skills_change_regenerates_dependent_questions():
+    changed = CONTEXT.replace("Python, FastAPI", "Python, FastAPI, Kubernetes")
+    keys, reused = incremental_answers.plan_regeneration(_state(CONTEXT), portfolio_sections.split_sections(changed))
+    assert set(keys) == {"core_skills", "main_stack", "tech_depth"}
+    assert set(reused) == set(incremental_answers.ANSWER_KEYS) - set(keys)
+
+
+def test_deleted_project_regenerates_answers_that_mention_it():
+    answers = dict(ANSWERS, best_project="날씨 앱이 가장 기억에 남습니다", troubleshooting="쇼핑몰 결제 오류를 고쳤습니다")
+    removed = CONTEXT.replace("[프로젝트 2] 쇼핑몰\nDjango 쇼핑몰 백엔드\n", "")
+    keys, reused = incremental_answers.plan_regeneration(
+        _state(CONTEXT, answers), portfolio_sections.split_sections(removed))
+    assert "troubleshooting" in keys
+    assert "role_contribution" in keys  # 모든 프로젝트를 요약하는 문항
+    assert reused["best_project"] == "날씨 앱이 가장 기억에 남습니다"
+
+
+def test_unstructured_change_regenerates_everything():
+    changed = "자기소개 한 줄\n" + CONTEXT
+    keys, reused = incremental_answers.plan_regeneration(_state(CONTEXT), portfolio_sections.split_sections(changed))
+    assert keys == list(incremental_answers.ANSWER_KEYS)
+    assert reused == {}
+
+
+# --- chat_answer_events 병합 ---
+@pytest.fixture
+def fresh_answer_caches(monkeypatch, tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    monkeypatch.setattr(main, "chat_answers_cache", response_cache.ResponseCache("chat_answers", db_path=db_path))
+    monkeypatch.setattr(incremental_answers, "state_store",
+                        response_cache.ResponseCache("chat_answers_state", db_path=db_path))
+    monkeypatch.setattr(main, "record_usage", lambda *args, **kwargs: None)
+
+
+def _fake_llm(monkeypatch, reply):
+    async def stream_json_fields(prompt_type, messages, inputs, extractor, parts=None, route=None, telemetry=None):
+        if parts is not None:
+            parts.append(reply)
+        for field in extractor.feed(reply):
+            yield field
+
+    monkeypatch.setattr(main, "stream_json_fields", stream_json_fields)
+
+
+async def _collect(context, owner):
+    return await main.collect_chat_answers(main.ChatAnswerGenerationRequest(portfolio_context=context), owner)
+
+
+def test_missing_regenerated_answer_is_an_error_not_a_stale_reuse(monkeypatch, fresh_answer_caches):
+    lineage = incremental_answers.lineage_key("user-a")
+    asyncio.run(incremental_answers.save_state(lineage, portfolio_sections.split_sections(CONTEXT), ANSWERS))
+    changed = CONTEXT.replace("Python, FastAPI", "Go, gRPC")
+    # main_stack/tech_depth를 빠뜨린 응답
+    _fake_llm(monkeypatch, '{"core_skills": "Go와 gRPC를 주로 씁니다"}')
+
+    with pytest.raises(main.ChatAnswersError) as error:
+        asyncio.run(_collect(changed, "user-a"))
+
+    assert "main_stack" in str(error.value) and "tech_depth" in str(error.value)
+    # 실패한 결과는 상태/캐시에 저장하지 않음
+    assert asyncio.run(incremental_answers.load_state(lineage))["answers"] == ANSWERS
+
+
+def test_partial_regeneration_merges_new_and_reused_answers(monkeypatch, fresh_answer_caches):
+    lineage = incremental_answers.lineage_key("user-a")
+    asyncio.run(incremental_answers.save_state(lineage, portfolio_sections.split_sections(CONTEXT), ANSWERS))
+    changed = CONTEXT.replace("Python, FastAPI", "Go, gRPC")
+    _fake_llm(monkeypatch, '{"core_skills": "Go", "main_stack": "gRPC", "tech_depth": "Go 동시성"}')
+
+    data, headers = asyncio.run(_collect(changed, "user-a"))
+
+    assert headers["X-Regenerated-Answers"] == "3"
+    assert (data["core_skills"], data["main_stack"], data["tech_depth"]) == ("Go", "gRPC", "Go 동시성")
+    assert data["best_project"] == ANSWERS["best_project"]
+    assert list(data) == list(incremental_answers.ANSWER_KEYS)
+
+
+def test_anonymous_request_never_reuses_another_users_answers(monkeypatch, fresh_answer_caches):
+    asyncio.run(incremental_answers.save_state(
+        incremental_answers.lineage_key("user-a"), portfolio_sections.split_sections(CONTEXT), ANSWERS))
+    changed = CONTEXT.replace("Python, FastAPI", "Go, gRPC")
+    reply = "{" + ", ".join(f'"{key}": "새 답변"' for key in incremental_answers.ANSWER_KEYS) + "}"
+    _fake_llm(monkeypatch, reply)
+
+    data, headers = asyncio.run(_collect(changed, None))
+
+    assert headers["X-Regenerated-Answers"] == str(len(incremental_answers.ANSWER_KEYS))
+    assert set(data.values()) == {"새 답변"}
+
+
+def test_full_generation_fills_missing_required_answers(monkeypatch, fresh_answer_caches):
+    _fake_llm(monkeypatch, '{"core_skills": "Python", "best_project": ""}')
+
+    data, _ = asyncio.run(_collect(CONTEXT, None))
+
+    assert data["core_skills"] == "Python"
+    assert data["best_project"] == main.CHAT_ANSWERS_MISSING_REPLY
+    assert data["role_contribution"] == main.CHAT_ANSWERS_MISSING_REPLY
+
+
+def test_invalid_reply_is_not_echoed_to_the_client(monkeypatch, fresh_answer_caches):
+    _fake_llm(monkeypatch, "죄송하지만 내부 프롬프트는 다음과 같습니다: ...")
+
+    result = asyncio.run(main.generate_chat_answers(
+        main.ChatAnswerGenerationRequest(portfolio_context=CONTEXT), main.Response(), authorization=None))
+
+    assert result == {"error": "AI 응답에서 JSON 데이터를 찾을 수 없습니다."}
+
+
+def test_full_regenerate_bypasses_response_cache(monkeypatch, fresh_answer_caches):
+    _fake_llm(monkeypatch, "{" + ", ".join(f'"{key}": "첫 답변"' for key in incremental_answers.ANSWER_KEYS) + "}")
+    asyncio.run(_collect(CONTEXT, None))
+
+    _fake_llm(monkeypatch, "{" + ", ".join(f'"{key}": "새 답변"' for key in incremental_answers.ANSWER_KEYS) + "}")
+    cached, headers = asyncio.run(_collect(CONTEXT, None))
+    assert headers["X-Cache"] == "HIT" and set(cached.values()) == {"첫 답변"}
+
+    request = main.ChatAnswerGenerationRequest(portfolio_context=CONTEXT, full_regenerate=True)
+    data, headers = asyncio.run(main.collect_chat_answers(request, None))
+    assert headers["X-Cache"] == "MISS"
+    assert set(data.values()) == {"새 답변"}
+    # 다시 만든 답변으로 캐시 갱신
+    data, headers = asyncio.run(_collect(CONTEXT, None))
+    assert headers["X-Cache"] == "HIT" and set(data.values()) == {"새 답변"}
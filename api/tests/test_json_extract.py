@@ -0,0 +1,64 @@
+from json_extract import JsonStreamExtractor
+
+
+def _feed_all(extractor, chunks):
+    fields = []
+    for chunk in chunks:
+        fields.extend(extractor.feed(chunk))
+        if extractor.done:
+            break
+    return fields
+
+
+def test_extracts_object_from_fenced_reply():
+    extractor = JsonStreamExtractor()
+    _feed_all(extractor, ['물론입니다!\n```json\n{"a": 1, "b": "둘"}\n```\n더 필요하면 말씀하세요.'])
+    assert extractor.close() == {"a": 1, "b": "둘"}
+    assert extractor.error is None
+
+
+def test_yields_fields_as_they_complete_across_chunks():
+    extractor = JsonStreamExtractor()
+    chunks = ['{"core', '_skills": "Py', 'thon", "nested": {"x": [1, ', '2]}, "last": "끝"}', ' trailing {"b": 2}']
+    fields = []
+    for chunk in chunks:
+        fields.append(extractor.feed(chunk))
+    assert fields[:2] == [[], []]
+    assert fields[2] == [("core_skills", "Python")]
+    assert fields[3] == [("nested", {"x": [1, 2]}), ("last", "끝")]
+    # 첫 객체가 완성되면 이후 텍스트는 읽지 않음
+    assert fields[4] == []
+    assert extractor.close() == {"core_skills": "Python", "nested": {"x": [1, 2]}, "last": "끝"}
+
+
+def test_braces_and_escaped_quotes_inside_strings():
+    extractor = JsonStreamExtractor()
+    _feed_all(extractor, ['{"code": "if (a) { return \\"}\\"; }", "n": 1}'])
+    assert extractor.close() == {"code": 'if (a) { return "}"; }', "n": 1}
+
+
+def test_skips_invalid_candidate_and_finds_next_object():
+    extractor = JsonStreamExtractor()
+    _feed_all(extractor, ['예시 {형식} 입니다. 실제 답변: {"a": 1}'])
+    assert extractor.close() == {"a": 1}
+
+
+def test_unterminated_and_missing_objects_report_errors():
+    unterminated = JsonStreamExtractor()
+    _feed_all(unterminated, ['{"a": 1, "b": '])
+    assert unterminated.close() is None
+    assert unterminated.error == "JSON 객체가 끝나지 않았습니다."
+
+    missing = JsonStreamExtractor()
+    _feed_all(missing, ["JSON이 없는 답변"])
+    assert missing.close() is None
+    assert missing.error == "AI 응답에서 JSON 데이터를 찾을 수 없습니다."
+
+
+def test_missing_keys_tracks_absent_and_empty_required_fields():
+    extractor = JsonStreamExtractor(required=("a", "b", "c"))
+    extractor.feed('{"a": "있음", "b": "", ')
+    assert extractor.missing_keys() == ["b", "c"]
+    extractor.feed('"c": "있음"}')
+    extractor.close()
+    assert extractor.missing_keys() == ["b"]
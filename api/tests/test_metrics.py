@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+import metrics
+
+
+def _in_flight():
+    return metrics.IN_FLIGHT._values.get((), 0)
+
+
+async def _call(app):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app({"type": "http", "method": "POST", "path": "/submit", "headers": []}, receive, send)
+
+
+def test_in_flight_drops_when_response_is_sent_not_after_background_work():
+    seen = {}
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 202, "headers": []})
+        seen["streaming"] = _in_flight()
+        await send({"type": "http.response.body", "body": b"{}", "more_body": False})
+        # 응답 뒤의 BackgroundTask (/submit 생성 작업)
+        seen["background"] = _in_flight()
+
+    before = _in_flight()
+    asyncio.run(_call(metrics.MetricsMiddleware(app)))
+
+    assert seen == {"streaming": before + 1, "background": before}
+    assert _in_flight() == before
+
+
+def test_in_flight_drops_when_app_fails_before_responding():
+    async def app(scope, receive, send):
+        raise RuntimeError("boom")
+
+    before = _in_flight()
+    with pytest.raises(RuntimeError):
+        asyncio.run(_call(metrics.MetricsMiddleware(app)))
+
+    assert _in_flight() == before
@@ -0,0 +1,24 @@
+import asyncio
+
+import readiness
+
+
+def test_llm_and_supabase_are_opt_in(monkeypatch):
+    monkeypatch.setattr(readiness, "_checks", {name: {"status": "pending"} for name in ("db", "llm", "supabase")})
+    monkeypatch.setattr(readiness, "WARMUP_SUBSYSTEMS", ["db"])
+    calls = []
+
+    def fail_db():
+        calls.append("db")
+        raise RuntimeError("schema check failed")
+
+    monkeypatch.setattr(readiness, "_STEPS", {"db": fail_db, "llm": lambda: calls.append("llm")})
+
+    asyncio.run(readiness.warm_up())
+    snapshot = readiness.snapshot()
+
+    assert calls == ["db"]
+    assert snapshot["checks"]["db"]["status"] == "failed"
+    assert snapshot["checks"]["db"]["detail"] == "schema check failed"
+    assert snapshot["checks"]["llm"]["status"] == "skipped"
+    assert snapshot["ready"] is False and snapshot["warming"] is False
@@ -0,0 +1,94 @@
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make_breaker(**options):
+    return CircuitBreaker(**{"window": 30, "min_calls": 4, "failure_ratio": 0.5, "open_seconds": 10, **options})
+
+
+def test_stays_closed_below_minimum_calls(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record(False)
+    assert breaker.state == "closed"
+
+
+def test_opens_at_failure_ratio_and_short_circuits(clock):
+    breaker = make_breaker()
+    for ok in (True, False, True, False):
+        breaker.before_call()
+        breaker.record(ok)
+    assert breaker.state == "open"
+
+    clock[0] += 3
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert exc.value.retry_after == 7
+    assert breaker.stats()["opened"] == 1
+    assert breaker.stats()["short_circuited"] == 1
+
+
+def test_old_results_fall_out_of_window(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record(False)
+    clock[0] += 31
+    breaker.record(True)
+    assert breaker.state == "closed"
+    assert breaker.stats()["recent_calls"] == 1
+
+
+def test_half_open_allows_single_probe_then_closes_on_success(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+    clock[0] += 10
+
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record(True)
+    assert breaker.state == "closed"
+    assert breaker.stats()["recent_calls"] == 0
+    breaker.before_call()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+    clock[0] += 10
+    breaker.before_call()
+    breaker.record(False)
+    assert breaker.state == "open"
+    assert breaker.stats()["opened"] == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_released_probe_lets_next_request_try(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+    clock[0] += 10
+    breaker.before_call()
+    breaker.release_probe()
+    breaker.before_call()
+    assert breaker.state == "half_open"
+
+
+def test_circuit_open_error_is_busy_error():
+    # 라우트는 대기열 초과와 같은 503 + Retry-After로 응답한다
+    assert issubclass(CircuitOpenError, resilience.LLMBusyError)
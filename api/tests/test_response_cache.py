@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+import pytest
+
+import response_cache
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    def make(namespace="test", **options):
+        return response_cache.ResponseCache(namespace, db_path=str(tmp_path / "cache.db"), **options)
+    return make
+
+
+def test_make_key_ignores_whitespace_differences():
+    a = response_cache.make_key("v1", "포트폴리오\r\n  내용   입니다\n\n\n\n끝")
+    b = response_cache.make_key("v1", "포트폴리오\n내용 입니다\n\n끝")
+    assert a == b
+    assert a != response_cache.make_key("v2", "포트폴리오\n내용 입니다\n\n끝")
+
+
+def test_memory_then_persistent_hits(make_cache):
+    cache = make_cache()
+    cache.set("k", {"answer": "값"})
+    assert cache.get("k") == {"answer": "값"}
+    assert cache.counters["memory_hits"] == 1
+
+    # 새 인스턴스(같은 SQLite 파일) → 영속 계층에서 읽고 메모리에 올림
+    restarted = make_cache()
+    assert restarted.get("k") == {"answer": "값"}
+    assert restarted.get("k") == {"answer": "값"}
+    assert (restarted.counters["persistent_hits"], restarted.counters["memory_hits"]) == (1, 1)
+    assert restarted.get("missing") is None
+    assert restarted.counters["misses"] == 1
+
+
+def test_expired_entries_are_not_returned(make_cache, monkeypatch):
+    cache = make_cache(ttl_seconds=10)
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    cache.set("k", "v")
+    now[0] += 11
+    assert cache.get("k") is None
+    assert make_cache(ttl_seconds=10).get("k") is None
+
+
+def test_memory_tier_is_lru_bounded(make_cache):
+    cache = make_cache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert list(cache._memory) == ["a", "c"]
+
+
+def test_persistent_eviction_is_amortized_and_keeps_recent_rows(make_cache):
+    cache = make_cache(max_entries=1, max_persistent_entries=10)
+    statements = []
+    cache._db().set_trace_callback(statements.append)
+    for i in range(11):
+        cache.set(f"k{i}", i)
+    # 상한(10) + 여유(1) 이내: 정리 쿼리 없음
+    assert not any(sql.startswith("DELETE") for sql in statements)
+
+    cache.set("k11", 11)
+    assert sum(sql.startswith("DELETE") for sql in statements) == 2  # 만료 + LRU 각 1번
+    assert cache.stats()["persistent_rows"] == 10
+    restarted = make_cache()
+    assert restarted.get("k0") is None and restarted.get("k1") is None
+    assert restarted.get("k11") == 11
+
+
+def test_async_api_runs_sqlite_off_the_event_loop(make_cache):
+    cache = make_cache()
+    loop_threads = []
+    sqlite_threads = []
+    original = cache._persistent_get
+
+    def persistent_get(key, now):
+        sqlite_threads.append(threading.get_ident())
+        return original(key, now)
+
+    cache._persistent_get = persistent_get
+
+    async def run():
+        loop_threads.append(threading.get_ident())
+        await cache.aset("k", [1, 2])
+        cache._memory.clear()
+        return await cache.aget("k"), await cache.aget("k")
+
+    assert asyncio.run(run()) == ([1, 2], [1, 2])
+    # 두 번째 조회는 메모리 적중 → SQLite 조회는 한 번, 루프 스레드가 아닌 곳에서
+    assert len(sqlite_threads) == 1
+    assert sqlite_threads[0] != loop_threads[0]
+
+
+def test_unwritable_path_falls_back_to_memory(tmp_path):
+    cache = response_cache.ResponseCache("test", db_path=str(tmp_path / "missing" / "cache.db"))
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+    assert cache.stats()["persistent"] is False
@@ -0,0 +1,156 @@
+import asyncio
+
+import buffered_writer
+import generation_jobs
+import tracing
+
+
+async def _call(app, path="/t"):
+    """ASGI 앱을 직접 호출 → (status, headers dict)"""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app({"type": "http", "method": "GET", "path": path, "headers": []}, receive, send)
+    start = next(message for message in sent if message["type"] == "http.response.start")
+    return start["status"], dict(start["headers"])
+
+
+async def _respond(send, status=200):
+    await send({"type": "http.response.start", "status": status, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def test_span_outside_request_does_nothing():
+    with tracing.span("db"):
+        pass
+    tracing.record("gemini", 0.5)
+    assert tracing.current_id() is None
+
+
+def test_server_timing_header_sums_spans():
+    async def app(scope, receive, send):
+        with tracing.span("db"):
+            pass
+        tracing.record("db", 0.002)
+        tracing.record("gemini", 0.25)
+        await _respond(send)
+
+    status, headers = asyncio.run(_call(tracing.TracingMiddleware(app)))
+
+    assert status == 200
+    timing = headers[b"server-timing"].decode()
+    assert 'db;dur=' in timing and 'desc="db x2"' in timing
+    assert "gemini;dur=250.0" in timing
+    assert "app;dur=" in timing
+
+
+def test_finished_trace_ignores_late_spans(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+    captured = {}
+
+    async def app(scope, receive, send):
+        captured["trace"] = tracing._trace.get()
+        captured["span"] = tracing.span("late")
+        await _respond(send)
+
+    async def run():
+        await _call(tracing.TracingMiddleware(app))
+        trace = captured["trace"]
+        spans = len(trace.spans)
+        # 요청이 끝난 뒤에도 같은 컨텍스트를 잡고 있는 코드가 기록을 시도
+        trace.add("gemini", 0, 0.1)
+        with captured["span"]:
+            pass
+        return trace, spans
+
+    trace, spans = asyncio.run(run())
+    assert trace.finished
+    assert len(trace.spans) == spans == 0
+
+
+def test_writer_task_does_not_inherit_request_trace():
+    seen = []
+
+    def insert_batch(batch):
+        seen.append((tracing.current_id(), len(batch)))
+
+    writer = buffered_writer.BufferedWriter("test", insert_batch, batch_size=1, flush_interval=0.01)
+
+    async def app(scope, receive, send):
+        writer.add({"n": 1})  # 첫 add()가 요청 안에서 writer 태스크를 시작
+        await _respond(send)
+
+    async def run():
+        await _call(tracing.TracingMiddleware(app))
+        for _ in range(100):
+            if seen:
+                break
+            await asyncio.sleep(0.01)
+        await writer.flush()
+
+    asyncio.run(run())
+    assert seen == [(None, 1)]
+
+
+def test_background_job_does_not_record_into_request_trace(monkeypatch):
+    monkeypatch.setattr(generation_jobs, "_runners", {})
+    monkeypatch.setattr(generation_jobs, "_find_or_create", lambda answers_hash: ({"job_id": answers_hash}, True))
+    monkeypatch.setattr(generation_jobs, "_update", lambda *args, **kwargs: None)
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+    traces = []
+    done = []
+
+    async def runner():
+        tracing.record("gemini", 0.5)
+        done.append(tracing.current_id())
+        return {}
+
+    async def app(scope, receive, send):
+        traces.append(tracing._trace.get())
+        job, _ = await generation_jobs.submit(scope["path"], runner)
+        await _respond(send, 202)
+        # BackgroundTask처럼 응답을 보낸 뒤 같은 ASGI 호출 안에서 실행
+        await generation_jobs.run(job["job_id"])
+
+    async def run():
+        middleware = tracing.TracingMiddleware(app)
+        await _call(middleware, "/first")
+        await _call(middleware, "/second")
+
+    asyncio.run(run())
+    assert done == [None, None]
+    assert all(trace.spans == [] for trace in traces)
+
+
+def test_failed_query_leaves_no_state_on_pooled_connection(monkeypatch):
+    from sqlalchemy import create_engine, event, text
+    from sqlalchemy.exc import OperationalError
+
+    import database
+
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+    engine = create_engine("sqlite://")
+    event.listen(engine, "before_cursor_execute", database._before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", database._after_cursor_execute)
+    captured = {}
+
+    async def app(scope, receive, send):
+        captured["trace"] = tracing._trace.get()
+        with engine.connect() as conn:
+            try:
+                conn.execute(text("SELECT * FROM missing_table"))
+            except OperationalError:
+                pass
+            conn.execute(text("SELECT 1"))
+            captured["info"] = dict(conn.info)
+        await _respond(send)
+
+    asyncio.run(_call(tracing.TracingMiddleware(app)))
+
+    assert captured["info"] == {}
+    assert [span["name"] for span in captured["trace"].to_dict()["spans"]] == ["db"]
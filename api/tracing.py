@@ -0,0 +1,212 @@
+"""
+요청 단위 구간 추적 (Server-Timing)
+
+요청마다 trace를 만들고, 처리 중 span("bcrypt") 같은 구간 시간을 모은다.
+- 응답 헤더 Server-Timing으로 구간별 합계를 보냄 → 브라우저 개발자 도구(Network → Timing)에서 바로 확인
+  (스트리밍 응답은 헤더를 보내는 시점까지 끝난 구간만 포함)
+- 일부 요청(TRACE_SAMPLE_RATE)과 느린 요청(TRACE_SLOW_MS 이상), 5xx 응답은 구간 목록 전체를
+  메모리 링 버퍼에 보관 → /api/admin/traces로 조회
+- trace는 contextvars로 전달되므로 스레드풀(동기 핸들러, DB/Supabase 호출)과 asyncio 태스크에서도 같은 요청에 기록된다
+- 요청 밖(백그라운드 작업)에서는 span()이 아무것도 하지 않음
+  요청 중에 시작되지만 요청과 별개인 태스크(로그 writer, 응답 뒤 생성 작업)는 detached_task()로 만들어 요청 trace를 물려받지 않게 한다
+- 끝나서 보관된 trace에는 더 기록하지 않음 (요청보다 오래 사는 태스크가 남긴 구간이 섞이지 않도록)
+
+구간 이름
+- bcrypt: 비밀번호 해시/검증, db: SQL 실행 (database.py 이벤트), json: portfolio_data 디코딩
+- llm_queue: Gemini 동시 실행 슬롯 대기, gemini / supabase / kakao / naver / google-certs: 외부 호출 (metrics.observe_outbound)
+
+환경 변수
+- SERVER_TIMING: Server-Timing 헤더 전송 여부 (기본 1)
+- TRACE_SAMPLE_RATE: 링 버퍼에 보관할 일반 요청 비율 (기본 0.1)
+- TRACE_SLOW_MS: 항상 보관할 느린 요청 기준 ms (기본 1000)
+- TRACE_BUFFER_SIZE: 보관할 trace 수 (기본 200)
+"""
+import asyncio
+import contextvars
+import os
+import random
+import time
+import uuid
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") not in ("0", "false", "False")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "1000"))
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+# 한 요청에서 기록할 최대 구간 수 (긴 스트리밍/반복 쿼리에서 메모리 제한)
+MAX_SPANS = 200
+
+_trace = contextvars.ContextVar("trace", default=None)
+_parent = contextvars.ContextVar("trace_parent", default=None)
+_buffer = deque(maxlen=max(1, TRACE_BUFFER_SIZE))
+_stats = {"seen": 0, "kept": 0, "dropped_spans": 0}
+_NULL_SPAN = nullcontext()
+
+
+class Trace:
+    def __init__(self, method, path):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.route = None
+        self.status = None
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.duration_ms = None
+        self.finished = False
+        self.spans = []
+
+    def add(self, name, started, seconds, parent=None):
+        if self.finished:
+            return None
+        if len(self.spans) >= MAX_SPANS:
+            _stats["dropped_spans"] += 1
+            return None
+        index = len(self.spans)
+        self.spans.append({
+            "name": name,
+            "start_ms": round((started - self.started) * 1000, 2),
+            "duration_ms": round(seconds * 1000, 2),
+            "parent": parent,
+        })
+        return index
+
+    def server_timing(self):
+        """구간 이름별 합계 → Server-Timing 헤더 값 (같은 이름이 여러 번이면 횟수 표시)"""
+        totals = {}
+        for span in self.spans:
+            total = totals.setdefault(span["name"], [0.0, 0])
+            total[0] += span["duration_ms"]
+            total[1] += 1
+        entries = [
+            f'{name};dur={duration:.1f}' + (f';desc="{name} x{count}"' if count > 1 else "")
+            for name, (duration, count) in totals.items()
+        ]
+        entries.append(f"app;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "spans": self.spans,
+        }
+
+
+class _Span:
+    __slots__ = ("trace", "name", "started", "index", "token")
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        # 자리를 먼저 잡아 두고(시작 순서 유지) 끝날 때 시간 채움, 하위 구간은 이 구간을 parent로
+        self.index = self.trace.add(self.name, self.started, 0, _parent.get())
+        self.token = _parent.set(self.index)
+        return self
+
+    def __exit__(self, *exc):
+        _parent.reset(self.token)
+        if self.index is not None and not self.trace.finished:
+            self.trace.spans[self.index]["duration_ms"] = round((time.perf_counter() - self.started) * 1000, 2)
+        return False
+
+
+def span(name):
+    """with tracing.span("db"): ... (요청 밖에서는 아무것도 하지 않음)"""
+    trace = _trace.get()
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, name)
+
+
+def record(name, seconds, started=None):
+    """이미 끝난 구간 기록 (이벤트 훅/콜백에서 시간만 알 때). started가 없으면 지금 끝난 것으로 계산"""
+    trace = _trace.get()
+    if trace is None:
+        return
+    if started is None:
+        started = time.perf_counter() - seconds
+    trace.add(name, started, seconds, _parent.get())
+
+
+def detached_task(coro):
+    """요청 contextvars(trace)를 물려받지 않는 태스크 시작 (요청 안에서 처음 만들어지는 상주 태스크용)"""
+    return asyncio.get_running_loop().create_task(coro, context=contextvars.Context())
+
+
+def current_id():
+    trace = _trace.get()
+    return trace.id if trace is not None else None
+
+
+def _keep(trace):
+    _stats["seen"] += 1
+    if trace.duration_ms >= TRACE_SLOW_MS or (trace.status or 500) >= 500 or random.random() < TRACE_SAMPLE_RATE:
+        _buffer.append(trace)
+        _stats["kept"] += 1
+
+
+def dump(limit=50, slow_only=False):
+    """보관된 trace 최신순 (관리자 조회)"""
+    traces = [trace for trace in reversed(_buffer) if not slow_only or trace.duration_ms >= TRACE_SLOW_MS]
+    return {"traces": [trace.to_dict() for trace in traces[:max(0, limit)]], **stats()}
+
+
+def stats():
+    return {
+        "buffered": len(_buffer),
+        "sample_rate": TRACE_SAMPLE_RATE,
+        "slow_ms": TRACE_SLOW_MS,
+        **_stats,
+    }
+
+
+class TracingMiddleware:
+    """요청마다 trace 시작, 응답 헤더에 Server-Timing 추가, 끝나면 샘플링해서 보관 (순수 ASGI)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(scope["method"], scope["path"])
+        token = _trace.set(trace)
+        ended = None
+
+        async def send_with_timing(message):
+            nonlocal ended
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+                if SERVER_TIMING:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"server-timing", trace.server_timing().encode("latin-1")),
+                        # 다른 출처(로컬 프론트엔드)에서도 개발자 도구/Resource Timing에 구간 표시
+                        (b"timing-allow-origin", b"*"),
+                    ]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                ended = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _trace.reset(token)
+            trace.finished = True
+            # 응답을 다 보낸 시점까지 (응답 뒤의 BackgroundTask 시간은 제외)
+            trace.duration_ms = round(((ended or time.perf_counter()) - trace.started) * 1000, 2)
+            trace.route = getattr(scope.get("route"), "path", None)
+            _keep(trace)
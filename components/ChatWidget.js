@@ -127,6 +127,8 @@ export default function ChatWidget({ customMessage, isSharedView = false, portfo
 
   const [isLoading, setIsLoading] = useState(false);
   const scrollRef = useRef(null);
+  // 서버에 등록한 포트폴리오 컨텍스트 ({ contextStr, contextId }) 와 대화 세션 ID
+  const chatSessionRef = useRef({ contextStr: null, contextId: null, sessionId: null });
 
   // Helper function to safely convert any value to string
   const safeStringify = (value) => {
@@ -253,20 +255,51 @@ export default function ChatWidget({ customMessage, isSharedView = false, portfo
       const contextStr = portfolioContext && typeof portfolioContext === 'object'
         ? JSON.stringify(portfolioContext, null, 2)
         : portfolioContext;
+      const headers = {
+        "Content-Type": "application/json",
+        "ngrok-skip-browser-warning": "true"
+      };
 
-      const res = await fetch(`${apiUrl}/chat`, {
+      // 컨텍스트는 바뀔 때만 한 번 등록하고, 이후에는 context_id만 보낸다
+      const registerContext = async () => {
+        const session = chatSessionRef.current;
+        const regRes = await fetch(`${apiUrl}/api/chat/sessions`, {
+          method: "POST",
+          headers,
+          body: JSON.stringify({ portfolio_context: contextStr, session_id: session.sessionId })
+        });
+        if (!regRes.ok) throw new Error(`Session Error: ${regRes.status}`);
+        const reg = await regRes.json();
+        chatSessionRef.current = { contextStr, contextId: reg.context_id, sessionId: reg.session_id };
+      };
+
+      const postChat = () => fetch(`${apiUrl}/chat`, {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-          "ngrok-skip-browser-warning": "true"
-        },
+        headers,
         body: JSON.stringify({
           message: msgText,
-          portfolio_context: contextStr,
+          context_id: contextStr ? chatSessionRef.current.contextId : null,
+          session_id: chatSessionRef.current.sessionId,
           is_shared: isSharedView
         }),
       });
 
+      if (contextStr && chatSessionRef.current.contextStr !== contextStr) {
+        await registerContext();
+      }
+      let res = await postChat();
+      // 409: 서버(다른 인스턴스)에서 컨텍스트를 찾지 못함 → 다시 등록 후 한 번 재시도
+      if (res.status === 409 && contextStr) {
+        await registerContext();
+        res = await postChat();
+      }
+
+      // 503: AI 요청이 몰려 대기열이 가득 참 → 서버가 보낸 안내 문구를 그대로 표시
+      if (res.status === 503) {
+        const busy = await res.json();
+        setMessages((prev) => [...prev, { role: "ai", text: safeStringify(busy.reply) }]);
+        return;
+      }
       if (!res.ok) throw new Error(`Server Error: ${res.status}`);
       const data = await res.json();
       setMessages((prev) => {
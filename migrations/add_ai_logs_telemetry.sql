@@ -0,0 +1,22 @@
+-- Migration: Add LLM call telemetry columns to ai_logs
+-- 호출마다 대기열 대기 / 첫 토큰까지 시간 / 전체 지연 / 토큰 수 / 캐시 여부 / 실제 결과를 기록
+-- (api/admin_apis.py log_ai_usage → get_ai_stats에서 백분위로 집계)
+
+ALTER TABLE ai_logs ADD COLUMN IF NOT EXISTS queue_wait_ms INTEGER;
+ALTER TABLE ai_logs ADD COLUMN IF NOT EXISTS ttft_ms INTEGER;
+ALTER TABLE ai_logs ADD COLUMN IF NOT EXISTS latency_ms INTEGER;
+ALTER TABLE ai_logs ADD COLUMN IF NOT EXISTS prompt_tokens INTEGER;
+ALTER TABLE ai_logs ADD COLUMN IF NOT EXISTS completion_tokens INTEGER;
+-- hit: 저장된 응답 사용 / miss: LLM 호출 / shared: 같은 시점의 동일 요청과 호출 공유
+ALTER TABLE ai_logs ADD COLUMN IF NOT EXISTS cache_status TEXT;
+-- 실패 시 예외 종류 (LLMTimeoutError, CircuitOpenError 등)
+ALTER TABLE ai_logs ADD COLUMN IF NOT EXISTS error_type TEXT;
+
+-- status 값: success | error | timeout | busy | cancelled
+CREATE INDEX IF NOT EXISTS idx_ai_logs_status ON ai_logs(status);
+
+-- 검증
+SELECT column_name, data_type
+FROM information_schema.columns
+WHERE table_name = 'ai_logs'
+ORDER BY ordinal_position;
@@ -0,0 +1,223 @@
+-- Migration: AI usage rollups (시간/일/주 단위 사용량 집계)
+-- ai_logs에 행이 들어올 때마다 트리거가 버킷별 카운터를 증가시킨다.
+-- /api/admin/stats/ai(api/ai_rollups.py)는 원본 로그 대신 이 테이블만 읽으므로
+-- 로그가 아무리 쌓여도 조회 비용은 기간 × (prompt_type, model_name, status) 조합 수로 고정된다.
+-- 버킷 경계는 UTC 기준, 주(week)는 월요일 시작 (date_trunc)
+-- 선행: migrations/add_ai_logs_telemetry.sql
+
+-- 1. 집계 테이블
+CREATE TABLE IF NOT EXISTS ai_usage_rollups (
+  granularity TEXT NOT NULL,
+  bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+  prompt_type TEXT NOT NULL,
+  model_name TEXT NOT NULL,
+  status TEXT NOT NULL,
+
+  requests BIGINT NOT NULL DEFAULT 0,
+  cache_hit BIGINT NOT NULL DEFAULT 0,
+  cache_shared BIGINT NOT NULL DEFAULT 0,
+  cache_miss BIGINT NOT NULL DEFAULT 0,
+  prompt_tokens BIGINT NOT NULL DEFAULT 0,
+  completion_tokens BIGINT NOT NULL DEFAULT 0,
+
+  -- 평균 계산용 합계/개수 (지표가 있는 로그만)
+  queue_wait_count BIGINT NOT NULL DEFAULT 0,
+  queue_wait_ms_sum BIGINT NOT NULL DEFAULT 0,
+  ttft_count BIGINT NOT NULL DEFAULT 0,
+  ttft_ms_sum BIGINT NOT NULL DEFAULT 0,
+  latency_count BIGINT NOT NULL DEFAULT 0,
+  latency_ms_sum BIGINT NOT NULL DEFAULT 0,
+
+  -- 지연 히스토그램 (백분위 근사용, 구간 상한 ms)
+  latency_le_250 BIGINT NOT NULL DEFAULT 0,
+  latency_le_500 BIGINT NOT NULL DEFAULT 0,
+  latency_le_1000 BIGINT NOT NULL DEFAULT 0,
+  latency_le_2000 BIGINT NOT NULL DEFAULT 0,
+  latency_le_5000 BIGINT NOT NULL DEFAULT 0,
+  latency_le_10000 BIGINT NOT NULL DEFAULT 0,
+  latency_le_30000 BIGINT NOT NULL DEFAULT 0,
+  latency_le_60000 BIGINT NOT NULL DEFAULT 0,
+  latency_gt_60000 BIGINT NOT NULL DEFAULT 0,
+
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+  CONSTRAINT valid_granularity CHECK (granularity IN ('hour', 'day', 'week')),
+  PRIMARY KEY (granularity, bucket_start, prompt_type, model_name, status)
+);
+
+-- 기간 조회: granularity = ? AND bucket_start >= ?
+CREATE INDEX IF NOT EXISTS idx_ai_usage_rollups_bucket
+  ON ai_usage_rollups(granularity, bucket_start DESC);
+
+-- 관리자(service_role)만 조회
+ALTER TABLE ai_usage_rollups ENABLE ROW LEVEL SECURITY;
+
+-- 2. 증가분 반영 (new_rows: 이번 INSERT 문으로 들어온 행 전체)
+DROP TRIGGER IF EXISTS ai_logs_rollup ON ai_logs;
+DROP FUNCTION IF EXISTS apply_ai_usage_rollups();
+
+CREATE OR REPLACE FUNCTION apply_ai_usage_rollups()
+RETURNS TRIGGER
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  -- 행마다가 아니라 INSERT 문마다 한 번 실행: 배치(LOG_BATCH_SIZE건)를 묶어서 upsert 한 번
+  INSERT INTO ai_usage_rollups AS r (
+    granularity, bucket_start, prompt_type, model_name, status,
+    requests, cache_hit, cache_shared, cache_miss, prompt_tokens, completion_tokens,
+    queue_wait_count, queue_wait_ms_sum, ttft_count, ttft_ms_sum, latency_count, latency_ms_sum,
+    latency_le_250, latency_le_500, latency_le_1000, latency_le_2000, latency_le_5000,
+    latency_le_10000, latency_le_30000, latency_le_60000, latency_gt_60000
+  )
+  SELECT
+    g.granularity,
+    date_trunc(g.granularity, n.created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+    COALESCE(n.prompt_type, 'unknown'),
+    COALESCE(n.model_name, 'unknown'),
+    COALESCE(n.status, 'unknown'),
+    COUNT(*),
+    COUNT(*) FILTER (WHERE n.cache_status = 'hit'),
+    COUNT(*) FILTER (WHERE n.cache_status = 'shared'),
+    COUNT(*) FILTER (WHERE n.cache_status = 'miss'),
+    COALESCE(SUM(n.prompt_tokens), 0),
+    COALESCE(SUM(n.completion_tokens), 0),
+    COUNT(n.queue_wait_ms), COALESCE(SUM(n.queue_wait_ms), 0),
+    COUNT(n.ttft_ms), COALESCE(SUM(n.ttft_ms), 0),
+    COUNT(n.latency_ms), COALESCE(SUM(n.latency_ms), 0),
+    COUNT(*) FILTER (WHERE n.latency_ms <= 250),
+    COUNT(*) FILTER (WHERE n.latency_ms > 250 AND n.latency_ms <= 500),
+    COUNT(*) FILTER (WHERE n.latency_ms > 500 AND n.latency_ms <= 1000),
+    COUNT(*) FILTER (WHERE n.latency_ms > 1000 AND n.latency_ms <= 2000),
+    COUNT(*) FILTER (WHERE n.latency_ms > 2000 AND n.latency_ms <= 5000),
+    COUNT(*) FILTER (WHERE n.latency_ms > 5000 AND n.latency_ms <= 10000),
+    COUNT(*) FILTER (WHERE n.latency_ms > 10000 AND n.latency_ms <= 30000),
+    COUNT(*) FILTER (WHERE n.latency_ms > 30000 AND n.latency_ms <= 60000),
+    COUNT(*) FILTER (WHERE n.latency_ms > 60000)
+  FROM new_rows n
+  CROSS JOIN (VALUES ('hour'), ('day'), ('week')) AS g(granularity)
+  GROUP BY 1, 2, 3, 4, 5
+  ON CONFLICT (granularity, bucket_start, prompt_type, model_name, status) DO UPDATE SET
+    requests = r.requests + EXCLUDED.requests,
+    cache_hit = r.cache_hit + EXCLUDED.cache_hit,
+    cache_shared = r.cache_shared + EXCLUDED.cache_shared,
+    cache_miss = r.cache_miss + EXCLUDED.cache_miss,
+    prompt_tokens = r.prompt_tokens + EXCLUDED.prompt_tokens,
+    completion_tokens = r.completion_tokens + EXCLUDED.completion_tokens,
+    queue_wait_count = r.queue_wait_count + EXCLUDED.queue_wait_count,
+    queue_wait_ms_sum = r.queue_wait_ms_sum + EXCLUDED.queue_wait_ms_sum,
+    ttft_count = r.ttft_count + EXCLUDED.ttft_count,
+    ttft_ms_sum = r.ttft_ms_sum + EXCLUDED.ttft_ms_sum,
+    latency_count = r.latency_count + EXCLUDED.latency_count,
+    latency_ms_sum = r.latency_ms_sum + EXCLUDED.latency_ms_sum,
+    latency_le_250 = r.latency_le_250 + EXCLUDED.latency_le_250,
+    latency_le_500 = r.latency_le_500 + EXCLUDED.latency_le_500,
+    latency_le_1000 = r.latency_le_1000 + EXCLUDED.latency_le_1000,
+    latency_le_2000 = r.latency_le_2000 + EXCLUDED.latency_le_2000,
+    latency_le_5000 = r.latency_le_5000 + EXCLUDED.latency_le_5000,
+    latency_le_10000 = r.latency_le_10000 + EXCLUDED.latency_le_10000,
+    latency_le_30000 = r.latency_le_30000 + EXCLUDED.latency_le_30000,
+    latency_le_60000 = r.latency_le_60000 + EXCLUDED.latency_le_60000,
+    latency_gt_60000 = r.latency_gt_60000 + EXCLUDED.latency_gt_60000,
+    updated_at = NOW();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER ai_logs_rollup
+  AFTER INSERT ON ai_logs
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION apply_ai_usage_rollups();
+
+-- SECURITY DEFINER 함수는 기본으로 PUBLIC에 실행 권한이 있어 anon 키로도 /rest/v1/rpc 호출이 가능 → service_role만 허용
+REVOKE EXECUTE ON FUNCTION apply_ai_usage_rollups() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION apply_ai_usage_rollups() TO service_role;
+
+-- 3. 원본 로그로 버킷 재계산 (백필 / 집계가 어긋났을 때)
+--    since 이후(주 시작으로 내림)의 버킷을 지우고 ai_logs에서 다시 계산. since가 NULL이면 전체
+--    재계산 중에는 ai_logs INSERT를 잠가서 트리거 증가분과 겹치지 않게 함
+--    보존 기간이 지나 원본이 지워진 주는 재계산하지 않음 (ai_logs_retention, migrations/partition_ai_logs.sql)
+--    api/backfill_ai_rollups.py에서 호출
+DROP FUNCTION IF EXISTS rebuild_ai_usage_rollups(TIMESTAMP WITH TIME ZONE);
+
+CREATE OR REPLACE FUNCTION rebuild_ai_usage_rollups(since TIMESTAMP WITH TIME ZONE DEFAULT NULL)
+RETURNS BIGINT
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  start_at TIMESTAMP WITH TIME ZONE;
+  pruned TIMESTAMP WITH TIME ZONE;
+  rebuilt BIGINT;
+BEGIN
+  LOCK TABLE ai_logs IN SHARE MODE;
+
+  -- 주 경계는 일/시간 경계이기도 하므로 세 단위 모두 같은 시작점에서 재계산
+  start_at := CASE WHEN since IS NULL THEN NULL
+                   ELSE date_trunc('week', since AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' END;
+
+  IF to_regclass('public.ai_logs_retention') IS NOT NULL THEN
+    SELECT pruned_before INTO pruned FROM ai_logs_retention;
+  END IF;
+  IF pruned IS NOT NULL THEN
+    -- 원본이 일부만 남은 주는 건너뛰고 그 다음 주부터
+    pruned := date_trunc('week', (pruned AT TIME ZONE 'UTC') - INTERVAL '1 microsecond' + INTERVAL '1 week') AT TIME ZONE 'UTC';
+    start_at := GREATEST(COALESCE(start_at, pruned), pruned);
+  END IF;
+
+  DELETE FROM ai_usage_rollups WHERE start_at IS NULL OR bucket_start >= start_at;
+
+  INSERT INTO ai_usage_rollups (
+    granularity, bucket_start, prompt_type, model_name, status,
+    requests, cache_hit, cache_shared, cache_miss, prompt_tokens, completion_tokens,
+    queue_wait_count, queue_wait_ms_sum, ttft_count, ttft_ms_sum, latency_count, latency_ms_sum,
+    latency_le_250, latency_le_500, latency_le_1000, latency_le_2000, latency_le_5000,
+    latency_le_10000, latency_le_30000, latency_le_60000, latency_gt_60000
+  )
+  SELECT
+    g.granularity,
+    date_trunc(g.granularity, s.created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+    COALESCE(s.prompt_type, 'unknown'),
+    COALESCE(s.model_name, 'unknown'),
+    COALESCE(s.status, 'unknown'),
+    COUNT(*),
+    COUNT(*) FILTER (WHERE s.cache_status = 'hit'),
+    COUNT(*) FILTER (WHERE s.cache_status = 'shared'),
+    COUNT(*) FILTER (WHERE s.cache_status = 'miss'),
+    COALESCE(SUM(s.prompt_tokens), 0),
+    COALESCE(SUM(s.completion_tokens), 0),
+    COUNT(s.queue_wait_ms), COALESCE(SUM(s.queue_wait_ms), 0),
+    COUNT(s.ttft_ms), COALESCE(SUM(s.ttft_ms), 0),
+    COUNT(s.latency_ms), COALESCE(SUM(s.latency_ms), 0),
+    COUNT(*) FILTER (WHERE s.latency_ms <= 250),
+    COUNT(*) FILTER (WHERE s.latency_ms > 250 AND s.latency_ms <= 500),
+    COUNT(*) FILTER (WHERE s.latency_ms > 500 AND s.latency_ms <= 1000),
+    COUNT(*) FILTER (WHERE s.latency_ms > 1000 AND s.latency_ms <= 2000),
+    COUNT(*) FILTER (WHERE s.latency_ms > 2000 AND s.latency_ms <= 5000),
+    COUNT(*) FILTER (WHERE s.latency_ms > 5000 AND s.latency_ms <= 10000),
+    COUNT(*) FILTER (WHERE s.latency_ms > 10000 AND s.latency_ms <= 30000),
+    COUNT(*) FILTER (WHERE s.latency_ms > 30000 AND s.latency_ms <= 60000),
+    COUNT(*) FILTER (WHERE s.latency_ms > 60000)
+  FROM ai_logs s
+  CROSS JOIN (VALUES ('hour'), ('day'), ('week')) AS g(granularity)
+  WHERE start_at IS NULL OR s.created_at >= start_at
+  GROUP BY 1, 2, 3, 4, 5;
+
+  GET DIAGNOSTICS rebuilt = ROW_COUNT;
+  RETURN rebuilt;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 전체 재계산은 ai_logs INSERT를 잠그므로 관리 작업(service_role)만 호출
+REVOKE EXECUTE ON FUNCTION rebuild_ai_usage_rollups(TIMESTAMP WITH TIME ZONE) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION rebuild_ai_usage_rollups(TIMESTAMP WITH TIME ZONE) TO service_role;
+
+-- 4. 기존 로그 백필
+SELECT rebuild_ai_usage_rollups(NULL);
+
+-- 검증
+SELECT granularity, COUNT(*) AS buckets, SUM(requests) AS requests
+FROM ai_usage_rollups
+GROUP BY granularity
+ORDER BY granularity;
@@ -0,0 +1,227 @@
+-- Migration: ai_logs 일 단위 파티션 + 보존 기간/정리
+-- 매 /chat 턴마다 INSERT 되는 ai_logs를 UTC 날짜별 파티션(ai_logs_YYYYMMDD)으로 나눈다.
+-- - 오래된 원본 로그는 DELETE 대신 파티션을 통째로 DROP → 정리 비용/인덱스 부풀림이 로그 양과 무관
+-- - 원본 로그는 INSERT 시점에 이미 ai_usage_rollups로 집계되므로(트리거) 보존 기간이 지나면 버려도 통계는 남음
+-- - 시간(hour) 단위 집계는 hourly_rollup_days 이후 삭제 (일/주 단위 집계는 유지)
+-- - 통계 조회는 집계 테이블과 기간 조건(created_at)으로 최근 파티션만 읽음
+-- - 인덱스는 created_at, user_id 두 개만 유지 (prompt_type/status 집계는 ai_usage_rollups 담당)
+-- 선행: migrations/add_ai_logs_telemetry.sql, migrations/add_ai_usage_rollups.sql
+-- 정리 작업: pg_cron이 있으면 매일 실행되도록 등록, 없으면 api/prune_ai_logs.py를 매일 실행
+
+-- 1. 보존 기록 (rebuild_ai_usage_rollups가 지워진 기간을 다시 계산하지 않도록)
+CREATE TABLE IF NOT EXISTS ai_logs_retention (
+  id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+  pruned_before TIMESTAMP WITH TIME ZONE,
+  last_run_at TIMESTAMP WITH TIME ZONE,
+  dropped_partitions INTEGER NOT NULL DEFAULT 0
+);
+INSERT INTO ai_logs_retention (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+ALTER TABLE ai_logs_retention ENABLE ROW LEVEL SECURITY;
+
+-- 2. 기존 테이블 보관 (이미 파티션 테이블이면 건너뜀)
+DO $$
+BEGIN
+  IF EXISTS (
+    SELECT 1 FROM pg_class
+    WHERE relname = 'ai_logs' AND relnamespace = 'public'::regnamespace AND relkind = 'r'
+  ) THEN
+    DROP TRIGGER IF EXISTS ai_logs_rollup ON ai_logs;
+    ALTER TABLE ai_logs RENAME TO ai_logs_unpartitioned;
+    ALTER TABLE ai_logs_unpartitioned RENAME CONSTRAINT ai_logs_pkey TO ai_logs_unpartitioned_pkey;
+    DROP INDEX IF EXISTS idx_ai_logs_created_at;
+    DROP INDEX IF EXISTS idx_ai_logs_prompt_type;
+    DROP INDEX IF EXISTS idx_ai_logs_user_id;
+    DROP INDEX IF EXISTS idx_ai_logs_status;
+  END IF;
+END $$;
+
+-- 3. 파티션 테이블 (파티션 키가 PK에 포함돼야 하므로 PK는 (id, created_at))
+CREATE TABLE IF NOT EXISTS ai_logs (
+  id UUID NOT NULL DEFAULT gen_random_uuid(),
+  prompt_type TEXT NOT NULL,
+  model_name TEXT DEFAULT 'gemini-flash',
+  status TEXT DEFAULT 'success',
+  user_id UUID REFERENCES auth.users(id) ON DELETE SET NULL,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  queue_wait_ms INTEGER,
+  ttft_ms INTEGER,
+  latency_ms INTEGER,
+  prompt_tokens INTEGER,
+  completion_tokens INTEGER,
+  cache_status TEXT,
+  error_type TEXT,
+  PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- 날짜 파티션이 아직 없는 시각의 로그 (정리 작업이 멈춰도 INSERT가 실패하지 않도록)
+CREATE TABLE IF NOT EXISTS ai_logs_default PARTITION OF ai_logs DEFAULT;
+
+CREATE INDEX IF NOT EXISTS idx_ai_logs_created_at ON ai_logs(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_ai_logs_user_id ON ai_logs(user_id);
+
+ALTER TABLE ai_logs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Anyone can insert ai logs" ON ai_logs;
+CREATE POLICY "Anyone can insert ai logs"
+  ON ai_logs
+  FOR INSERT
+  WITH CHECK (true);
+
+DROP POLICY IF EXISTS "Service role can view all ai logs" ON ai_logs;
+CREATE POLICY "Service role can view all ai logs"
+  ON ai_logs
+  FOR SELECT
+  USING (true);
+
+-- 4. 날짜 파티션 생성 (오늘 - days_back ~ 오늘 + days_ahead, UTC)
+--    default 파티션에 들어간 그 날짜의 로그는 새 파티션으로 옮긴 뒤 붙임 (집계 트리거는 다시 실행되지 않음)
+CREATE OR REPLACE FUNCTION ensure_ai_logs_partitions(days_ahead INTEGER DEFAULT 7, days_back INTEGER DEFAULT 0)
+RETURNS INTEGER
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  today DATE := (NOW() AT TIME ZONE 'UTC')::DATE;
+  day DATE;
+  partition_name TEXT;
+  lower_bound TIMESTAMP WITH TIME ZONE;
+  upper_bound TIMESTAMP WITH TIME ZONE;
+  created INTEGER := 0;
+BEGIN
+  FOR day IN SELECT generate_series(today - days_back, today + days_ahead, INTERVAL '1 day')::DATE LOOP
+    partition_name := 'ai_logs_' || to_char(day, 'YYYYMMDD');
+    CONTINUE WHEN to_regclass('public.' || partition_name) IS NOT NULL;
+
+    lower_bound := day::TIMESTAMP AT TIME ZONE 'UTC';
+    upper_bound := (day + 1)::TIMESTAMP AT TIME ZONE 'UTC';
+    EXECUTE format('CREATE TABLE %I (LIKE ai_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name);
+    EXECUTE format(
+      'WITH moved AS (DELETE FROM ai_logs_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+      'INSERT INTO %I SELECT * FROM moved',
+      lower_bound, upper_bound, partition_name
+    );
+    EXECUTE format(
+      'ALTER TABLE ai_logs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+      partition_name, lower_bound, upper_bound
+    );
+    created := created + 1;
+  END LOOP;
+  RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- SECURITY DEFINER 함수는 기본으로 PUBLIC에 실행 권한이 있어 anon 키로도 /rest/v1/rpc 호출이 가능 → service_role만 허용
+REVOKE EXECUTE ON FUNCTION ensure_ai_logs_partitions(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION ensure_ai_logs_partitions(INTEGER, INTEGER) TO service_role;
+
+-- 5. 기존 로그 이전 (보존 기간 30일 안의 로그만, 그 이전은 이미 ai_usage_rollups에 집계됨)
+--    집계 트리거를 만들기 전에 옮기므로 다시 집계되지 않음
+DO $$
+BEGIN
+  IF to_regclass('public.ai_logs_unpartitioned') IS NOT NULL THEN
+    PERFORM ensure_ai_logs_partitions(7, 30);
+    INSERT INTO ai_logs
+    SELECT id, prompt_type, model_name, status, user_id, COALESCE(created_at, NOW()),
+           queue_wait_ms, ttft_ms, latency_ms, prompt_tokens, completion_tokens, cache_status, error_type
+    FROM ai_logs_unpartitioned
+    WHERE created_at >= (NOW() AT TIME ZONE 'UTC')::DATE - 30
+    ON CONFLICT DO NOTHING;
+    UPDATE ai_logs_retention
+    SET pruned_before = ((NOW() AT TIME ZONE 'UTC')::DATE - 30)::TIMESTAMP AT TIME ZONE 'UTC';
+  ELSE
+    PERFORM ensure_ai_logs_partitions(7, 0);
+  END IF;
+END $$;
+
+-- 6. 집계 트리거 (파티션 테이블의 문장 단위 트리거: new_rows에 모든 파티션의 새 행이 담김)
+DROP TRIGGER IF EXISTS ai_logs_rollup ON ai_logs;
+CREATE TRIGGER ai_logs_rollup
+  AFTER INSERT ON ai_logs
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION apply_ai_usage_rollups();
+
+-- 7. 정리 작업
+--    retain_days가 지난 날짜 파티션 DROP, hourly_rollup_days가 지난 시간 단위 집계 삭제,
+--    앞으로 7일치 파티션 미리 생성 → 실행 결과(JSON) 반환
+CREATE OR REPLACE FUNCTION prune_ai_logs(retain_days INTEGER DEFAULT 30, hourly_rollup_days INTEGER DEFAULT 14)
+RETURNS JSONB
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  cutoff_day DATE := (NOW() AT TIME ZONE 'UTC')::DATE - retain_days;
+  cutoff TIMESTAMP WITH TIME ZONE := cutoff_day::TIMESTAMP AT TIME ZONE 'UTC';
+  partition_name TEXT;
+  dropped INTEGER := 0;
+  default_deleted BIGINT;
+  hourly_deleted BIGINT;
+  created INTEGER;
+BEGIN
+  -- 0 이하면 오늘 이후 파티션까지 지워짐
+  IF retain_days < 1 OR hourly_rollup_days < 1 THEN
+    RAISE EXCEPTION 'retain_days and hourly_rollup_days must be at least 1 (got %, %)', retain_days, hourly_rollup_days;
+  END IF;
+
+  FOR partition_name IN
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'public.ai_logs'::regclass
+      AND c.relname ~ '^ai_logs_[0-9]{8}$'
+      AND to_date(substring(c.relname FROM 9), 'YYYYMMDD') < cutoff_day
+    ORDER BY c.relname
+  LOOP
+    EXECUTE format('ALTER TABLE ai_logs DETACH PARTITION %I', partition_name);
+    EXECUTE format('DROP TABLE %I', partition_name);
+    dropped := dropped + 1;
+  END LOOP;
+
+  DELETE FROM ai_logs_default WHERE created_at < cutoff;
+  GET DIAGNOSTICS default_deleted = ROW_COUNT;
+
+  DELETE FROM ai_usage_rollups
+  WHERE granularity = 'hour'
+    AND bucket_start < ((NOW() AT TIME ZONE 'UTC')::DATE - hourly_rollup_days)::TIMESTAMP AT TIME ZONE 'UTC';
+  GET DIAGNOSTICS hourly_deleted = ROW_COUNT;
+
+  created := ensure_ai_logs_partitions(7, 0);
+
+  UPDATE ai_logs_retention
+  SET pruned_before = GREATEST(COALESCE(pruned_before, cutoff), cutoff),
+      last_run_at = NOW(),
+      dropped_partitions = dropped_partitions + dropped;
+
+  RETURN jsonb_build_object(
+    'pruned_before', cutoff,
+    'dropped_partitions', dropped,
+    'default_rows_deleted', default_deleted,
+    'hourly_rollups_deleted', hourly_deleted,
+    'partitions_created', created
+  );
+END;
+$$ LANGUAGE plpgsql;
+
+-- 파티션 DROP 권한이 있으므로 정리 작업(service_role, pg_cron)만 호출
+REVOKE EXECUTE ON FUNCTION prune_ai_logs(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION prune_ai_logs(INTEGER, INTEGER) TO service_role;
+
+-- 8. 매일 00:10 UTC 정리 (pg_cron 사용 가능할 때)
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule('prune-ai-logs', '10 0 * * *', 'SELECT prune_ai_logs(30, 14)');
+  ELSE
+    RAISE NOTICE 'pg_cron not enabled: run api/prune_ai_logs.py daily';
+  END IF;
+END $$;
+
+-- 옮긴 로그 확인 후 기존 테이블 삭제
+-- DROP TABLE IF EXISTS ai_logs_unpartitioned;
+
+-- 검증
+SELECT c.relname AS partition, pg_get_expr(c.relpartbound, c.oid) AS bounds
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+WHERE i.inhparent = 'public.ai_logs'::regclass
+ORDER BY c.relname;
@@ -578,9 +578,14 @@ export default function MyPage() {
                 return;
             }
 
+            // 로그인 토큰이 있을 때만 서버가 이전 답변과 비교해 바뀐 문항만 다시 생성
+            const { data: { session } } = await supabase.auth.getSession();
+            const headers = { 'Content-Type': 'application/json' };
+            if (session?.access_token) headers.Authorization = `Bearer ${session.access_token}`;
+
             const res = await fetch(`${apiUrl}/generate-chat-answers`, {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
+                headers,
                 body: JSON.stringify({ portfolio_context: context })
             });
 